@@ -0,0 +1,207 @@
+"""
+合成博客语料生成模块
+负责按指定规模生成 md/ 目录（文章数、代码块密度、标签数、图片数、加密比例、中文比例），
+生成结果只取决于参数和随机种子，便于在不同版本之间比较构建性能
+"""
+import random
+import struct
+import zlib
+from dataclasses import asdict, dataclass
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Dict, List
+
+# 预置的语料规模
+PRESETS: Dict[str, Dict[str, Any]] = {
+    'small': {'posts': 100, 'tags': 20, 'images': 10},
+    'medium': {'posts': 1000, 'tags': 80, 'images': 50},
+    'large': {'posts': 5000, 'tags': 200, 'images': 200},
+}
+
+# 每篇文章的段落数范围
+PARAGRAPHS_PER_POST = (6, 16)
+
+# 每个段落的句子数范围
+SENTENCES_PER_PARAGRAPH = (2, 6)
+
+# 文章日期的起始日期
+START_DATE = date(2018, 1, 1)
+
+# 加密文章使用的密码，只使用少量不同的密码，与真实博客相近
+PASSWORDS = ['bench-1', 'bench-2', 'bench-3']
+
+_EN_WORDS = (
+    'static site generator build render template markdown cache index search post tag '
+    'archive page theme config asset image python performance memory parallel process '
+    'output input file directory content metadata summary feature release update server'
+).split()
+
+_CJK_WORDS = (
+    '静态 网站 生成 构建 渲染 模板 文章 标签 归档 页面 主题 配置 资源 图片 性能 内存 '
+    '并行 进程 输出 目录 内容 摘要 功能 发布 更新 服务器 搜索 索引 缓存 博客'
+).split()
+
+_CODE_SNIPPETS = {
+    'python': [
+        'def build(posts):',
+        '    for post in posts:',
+        '        html = render(post)',
+        '        write(post.slug, html)',
+        'cache = {}',
+        'result = [p.title for p in posts if p.tags]',
+        'return sorted(result, key=len)',
+    ],
+    'javascript': [
+        'function search(query) {',
+        '  const terms = query.split(/\\s+/);',
+        '  return index.filter(p => terms.every(t => p.title.includes(t)));',
+        '}',
+        'document.addEventListener("DOMContentLoaded", init);',
+    ],
+    'bash': [
+        'pip install -r requirements.txt',
+        'python gen.py --profile',
+        'rsync -a public/ server:/var/www/blog/',
+    ],
+}
+
+
+@dataclass
+class CorpusSpec:
+    """语料规模参数"""
+    posts: int = 100                # 文章数
+    code_density: float = 0.3       # 段落中代码块的比例
+    tags: int = 20                  # 不同标签的数量
+    images: int = 0                 # 不同图片的数量（每篇文章最多引用两张）
+    encrypted_fraction: float = 0.0  # 加密文章的比例
+    cjk_ratio: float = 0.5          # 正文中中文词语的比例
+    seed: int = 0                   # 随机种子
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为可以序列化为 JSON 的字典"""
+        return asdict(self)
+
+
+def png_bytes(width: int, height: int, color: tuple) -> bytes:
+    """
+    生成单色 PNG 图片
+
+    Args:
+        width: 宽度
+        height: 高度
+        color: (R, G, B)
+
+    Returns:
+        PNG 文件内容
+    """
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+    row = b'\x00' + bytes(color) * width
+    header = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)
+    return (
+        b'\x89PNG\r\n\x1a\n'
+        + chunk(b'IHDR', header)
+        + chunk(b'IDAT', zlib.compress(row * height))
+        + chunk(b'IEND', b'')
+    )
+
+
+def _is_cjk(char: str) -> bool:
+    """判断字符是否为中文"""
+    return '\u4e00' <= char <= '\u9fff'
+
+
+def _sentence(rng: random.Random, cjk_ratio: float) -> str:
+    """生成一个中英文混合的句子"""
+    words = []
+    for _ in range(rng.randint(6, 18)):
+        if rng.random() < cjk_ratio:
+            words.append(rng.choice(_CJK_WORDS))
+        else:
+            words.append(rng.choice(_EN_WORDS))
+    # 中文词语之间不加空格
+    text = ''
+    for word in words:
+        if text and not (_is_cjk(word[0]) and _is_cjk(text[-1])):
+            text += ' '
+        text += word
+    return text[0].upper() + text[1:] + ('。' if _is_cjk(text[-1]) else '.')
+
+
+def _code_block(rng: random.Random) -> str:
+    """生成一个代码块"""
+    language = rng.choice(sorted(_CODE_SNIPPETS))
+    lines = _CODE_SNIPPETS[language]
+    start = rng.randrange(len(lines))
+    body = '\n'.join(lines[(start + i) % len(lines)] for i in range(rng.randint(3, 12)))
+    return f'```{language}\n{body}\n```'
+
+
+def _post_body(rng: random.Random, spec: CorpusSpec, images: List[str]) -> str:
+    """生成文章正文"""
+    blocks = []
+    for i in range(rng.randint(*PARAGRAPHS_PER_POST)):
+        if i and i % 5 == 0:
+            blocks.append(f'## {_sentence(rng, spec.cjk_ratio).rstrip(".。")}')
+        if rng.random() < spec.code_density:
+            blocks.append(_code_block(rng))
+        else:
+            sentences = rng.randint(*SENTENCES_PER_PARAGRAPH)
+            blocks.append(' '.join(_sentence(rng, spec.cjk_ratio) for _ in range(sentences)))
+    for image in images:
+        blocks.insert(rng.randint(1, len(blocks)), f'![{Path(image).stem}](../{image})')
+    return '\n\n'.join(blocks)
+
+
+def generate_corpus(md_dir: Path, spec: CorpusSpec) -> List[Path]:
+    """
+    生成合成语料
+
+    文章分布在按年份划分的子目录中，图片保存在 md/images/ 下。
+
+    Args:
+        md_dir: 输出的 md 目录（会创建，已有的同名文件会被覆盖）
+        spec: 语料规模参数
+
+    Returns:
+        生成的文章文件路径
+    """
+    rng = random.Random(spec.seed)
+    md_dir = Path(md_dir)
+    md_dir.mkdir(parents=True, exist_ok=True)
+
+    tags = [f'标签{i}' if rng.random() < spec.cjk_ratio else f'tag-{i}' for i in range(spec.tags)]
+
+    images = []
+    if spec.images:
+        (md_dir / 'images').mkdir(exist_ok=True)
+        for i in range(spec.images):
+            image = f'images/img-{i:04d}.png'
+            color = (rng.randrange(256), rng.randrange(256), rng.randrange(256))
+            (md_dir / image).write_bytes(png_bytes(rng.choice([320, 800, 1600]), 200, color))
+            images.append(image)
+
+    paths = []
+    for i in range(spec.posts):
+        post_date = START_DATE + timedelta(days=i * 2 + rng.randint(0, 1))
+        post_tags = rng.sample(tags, min(len(tags), rng.randint(1, 4))) if tags else []
+        post_images = rng.sample(images, min(len(images), rng.randint(0, 2))) if images else []
+
+        lines = [
+            '---',
+            f'title: "{_sentence(rng, spec.cjk_ratio).rstrip(".。")} {i}"',
+            f'date: {post_date.isoformat()}',
+            f'tags: [{", ".join(post_tags)}]',
+            f'description: "{_sentence(rng, spec.cjk_ratio)}"',
+        ]
+        if rng.random() < spec.encrypted_fraction:
+            lines.append('encrypted: true')
+            lines.append(f'password: "{rng.choice(PASSWORDS)}"')
+        lines.append('---')
+
+        path = md_dir / str(post_date.year) / f'post-{i:05d}.md'
+        path.parent.mkdir(exist_ok=True)
+        path.write_text('\n'.join(lines) + '\n\n' + _post_body(rng, spec, post_images) + '\n', encoding='utf-8')
+        paths.append(path)
+    return paths
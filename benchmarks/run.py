@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+构建性能基准测试
+生成合成语料和临时博客项目，测量完整的 gen.py 构建以及各个阶段
+（load_posts、Renderer.render_*、_generate_search_index）的耗时，
+把结果保存为 JSON，并可以与之前保存的结果比较，发现性能退化
+
+用法:
+    python benchmarks/run.py --preset medium
+    python benchmarks/run.py --posts 2000 --encrypted 0.1 --cjk 0.8 --build-option workers=4
+    python benchmarks/run.py --preset medium --compare benchmarks/results/medium-20240101-120000.json
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from corpus import PRESETS, CorpusSpec, generate_corpus  # noqa: E402
+from mblog.initializer import ProjectInitializer  # noqa: E402
+
+# 基准测试结果格式版本
+RESULT_VERSION = 1
+
+# 默认的结果保存目录
+DEFAULT_RESULTS_DIR = REPO_ROOT / 'benchmarks' / 'results'
+
+# 默认的性能退化阈值（中位数变慢超过该比例时报告退化）
+DEFAULT_THRESHOLD = 0.15
+
+# 临时项目的名称
+PROJECT_NAME = 'bench-blog'
+
+
+def parse_args() -> argparse.Namespace:
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="mblog 构建性能基准测试")
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="small", help="预置的语料规模")
+    parser.add_argument("--posts", type=int, help="文章数")
+    parser.add_argument("--code-density", type=float, help="段落中代码块的比例（0-1）")
+    parser.add_argument("--tags", type=int, help="不同标签的数量")
+    parser.add_argument("--images", type=int, help="不同图片的数量")
+    parser.add_argument("--encrypted", type=float, help="加密文章的比例（0-1）")
+    parser.add_argument("--cjk", type=float, help="正文中中文词语的比例（0-1）")
+    parser.add_argument("--seed", type=int, help="随机种子")
+    parser.add_argument(
+        "--build-option", action="append", default=[], metavar="KEY=VALUE",
+        help="覆盖 config.json 中的 build 选项，值按 JSON 解析，如 workers=4（可多次指定）"
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="每个阶段的重复次数")
+    parser.add_argument("--name", help="结果名称，默认使用预置名称")
+    parser.add_argument("--output-dir", default=str(DEFAULT_RESULTS_DIR), help="结果保存目录")
+    parser.add_argument("--compare", help="与之前保存的结果文件比较")
+    parser.add_argument(
+        "--threshold", type=float, default=DEFAULT_THRESHOLD,
+        help="性能退化阈值，中位数变慢超过该比例时以非零状态退出"
+    )
+    parser.add_argument("--keep", action="store_true", help="保留生成的临时项目，便于排查")
+    return parser.parse_args()
+
+
+def build_spec(args: argparse.Namespace) -> CorpusSpec:
+    """根据预置规模和命令行参数生成语料规模参数"""
+    spec = CorpusSpec(**PRESETS[args.preset])
+    overrides = {
+        'posts': args.posts,
+        'code_density': args.code_density,
+        'tags': args.tags,
+        'images': args.images,
+        'encrypted_fraction': args.encrypted,
+        'cjk_ratio': args.cjk,
+        'seed': args.seed,
+    }
+    for key, value in overrides.items():
+        if value is not None:
+            setattr(spec, key, value)
+    return spec
+
+
+def parse_build_options(options: List[str]) -> Dict[str, Any]:
+    """解析 --build-option KEY=VALUE 参数"""
+    result = {}
+    for option in options:
+        key, sep, value = option.partition('=')
+        if not sep:
+            raise SystemExit(f"错误: 无效的 build 选项 {option!r}，应为 KEY=VALUE")
+        try:
+            result[key] = json.loads(value)
+        except ValueError:
+            result[key] = value
+    return result
+
+
+def create_project(work_dir: Path, spec: CorpusSpec, build_options: Dict[str, Any]) -> Path:
+    """
+    创建临时博客项目并写入合成语料
+
+    Args:
+        work_dir: 临时目录
+        spec: 语料规模参数
+        build_options: 覆盖的 build 选项
+
+    Returns:
+        项目目录
+    """
+    initializer = ProjectInitializer(PROJECT_NAME, str(work_dir))
+    initializer._create_directory_structure()
+    initializer._copy_runtime()
+    initializer._create_gen_script()
+    initializer._create_config_file()
+    initializer._create_default_theme()
+    project_dir = initializer.project_path
+
+    config_file = project_dir / 'config.json'
+    config = json.loads(config_file.read_text(encoding='utf-8'))
+    config['build'].update(build_options)
+    config_file.write_text(json.dumps(config, ensure_ascii=False, indent=2), encoding='utf-8')
+
+    generate_corpus(project_dir / 'md', spec)
+    return project_dir
+
+
+def measure(func: Callable[[], Any], repeat: int, setup: Optional[Callable[[], None]] = None,
+            warmup: bool = False) -> Dict[str, Any]:
+    """
+    多次执行并记录耗时
+
+    Args:
+        func: 被测量的函数
+        repeat: 重复次数
+        setup: 每次执行前调用（不计入耗时）
+        warmup: 是否先执行一次不计入耗时（加载模板、派生密钥等一次性开销）
+
+    Returns:
+        {'min', 'median', 'runs'}，单位为秒
+    """
+    if warmup:
+        func()
+    runs = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        runs.append(time.perf_counter() - start)
+    return {'min': min(runs), 'median': statistics.median(runs), 'runs': runs}
+
+
+def run_gen(project_dir: Path) -> None:
+    """在项目目录中运行 gen.py"""
+    result = subprocess.run(
+        [sys.executable, 'gen.py'], cwd=str(project_dir), capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise SystemExit(f"错误: gen.py 执行失败\n{result.stdout}\n{result.stderr}")
+
+
+def benchmark_pipeline(project_dir: Path, repeat: int) -> Dict[str, Dict[str, Any]]:
+    """测量完整的 gen.py 构建：冷构建（无缓存、无输出）和热构建（保留缓存和输出）"""
+    cache_dir = project_dir / '.mblog-cache'
+    output_dir = project_dir / 'public'
+
+    def clean() -> None:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+    timings = {'gen_cold': measure(lambda: run_gen(project_dir), repeat, setup=clean)}
+    timings['gen_warm'] = measure(lambda: run_gen(project_dir), repeat)
+    return timings
+
+
+def benchmark_stages(project_dir: Path, repeat: int) -> Dict[str, Dict[str, Any]]:
+    """
+    在进程内测量各个构建阶段
+
+    使用项目中的运行时（_mblog），与 gen.py 相同。文章解析不使用构建缓存，
+    渲染阶段先执行一次预热，只测量模板渲染，不写入文件。
+    """
+    sys.path.insert(0, str(project_dir))
+    from _mblog.config import Config
+    from _mblog.generator import StaticGenerator
+    from _mblog.markdown_processor import MarkdownProcessor
+    from _mblog.renderer import Renderer
+    from _mblog.theme import Theme
+
+    config = Config(str(project_dir / 'config.json'))
+    config.load()
+    theme = Theme(str(project_dir / 'theme'))
+    theme.load()
+    processor = MarkdownProcessor(str(project_dir / 'md'), base_path=config.get('site.base_path', ''))
+
+    timings = {'load_posts': measure(processor.load_posts, repeat)}
+
+    posts = processor.load_posts()
+    renderer = Renderer(theme, config)
+    posts_per_page = config.get('theme_config.posts_per_page') or len(posts) or 1
+    pages = range(1, (len(posts) + posts_per_page - 1) // posts_per_page + 1)
+    tags = renderer.get_all_tags(posts)
+
+    timings['render_index'] = measure(
+        lambda: [renderer.render_index(posts, page=page, posts_per_page=posts_per_page) for page in pages],
+        repeat, warmup=True
+    )
+    timings['render_post'] = measure(
+        lambda: [renderer.render_post(post) for post in posts], repeat, warmup=True
+    )
+    timings['render_tag_page'] = measure(
+        lambda: [renderer.render_tag_page(tag, tag_posts) for tag, tag_posts in tags.items()],
+        repeat, warmup=True
+    )
+    timings['render_tags_index'] = measure(lambda: renderer.render_tags_index(tags), repeat, warmup=True)
+    timings['render_archive'] = measure(lambda: renderer.render_archive(posts), repeat, warmup=True)
+
+    output_dir = Path(tempfile.mkdtemp(prefix='mblog-bench-'))
+    try:
+        config.data.setdefault('build', {})['output_dir'] = str(output_dir)
+        generator = StaticGenerator(config, theme, renderer, posts)
+        timings['search_index'] = measure(generator._generate_search_index, repeat)
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+    return timings
+
+
+def compare(result: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """
+    与之前的结果比较
+
+    Args:
+        result: 本次结果
+        baseline: 之前保存的结果
+        threshold: 性能退化阈值
+
+    Returns:
+        中位数变慢超过阈值的阶段
+    """
+    if baseline.get('corpus') != result['corpus']:
+        print("警告: 两次结果的语料规模不同，比较结果仅供参考")
+
+    regressions = []
+    print(f"\n{'阶段':<20} {'之前':>10} {'本次':>10} {'变化':>8}")
+    for stage, timing in result['timings'].items():
+        previous = baseline.get('timings', {}).get(stage)
+        if not previous:
+            continue
+        change = timing['median'] / previous['median'] - 1 if previous['median'] else 0.0
+        marker = ''
+        if change > threshold:
+            regressions.append(stage)
+            marker = '  ✗ 变慢'
+        print(f"{stage:<20} {previous['median']:>9.3f}s {timing['median']:>9.3f}s {change:>+7.1%}{marker}")
+    return regressions
+
+
+def main() -> None:
+    """主函数"""
+    args = parse_args()
+    spec = build_spec(args)
+    build_options = parse_build_options(args.build_option)
+    name = args.name or args.preset
+
+    work_dir = Path(tempfile.mkdtemp(prefix='mblog-bench-'))
+    try:
+        print(f"→ 生成语料: {spec.posts} 篇文章，{spec.tags} 个标签，{spec.images} 张图片")
+        project_dir = create_project(work_dir, spec, build_options)
+
+        print(f"→ 测量完整构建（重复 {args.repeat} 次）...")
+        timings = benchmark_pipeline(project_dir, args.repeat)
+
+        print(f"→ 测量各个阶段（重复 {args.repeat} 次）...")
+        original_cwd = os.getcwd()
+        os.chdir(project_dir)
+        try:
+            timings.update(benchmark_stages(project_dir, args.repeat))
+        finally:
+            os.chdir(original_cwd)
+    finally:
+        if args.keep:
+            print(f"  临时项目: {work_dir / PROJECT_NAME}")
+        else:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    result = {
+        'version': RESULT_VERSION,
+        'name': name,
+        'created_at': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'commit': _git_commit(),
+        'corpus': spec.to_dict(),
+        'build_options': build_options,
+        'repeat': args.repeat,
+        'timings': timings,
+    }
+
+    print(f"\n{'阶段':<20} {'最短':>10} {'中位数':>10}")
+    for stage, timing in timings.items():
+        print(f"{stage:<20} {timing['min']:>9.3f}s {timing['median']:>9.3f}s")
+
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    result_path = output_dir / f"{name}-{datetime.now():%Y%m%d-%H%M%S}.json"
+    with open(result_path, 'w', encoding='utf-8') as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    print(f"\n✓ 结果已保存: {result_path}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(result, baseline, args.threshold)
+        if regressions:
+            print(f"\n✗ 性能退化超过 {args.threshold:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+        print("\n✓ 没有发现性能退化")
+
+
+def _git_commit() -> Optional[str]:
+    """获取当前仓库的提交哈希，不在 git 仓库中时返回 None"""
+    try:
+        result = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=str(REPO_ROOT),
+            capture_output=True, text=True
+        )
+    except OSError:
+        return None
+    return result.stdout.strip() or None
+
+
+if __name__ == "__main__":
+    main()
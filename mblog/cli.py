@@ -37,6 +37,7 @@ class MblogCLI:
 示例:
   mblog new my-blog          创建名为 my-blog 的新博客项目
   mblog upgrade              升级当前博客的运行时到最新版本
+  mblog serve                启动本地预览服务器（自动重新生成并刷新浏览器）
   mblog theme update         更新当前博客的主题文件
   mblog theme reset          重置主题为默认主题
   mblog --version            显示版本信息
@@ -93,6 +94,30 @@ class MblogCLI:
             help='强制覆盖，不进行备份确认'
         )
         
+        # serve 命令
+        serve_parser = subparsers.add_parser(
+            'serve',
+            help='启动本地预览服务器',
+            description='监视 md/、theme/ 和 config.json 的变化，增量重新生成页面并自动刷新浏览器'
+        )
+        serve_parser.add_argument(
+            '-p', '--path',
+            dest='project_path',
+            help='博客项目路径（默认为当前目录）',
+            default='.'
+        )
+        serve_parser.add_argument(
+            '--host',
+            default='127.0.0.1',
+            help='监听地址（默认 127.0.0.1）'
+        )
+        serve_parser.add_argument(
+            '--port',
+            type=int,
+            default=8000,
+            help='监听端口（默认 8000）'
+        )
+        
         # theme 命令
         theme_parser = subparsers.add_parser(
             'theme',
@@ -147,6 +172,12 @@ class MblogCLI:
                     parsed_args.project_path,
                     parsed_args.force
                 )
+            elif parsed_args.command == 'serve':
+                return self.handle_serve(
+                    parsed_args.project_path,
+                    parsed_args.host,
+                    parsed_args.port
+                )
             elif parsed_args.command == 'theme':
                 return self.handle_theme(
                     parsed_args.action,
@@ -297,6 +328,39 @@ class MblogCLI:
             traceback.print_exc()
             return 1
     
+    def handle_serve(self, project_path: str, host: str = '127.0.0.1', port: int = 8000) -> int:
+        """处理 serve 命令
+        
+        预览服务器属于博客运行时（_mblog/server.py），
+        因此在项目目录中使用项目自己的运行时启动。
+        
+        Args:
+            project_path: 博客项目路径
+            host: 监听地址
+            port: 监听端口
+            
+        Returns:
+            int: 退出码，0 表示成功，非 0 表示失败
+        """
+        import subprocess
+        
+        project = Path(project_path)
+        if not (project / '_mblog' / 'server.py').exists() or not (project / 'config.json').exists():
+            print("✗ 当前目录不是有效的 mblog 项目，或运行时版本过旧", file=sys.stderr)
+            print("  提示：请确保目录中包含 config.json，并运行 mblog upgrade 更新运行时", file=sys.stderr)
+            return 1
+        
+        try:
+            return subprocess.call(
+                [sys.executable, '-m', '_mblog.server', '--host', host, '--port', str(port)],
+                cwd=str(project)
+            )
+        except KeyboardInterrupt:
+            return 0
+        except Exception as e:
+            print(f"✗ 启动预览服务器时发生错误: {e}", file=sys.stderr)
+            return 1
+    
     def handle_theme(self, action: str, project_path: str, force: bool = False) -> int:
         """处理 theme 命令
         
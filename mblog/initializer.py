@@ -270,6 +270,7 @@ ENV/
 
 # Generated files
 public/
+.mblog-cache/
 
 # IDE
 .vscode/
@@ -283,6 +284,8 @@ Thumbs.db
 
 # Secrets
 content_deploy_key
+.mblog-keys.json
+.mblog-keys.json.lock
 content_deploy_key.pub
 """
             gitignore_path = self.project_path / ".gitignore"
@@ -0,0 +1,148 @@
+"""
+静态资源处理模块
+负责压缩主题静态资源、按页面类型打包脚本，并根据文件内容生成带哈希的文件名，
+使其可以长期缓存
+"""
+import hashlib
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .minifier import MinifyError, minify as minify_asset
+
+# 输出目录中的静态资源清单文件名
+ASSET_MANIFEST_FILE = 'asset-manifest.json'
+
+# 脚本包所在目录（相对于 static 目录）
+BUNDLE_DIR = 'bundles'
+
+# 页面类型没有单独的脚本包时使用的包
+DEFAULT_BUNDLE = 'default'
+
+# 需要压缩的文件类型
+MINIFIABLE_SUFFIXES = {'.css', '.js'}
+
+# 文件名中哈希的长度
+FINGERPRINT_LENGTH = 10
+
+
+class AssetError(Exception):
+    """静态资源处理错误"""
+    pass
+
+
+def fingerprint_name(rel_path: str, content: bytes) -> str:
+    """
+    生成带内容哈希的文件路径
+
+    Args:
+        rel_path: 相对于 static 目录的路径，如 'css/style.css'
+        content: 文件内容
+
+    Returns:
+        带哈希的路径，如 'css/style.3f2a9c1b0d.css'
+    """
+    digest = hashlib.sha256(content).hexdigest()[:FINGERPRINT_LENGTH]
+    path = Path(rel_path)
+    if path.suffix:
+        name = f'{path.stem}.{digest}{path.suffix}'
+    else:
+        name = f'{path.name}.{digest}'
+    return path.with_name(name).as_posix()
+
+
+class AssetPipeline:
+    """
+    主题静态资源处理流程
+
+    依次执行压缩、打包和生成指纹，结果供 url_for_static 生成 URL，
+    也供生成器写入输出目录。脚本包在 theme.json 的 bundles 中声明，
+    格式为 {页面类型: [脚本路径, ...]}。
+    """
+
+    def __init__(self, static_dir: Optional[str], bundles: Optional[Dict[str, List[str]]] = None,
+                 minify: bool = False, bundle: bool = False, fingerprint: bool = False):
+        """
+        初始化并处理静态资源
+
+        Args:
+            static_dir: 主题的 static 目录
+            bundles: 脚本包声明 {页面类型: [脚本路径, ...]}
+            minify: 是否压缩 CSS 和 JavaScript
+            bundle: 是否把每种页面的脚本合并为一个文件
+            fingerprint: 是否生成带内容哈希的文件名
+
+        Raises:
+            AssetError: 资源压缩失败或脚本包引用的文件不存在
+        """
+        self.static_dir = Path(static_dir) if static_dir else None
+        self.bundles = bundles or {}
+        self.bundle = bundle
+        # 处理后的文件内容 {相对路径: 内容}，只包含与源文件不同的文件和脚本包
+        self.contents: Dict[str, str] = {}
+        # 指纹清单 {原始相对路径: 带哈希的相对路径}
+        self.manifest: Dict[str, str] = {}
+
+        if self.static_dir is None or not self.static_dir.exists():
+            return
+        if not (minify or bundle or fingerprint):
+            return
+
+        sources = {
+            path.relative_to(self.static_dir).as_posix(): path
+            for path in sorted(self.static_dir.rglob('*')) if path.is_file()
+        }
+
+        if minify:
+            for rel_path, path in sources.items():
+                if path.suffix.lower() in MINIFIABLE_SUFFIXES:
+                    try:
+                        self.contents[rel_path] = minify_asset(rel_path, path.read_text(encoding='utf-8'))
+                    except MinifyError as e:
+                        raise AssetError(f"压缩 {rel_path} 失败: {e}")
+
+        if bundle:
+            for name, scripts in self.bundles.items():
+                parts = []
+                for script in scripts:
+                    if script not in sources:
+                        raise AssetError(f"脚本包 {name} 引用的文件不存在: {script}")
+                    content = self.contents.get(script)
+                    if content is None:
+                        content = sources[script].read_text(encoding='utf-8')
+                    parts.append(content.rstrip())
+                # 用分号分隔，避免前一个文件末尾缺少分号时与下一个文件连在一起
+                self.contents[self.bundle_path(name)] = '\n;\n'.join(parts) + '\n'
+
+        if fingerprint:
+            for rel_path in sorted(set(sources) | set(self.contents)):
+                if rel_path in self.contents:
+                    data = self.contents[rel_path].encode('utf-8')
+                else:
+                    data = sources[rel_path].read_bytes()
+                self.manifest[rel_path] = fingerprint_name(rel_path, data)
+
+    @staticmethod
+    def bundle_path(name: str) -> str:
+        """获取脚本包的相对路径"""
+        return f'{BUNDLE_DIR}/{name}.js'
+
+    def url_path(self, rel_path: str) -> str:
+        """获取资源在输出目录中的相对路径（启用指纹时为带哈希的路径）"""
+        return self.manifest.get(rel_path, rel_path)
+
+    def scripts(self, page_type: str = DEFAULT_BUNDLE) -> List[str]:
+        """
+        获取页面需要加载的脚本
+
+        Args:
+            page_type: 页面类型，没有对应的脚本包时使用 default
+
+        Returns:
+            按加载顺序排列的脚本相对路径；启用打包时只有一个脚本包
+        """
+        name = page_type if page_type in self.bundles else DEFAULT_BUNDLE
+        if name not in self.bundles:
+            return []
+        if self.bundle:
+            return [self.bundle_path(name)]
+        return list(self.bundles[name])
@@ -0,0 +1,102 @@
+"""
+构建缓存模块
+负责在多次构建之间持久化中间结果，避免重复计算
+"""
+import hashlib
+import os
+import pickle
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, Optional
+
+# 默认缓存目录（相对于博客项目根目录）
+DEFAULT_CACHE_DIR = '.mblog-cache'
+
+
+def hash_bytes(*parts: Any) -> str:
+    """
+    计算多个数据片段的 SHA-256 摘要
+
+    Args:
+        parts: 数据片段，bytes 直接参与计算，其他类型先转换为字符串
+
+    Returns:
+        十六进制摘要字符串
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        if not isinstance(part, bytes):
+            part = str(part).encode('utf-8')
+        # 写入长度前缀，避免不同片段拼接后产生相同的输入
+        digest.update(len(part).to_bytes(8, 'big'))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+class BuildCache:
+    """基于键的磁盘缓存，每个条目保存为一个独立文件"""
+
+    def __init__(self, cache_dir: str, namespace: str):
+        """
+        初始化缓存
+
+        Args:
+            cache_dir: 缓存根目录
+            namespace: 缓存命名空间（子目录名），用于隔离不同类型的缓存
+        """
+        self.root = Path(cache_dir) / namespace
+
+    def _entry_path(self, key: str) -> Path:
+        """获取缓存条目的文件路径（按键前缀分桶，避免单个目录文件过多）"""
+        return self.root / key[:2] / f'{key}.pickle'
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        读取缓存条目
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            缓存的值，条目不存在或已损坏时返回 None
+        """
+        entry_path = self._entry_path(key)
+        try:
+            with open(entry_path, 'rb') as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # 损坏的缓存条目视为未命中
+            return None
+
+    def set(self, key: str, value: Any) -> None:
+        """
+        写入缓存条目
+
+        先写入临时文件再原子替换，多个进程同时写入同一条目也不会产生半写文件。
+        缓存写入失败不影响构建，错误会被忽略。
+
+        Args:
+            key: 缓存键
+            value: 可被 pickle 序列化的值
+        """
+        entry_path = self._entry_path(key)
+        try:
+            entry_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=entry_path.parent, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_path, entry_path)
+            except Exception:
+                os.unlink(tmp_path)
+                raise
+        except Exception:
+            pass
+
+    def clear(self) -> None:
+        """清空当前命名空间下的所有缓存条目"""
+        if self.root.exists():
+            shutil.rmtree(self.root)
@@ -0,0 +1,201 @@
+"""
+预压缩模块
+负责为文本输出文件生成 .gz 和 .br 预压缩文件，供支持预压缩的静态服务器直接使用
+"""
+import gzip
+import json
+import os
+import stat
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .cache import hash_bytes
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# 需要预压缩的文件类型
+COMPRESSIBLE_SUFFIXES = {'.html', '.css', '.js', '.json', '.xml'}
+
+# 预压缩清单文件名（位于缓存目录中），记录每个文件压缩时的源文件摘要
+PRECOMPRESS_MANIFEST_FILE = 'precompress-manifest.json'
+
+# 压缩任务: (文件路径, 上次压缩时的摘要, 压缩格式)
+CompressJob = Tuple[str, Optional[str], Tuple[str, ...]]
+
+
+class CompressionError(Exception):
+    """预压缩错误"""
+    pass
+
+
+def available_encodings() -> Tuple[str, ...]:
+    """
+    获取可用的压缩格式
+
+    Returns:
+        压缩文件扩展名列表，安装了 brotli 时包含 'br'
+    """
+    return ('gz', 'br') if brotli is not None else ('gz',)
+
+
+def is_compressible(path: Path) -> bool:
+    """判断文件是否需要预压缩"""
+    return path.suffix.lower() in COMPRESSIBLE_SUFFIXES
+
+
+def compress_bytes(data: bytes, encoding: str) -> bytes:
+    """
+    按指定格式压缩数据
+
+    gzip 头部不写入文件名和修改时间，相同输入总是得到相同输出。
+
+    Args:
+        data: 原始数据
+        encoding: 压缩格式（'gz' 或 'br'）
+
+    Returns:
+        压缩后的数据
+    """
+    if encoding == 'gz':
+        return gzip.compress(data, compresslevel=9, mtime=0)
+    if encoding == 'br' and brotli is not None:
+        return brotli.compress(data, mode=brotli.MODE_TEXT)
+    raise CompressionError(f"不支持的压缩格式: {encoding}")
+
+
+def compress_file(path: Path, previous_digest: Optional[str],
+                  encodings: Tuple[str, ...]) -> Tuple[str, bool]:
+    """
+    为单个文件生成预压缩文件
+
+    源文件摘要与上次相同且预压缩文件都存在时跳过。
+
+    Args:
+        path: 源文件路径
+        previous_digest: 上次压缩时的源文件摘要
+        encodings: 压缩格式
+
+    Returns:
+        (源文件摘要, 是否重新压缩)
+    """
+    data = path.read_bytes()
+    digest = hash_bytes(data, *encodings)
+    siblings = [path.with_name(f'{path.name}.{encoding}') for encoding in encodings]
+
+    if digest == previous_digest and all(sibling.exists() for sibling in siblings):
+        return digest, False
+
+    # 预压缩文件使用与源文件相同的权限（mkstemp 创建的文件只有当前用户可读）
+    mode = stat.S_IMODE(path.stat().st_mode)
+    for encoding, sibling in zip(encodings, siblings):
+        fd, tmp_path = tempfile.mkstemp(dir=str(path.parent), prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(compress_bytes(data, encoding))
+            os.chmod(tmp_path, mode)
+            os.replace(tmp_path, sibling)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+    return digest, True
+
+
+def _run_compress_job(job: CompressJob) -> Tuple[str, bool]:
+    """在工作进程中执行压缩任务"""
+    path, previous_digest, encodings = job
+    return compress_file(Path(path), previous_digest, encodings)
+
+
+class Precompressor:
+    """批量生成预压缩文件，支持并行压缩和跳过未变化的文件"""
+
+    def __init__(self, output_dir: Path, cache_dir: Optional[str] = None, workers: int = 1):
+        """
+        初始化预压缩器
+
+        Args:
+            output_dir: 输出目录
+            cache_dir: 缓存目录，为 None 时每次都重新压缩所有文件
+            workers: 并行压缩使用的进程数
+        """
+        self.output_dir = Path(output_dir)
+        self.manifest_path = Path(cache_dir) / PRECOMPRESS_MANIFEST_FILE if cache_dir else None
+        self.workers = workers
+        self.encodings = available_encodings()
+
+    def sibling_paths(self, path: Path) -> List[Path]:
+        """获取文件对应的所有预压缩文件路径"""
+        return [path.with_name(f'{path.name}.{encoding}') for encoding in self.encodings]
+
+    def run(self, paths: List[Path]) -> Tuple[int, int]:
+        """
+        为指定文件生成预压缩文件
+
+        Args:
+            paths: 输出目录中的文件路径
+
+        Returns:
+            (重新压缩的文件数, 跳过的文件数)
+
+        Raises:
+            CompressionError: 压缩失败
+        """
+        previous = self._load_manifest()
+        keys = [path.relative_to(self.output_dir).as_posix() for path in paths]
+        jobs = [(str(path), previous.get(key), self.encodings) for path, key in zip(paths, keys)]
+
+        try:
+            results = self._run_jobs(jobs)
+        except (OSError, CompressionError) as e:
+            raise CompressionError(f"预压缩失败: {e}")
+
+        self._save_manifest({key: digest for key, (digest, _) in zip(keys, results)})
+        compressed = sum(1 for _, changed in results if changed)
+        return compressed, len(results) - compressed
+
+    def _run_jobs(self, jobs: List[CompressJob]) -> List[Tuple[str, bool]]:
+        """执行压缩任务，进程池不可用时回退到顺序执行"""
+        executor = None
+        if self.workers > 1 and len(jobs) > 1:
+            try:
+                executor = ProcessPoolExecutor(max_workers=self.workers)
+            except (OSError, ImportError, NotImplementedError) as e:
+                print(f"  警告: 无法启动并行压缩，改为顺序压缩: {e}")
+
+        if executor is None:
+            return [_run_compress_job(job) for job in jobs]
+
+        with executor:
+            chunksize = max(1, len(jobs) // (self.workers * 4))
+            try:
+                return list(executor.map(_run_compress_job, jobs, chunksize=chunksize))
+            except BrokenProcessPool as e:
+                raise CompressionError(f"并行压缩进程异常退出: {e}")
+
+    def _load_manifest(self) -> Dict[str, str]:
+        """读取上次的预压缩清单"""
+        if self.manifest_path is None or not self.manifest_path.exists():
+            return {}
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception:
+            return {}
+
+    def _save_manifest(self, manifest: Dict[str, str]) -> None:
+        """保存本次的预压缩清单"""
+        if self.manifest_path is None:
+            return
+        try:
+            self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.manifest_path, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, ensure_ascii=False)
+        except Exception as e:
+            print(f"  警告: 无法保存预压缩清单: {e}")
@@ -0,0 +1,125 @@
+"""
+文件复制模块
+负责把图片和静态资源放入输出目录，支持硬链接和 reflink（写时复制）以避免复制文件内容
+"""
+import errno
+import filecmp
+import os
+import shutil
+from pathlib import Path
+from typing import Optional, Set
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# 支持的复制方式
+COPY_MODES = ('copy', 'hardlink', 'reflink')
+
+# Linux 的 FICLONE ioctl（linux/fs.h），在 btrfs、XFS 等支持写时复制的文件系统上共享数据块
+FICLONE = 0x40049409
+
+
+def reflink_file(src: Path, dest: Path) -> None:
+    """
+    以 reflink 方式复制文件
+
+    新文件与源文件共享数据块，修改其中一个不会影响另一个。修改时间等属性从源文件复制。
+
+    Args:
+        src: 源文件路径
+        dest: 目标文件路径（不能已存在）
+
+    Raises:
+        OSError: 平台或文件系统不支持 reflink
+    """
+    if fcntl is None:
+        raise OSError(errno.EOPNOTSUPP, "当前平台不支持 reflink")
+
+    with open(src, 'rb') as src_file, open(dest, 'xb') as dest_file:
+        fcntl.ioctl(dest_file.fileno(), FICLONE, src_file.fileno())
+    shutil.copystat(src, dest)
+
+
+def is_unchanged(src: Path, dest: Path) -> bool:
+    """
+    判断输出文件是否与源文件相同
+
+    指向同一个 inode（硬链接）时直接认为相同；否则大小和修改时间相同时认为相同，
+    不同时逐字节比较。
+
+    Args:
+        src: 源文件路径
+        dest: 输出文件路径
+
+    Returns:
+        输出文件存在且内容与源文件相同
+    """
+    try:
+        dest_stat = dest.stat()
+    except FileNotFoundError:
+        return False
+    src_stat = src.stat()
+    if (src_stat.st_dev, src_stat.st_ino) == (dest_stat.st_dev, dest_stat.st_ino):
+        return True
+    return filecmp.cmp(src, dest, shallow=True)
+
+
+class FileCopier:
+    """按配置的方式把文件放入输出目录，硬链接或 reflink 不可用时回退到复制"""
+
+    def __init__(self, mode: str = 'copy'):
+        """
+        初始化复制器
+
+        Args:
+            mode: 复制方式（'copy'、'hardlink' 或 'reflink'），无效时使用 'copy'
+        """
+        if mode not in COPY_MODES:
+            print(f"  警告: 无效的复制方式 {mode!r}，改为复制文件")
+            mode = 'copy'
+        self.mode = mode
+        # 链接失败过的方式，本次构建的其余文件直接复制，避免每个文件都重试
+        self._failed_modes: Set[str] = set()
+
+    def copy(self, src: Path, dest: Path, mode: Optional[str] = None) -> str:
+        """
+        把源文件放入输出目录
+
+        先链接到临时文件再替换目标文件，已有的输出文件即使是指向源文件的硬链接，
+        也不会被原地改写。
+
+        Args:
+            src: 源文件路径
+            dest: 目标文件路径
+            mode: 本次使用的复制方式，None 表示使用初始化时的方式
+
+        Returns:
+            实际使用的复制方式
+        """
+        mode = mode or self.mode
+        dest.parent.mkdir(parents=True, exist_ok=True)
+
+        if mode != 'copy' and mode not in self._failed_modes:
+            tmp_path = dest.with_name(f'.tmp-{dest.name}')
+            try:
+                if tmp_path.exists():
+                    tmp_path.unlink()
+                if mode == 'hardlink':
+                    os.link(src, tmp_path)
+                else:
+                    reflink_file(src, tmp_path)
+                os.replace(tmp_path, dest)
+                return mode
+            except OSError as e:
+                if tmp_path.exists():
+                    tmp_path.unlink()
+                self._failed_modes.add(mode)
+                print(f"  警告: 无法使用 {mode} 方式，改为复制文件: {e}")
+
+        # 目标文件可能是上次构建创建的硬链接，先删除再复制，避免改写源文件
+        if dest.is_file() and dest.stat().st_nlink > 1:
+            dest.unlink()
+        shutil.copy2(src, dest)
+        return 'copy'
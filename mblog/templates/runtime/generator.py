@@ -2,14 +2,33 @@
 静态文件生成模块
 负责生成最终的静态 HTML 文件和复制静态资源
 """
+import json
+import os
+import pickle
 import shutil
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import Iterable, Iterator, List, Dict, Any, Optional, Tuple
 
+from .assets import ASSET_MANIFEST_FILE
+from .cache import DEFAULT_CACHE_DIR, hash_bytes
+from .compressor import Precompressor, is_compressible
+from .copier import FileCopier, is_unchanged
+from .images import ImageError, ImagePipeline, variant_path
 from .config import Config
 from .theme import Theme
 from .renderer import Renderer
-from .markdown_processor import Post
+from .markdown_processor import Post, PostSummary, TagTable
+from .profiler import get_profiler, profile_phase, profile_step
+from .site_index import SiteIndex
+from .search_index import SEARCH_SHARD_DIR, SearchIndexBuilder, encode_posts, html_to_text
+
+# 增量构建清单文件名（位于缓存目录中）
+BUILD_MANIFEST_FILE = 'build-manifest.json'
+
+# 页面生成任务: (页面类型, 输出路径, 参数)
+PageJob = Tuple[str, Path, Any]
 
 
 class GenerationError(Exception):
@@ -33,11 +52,97 @@ class StaticGenerator:
         self.config = config
         self.theme = theme
         self.renderer = renderer
+        # 列表页、订阅和搜索索引使用的文章摘要（与 posts 顺序相同），标签按编号保存在标签表中
+        self.tag_table = TagTable()
+        # 文章摘要的标签、归档和标签文件名索引，各生成阶段共用
+        self.site_index = SiteIndex()
         self.posts = posts
         
         # 获取输出目录
         output_dir = self.config.get('build.output_dir', 'public')
         self.output_dir = Path(output_dir)
+        
+        # 增量构建：只重新生成依赖发生变化的页面
+        self.incremental = bool(self.config.get('build.incremental', False))
+        cache_dir = self.config.get('build.cache_dir', DEFAULT_CACHE_DIR)
+        self.manifest_path = Path(cache_dir) / BUILD_MANIFEST_FILE
+        
+        # 只写入内容发生变化的文件，未变化的文件保留原有的修改时间和 inode
+        self.write_if_changed = bool(self.config.get('build.write_if_changed', False))
+        
+        # 图片和静态资源的复制方式：复制、硬链接或 reflink
+        self.copier = FileCopier(self.config.get('build.copy_mode', 'copy'))
+        
+        # 内容相同的图片只复制一份
+        self.dedupe_images = bool(self.config.get('build.dedupe_images', False))
+        
+        # 上次构建的输出清单 {输出相对路径: 依赖指纹}
+        self._previous_outputs: Dict[str, Optional[str]] = {}
+        # 本次构建的输出清单
+        self._outputs: Dict[str, Optional[str]] = {}
+        self._skipped_count = 0
+        self._unchanged_count = 0
+        self._base_fingerprint = ""
+        self._post_digests: Dict[str, str] = {}
+        
+        # 并行生成页面使用的进程数（0 表示使用全部 CPU 核心）
+        workers = self.config.get('build.workers', 1)
+        self.workers = workers if workers else (os.cpu_count() or 1)
+        if get_profiler() is not None:
+            # 性能分析时顺序生成，使耗时和内存分配可以归属到每篇文章
+            self.workers = 1
+        self._executor: Optional[ProcessPoolExecutor] = None
+        
+        # 为文本输出生成 .gz / .br 预压缩文件
+        self.precompress = bool(self.config.get('build.precompress', False))
+        self.precompressor = Precompressor(self.output_dir, cache_dir, self.workers)
+        
+        # 为文章图片生成不同宽度的版本并改写为 srcset
+        self.image_pipeline: Optional[ImagePipeline] = None
+        if self.config.get('build.responsive_images', False):
+            self.image_pipeline = ImagePipeline(
+                cache_dir, self.config.get('build.image_widths'), self.workers
+            )
+        # 所有文章引用的图片 {源文件路径: 输出文件路径}
+        self._post_images: Optional[Dict[Path, Path]] = None
+        # 已生成响应式版本的图片 {源文件路径: 图片信息}
+        self._image_variants: Dict[Path, Dict[str, Any]] = {}
+    
+    @property
+    def posts(self) -> List[Post]:
+        """文章列表（按日期降序）"""
+        return self._posts
+    
+    @posts.setter
+    def posts(self, posts: List[Post]) -> None:
+        self._posts = posts
+        self.summaries = [PostSummary.from_post(post, self.tag_table) for post in posts]
+    
+    @property
+    def summaries(self) -> List[PostSummary]:
+        """文章摘要（与 posts 顺序相同）"""
+        return self.site_index.posts
+    
+    @summaries.setter
+    def summaries(self, summaries: List[PostSummary]) -> None:
+        self.site_index = SiteIndex(summaries)
+    
+    def update_posts(self, added: List[Post], removed: Iterable[str] = ()) -> None:
+        """
+        增量更新文章列表（预览服务器监视到文章变化时）
+        
+        只为新增的文章创建摘要，站点索引只调整受影响的标签和归档分组。
+        
+        Args:
+            added: 新增或重新解析的文章
+            removed: 需要移除的文章的相对路径（重新解析的文章也要先移除）
+        """
+        removed = set(removed)
+        self.site_index.update([PostSummary.from_post(post, self.tag_table) for post in added], removed)
+        
+        by_path = {post.relative_path: post for post in self._posts if post.relative_path not in removed}
+        by_path.update((post.relative_path, post) for post in added)
+        self._posts = [by_path[summary.relative_path] for summary in self.summaries]
     
     def generate(self) -> bool:
         """
@@ -52,15 +157,33 @@ class StaticGenerator:
         try:
             print("开始生成静态文件...")
             
-            # 1. 准备输出目录
-            self._prepare_output_dir()
+            # 1. 生成响应式图片（需在计算文章摘要之前，摘要包含改写后的 <img>）
+            if self.image_pipeline is not None:
+                with profile_phase('responsive_images'):
+                    self._prepare_responsive_images()
+            
+            # 2. 准备输出目录
+            with profile_phase('prepare_output'):
+                self._prepare_output_dir()
             
-            # 2. 复制静态资源
-            self._copy_static_assets()
+            # 3. 复制静态资源
+            with profile_phase('static_assets'):
+                self._copy_static_assets()
             
-            # 3. 生成所有页面
+            # 4. 生成所有页面
             self._generate_pages()
             
+            # 5. 生成预压缩文件
+            if self.precompress:
+                with profile_phase('precompress'):
+                    self._precompress_outputs()
+            
+            # 6. 清理过期输出并保存构建清单
+            if self._keeps_output_dir():
+                with profile_phase('cleanup'):
+                    self._remove_stale_outputs()
+                    self._save_manifest()
+            
             print(f"✓ 静态文件生成完成，输出目录: {self.output_dir}")
             return True
             
@@ -71,22 +194,49 @@ class StaticGenerator:
         """
         准备输出目录
         
-        如果目录存在，清空内容；如果不存在，创建目录
+        如果目录存在，清空内容；如果不存在，创建目录。
+        增量模式下如果存在上次构建的清单，则保留现有内容。
+        只写入变化的文件时总是保留现有内容，没有清单时把现有文件都视为上次的输出，
+        由清理步骤删除本次不再生成的文件。
         """
-        if self.output_dir.exists():
+        if self._keeps_output_dir():
+            self._previous_outputs = self._load_manifest()
+            if not self._previous_outputs and self.write_if_changed:
+                self._previous_outputs = self._scan_output_dir()
+        
+        if self.incremental:
+            self._base_fingerprint = self._compute_base_fingerprint()
+            self._post_digests = {
+                post.relative_path: self._post_digest(post) for post in self.posts
+            }
+        
+        if self.output_dir.exists() and not self._previous_outputs:
             # 清空现有内容
             shutil.rmtree(self.output_dir)
         
         # 创建输出目录
         self.output_dir.mkdir(parents=True, exist_ok=True)
         
-        print(f"✓ 输出目录已准备: {self.output_dir}")
+        if self._previous_outputs:
+            mode = '增量模式' if self.incremental else '只写入变化的文件'
+            print(f"✓ 输出目录已准备（{mode}）: {self.output_dir}")
+        else:
+            print(f"✓ 输出目录已准备: {self.output_dir}")
     
     def _copy_static_assets(self) -> None:
+        """复制静态资源（主题的 CSS、JS 等，以及文章中引用的图片）"""
+        self._copy_theme_assets()
+        self._copy_post_images()
+    
+    def _copy_theme_assets(self) -> None:
         """
-        复制静态资源（CSS、JS、图片等）
+        复制主题的静态资源
         
-        从主题的 static 目录复制到输出目录的 static 目录
+        从主题的 static 目录复制到输出目录的 static 目录。
+        启用资源压缩时写入压缩后的 CSS 和 JS，启用脚本打包时额外写入
+        static/bundles 中的脚本包。启用资源指纹时，每个文件还会以带内容哈希的
+        文件名再写入一份，并在输出目录写入资源清单 asset-manifest.json。
+        原始文件名保留，以便 CSS 中的相对路径引用继续有效。
         """
         static_src = self.theme.get_static_dir()
         
@@ -94,15 +244,33 @@ class StaticGenerator:
             print("  主题没有静态资源目录，跳过")
         else:
             static_dest = self.output_dir / 'static'
+            assets = self.renderer.assets
             
             try:
-                shutil.copytree(static_src, static_dest)
+                sources = {
+                    static_file.relative_to(static_src).as_posix(): static_file
+                    for static_file in sorted(Path(static_src).rglob('*'))
+                    if static_file.is_file()
+                }
+                for rel_path in sorted(set(sources) | set(assets.contents)):
+                    targets = [rel_path]
+                    if rel_path in assets.manifest:
+                        targets.append(assets.manifest[rel_path])
+                    for target in targets:
+                        if rel_path in assets.contents:
+                            self._write_file(static_dest / target, assets.contents[rel_path])
+                        else:
+                            self._copy_file(sources[rel_path], static_dest / target)
                 print(f"✓ 静态资源已复制: {static_src} -> {static_dest}")
             except Exception as e:
                 raise GenerationError(f"复制静态资源失败: {e}")
-        
-        # 复制文章中引用的图片
-        self._copy_post_images()
+            
+            if assets.contents:
+                print(f"  ✓ 静态资源处理: {len(assets.contents)} 个文件已压缩或打包")
+            if assets.manifest:
+                manifest_content = json.dumps(assets.manifest, ensure_ascii=False, indent=2, sort_keys=True)
+                self._write_file(self.output_dir / ASSET_MANIFEST_FILE, manifest_content)
+                print(f"  ✓ 静态资源指纹: {len(assets.manifest)} 个文件")
     
     def _generate_pages(self) -> None:
         """
@@ -119,28 +287,40 @@ class StaticGenerator:
         """
         print("开始生成页面...")
         
-        # 生成首页和分页
-        self._generate_index_pages()
-        
-        # 生成文章详情页
-        self._generate_post_pages()
-        
-        # 生成标签相关页面
-        self._generate_tag_pages()
+        # 首页、文章页和标签页相互独立，可以共用一个进程池并行生成
+        self._start_workers()
+        try:
+            # 生成首页和分页
+            with profile_phase('index_pages'):
+                self._generate_index_pages()
+            
+            # 生成文章详情页
+            with profile_phase('post_pages'):
+                self._generate_post_pages()
+            
+            # 生成标签相关页面
+            with profile_phase('tag_pages'):
+                self._generate_tag_pages()
+        finally:
+            self._stop_workers()
         
         # 生成归档页（可选）
-        self._generate_archive_page()
+        with profile_phase('archive_page'):
+            self._generate_archive_page()
         
         # 生成 RSS 订阅（可选）
         if self.config.get('build.generate_rss', True):
-            self._generate_rss()
+            with profile_phase('rss'):
+                self._generate_rss()
         
         # 生成 Sitemap（可选）
         if self.config.get('build.generate_sitemap', True):
-            self._generate_sitemap()
+            with profile_phase('sitemap'):
+                self._generate_sitemap()
         
         # 生成搜索索引
-        self._generate_search_index()
+        with profile_phase('search_index'):
+            self._generate_search_index()
         
         print(f"✓ 所有页面生成完成")
     
@@ -155,33 +335,34 @@ class StaticGenerator:
         
         if posts_per_page is None or posts_per_page <= 0:
             # 不分页，生成单个首页
-            html = self.renderer.render_index(self.posts)
             index_path = self.output_dir / 'index.html'
-            self._write_file(index_path, html)
+            if not self._is_up_to_date(index_path, self._fingerprint('index', self.summaries)):
+                self._run_page_jobs([('index', index_path, None)])
             print(f"  ✓ 首页: index.html")
         else:
             # 分页
-            total_posts = len(self.posts)
+            total_posts = len(self.summaries)
             total_pages = (total_posts + posts_per_page - 1) // posts_per_page
             
+            jobs: List[PageJob] = []
             for page in range(1, total_pages + 1):
-                html = self.renderer.render_index(
-                    self.posts, 
-                    page=page, 
-                    posts_per_page=posts_per_page
-                )
-                
                 if page == 1:
                     # 第一页作为首页
                     index_path = self.output_dir / 'index.html'
                 else:
                     # 其他页面放在 page 目录下
-                    page_dir = self.output_dir / 'page'
-                    page_dir.mkdir(exist_ok=True)
-                    index_path = page_dir / f'{page}.html'
+                    index_path = self.output_dir / 'page' / f'{page}.html'
                 
-                self._write_file(index_path, html)
+                # 分页只依赖本页的文章和总页数
+                start_idx = (page - 1) * posts_per_page
+                page_posts = self.summaries[start_idx:start_idx + posts_per_page]
+                fingerprint = self._fingerprint('index', page_posts, page, total_pages, total_posts)
+                if self._is_up_to_date(index_path, fingerprint):
+                    continue
+                
+                jobs.append(('index', index_path, (page, posts_per_page)))
             
+            self._run_page_jobs(jobs)
             print(f"  ✓ 首页和分页: {total_pages} 页")
     
     def _generate_post_pages(self) -> None:
@@ -192,14 +373,17 @@ class StaticGenerator:
         使用 relative_path 来确定输出路径
         """
         posts_dir = self.output_dir / 'posts'
-        posts_dir.mkdir(exist_ok=True)
         
-        for post in self.posts:
-            html = self.renderer.render_post(post)
+        jobs: List[PageJob] = []
+        for index, post in enumerate(self.posts):
             # 使用 relative_path 保留目录结构
             post_path = posts_dir / f'{post.relative_path}.html'
-            self._write_file(post_path, html)
+            if self._is_up_to_date(post_path, self._fingerprint('post', [post])):
+                continue
+            
+            jobs.append(('post', post_path, index))
         
+        self._run_page_jobs(jobs)
         print(f"  ✓ 文章详情页: {len(self.posts)} 篇")
     
     def _generate_tag_pages(self) -> None:
@@ -211,33 +395,37 @@ class StaticGenerator:
         - 每个标签的文章列表页
         """
         # 获取所有标签
-        tags_map = self.renderer.get_all_tags(self.posts)
+        tags_map = self.site_index.tags
         
         if not tags_map:
             print("  没有标签，跳过标签页生成")
             return
         
         tags_dir = self.output_dir / 'tags'
-        tags_dir.mkdir(exist_ok=True)
         
         # 生成标签索引页
         try:
-            tags_index_html = self.renderer.render_tags_index(tags_map)
             tags_index_path = tags_dir / 'index.html'
-            self._write_file(tags_index_path, tags_index_html)
+            if not self._is_up_to_date(tags_index_path, self._fingerprint('tags', self.summaries)):
+                tags_index_html = self.renderer.render_tags_index(tags_map)
+                self._write_file(tags_index_path, tags_index_html)
         except Exception as e:
             # 如果没有标签索引模板，跳过
             print(f"  跳过标签索引页: {e}")
         
         # 生成每个标签的页面
+        jobs: List[PageJob] = []
         for tag, posts in tags_map.items():
             # 标签名转换为文件名（处理特殊字符）
-            tag_filename = self._sanitize_filename(tag)
+            tag_filename = self.site_index.tag_filename(tag)
             
-            html = self.renderer.render_tag_page(tag, posts)
             tag_path = tags_dir / f'{tag_filename}.html'
-            self._write_file(tag_path, html)
+            if self._is_up_to_date(tag_path, self._fingerprint('tag', posts, tag)):
+                continue
+            
+            jobs.append(('tag', tag_path, (tag, [self.site_index.index_of(post) for post in posts])))
         
+        self._run_page_jobs(jobs)
         print(f"  ✓ 标签页: {len(tags_map)} 个标签")
     
     def _generate_archive_page(self) -> None:
@@ -247,106 +435,549 @@ class StaticGenerator:
         显示按时间组织的所有文章
         """
         try:
-            html = self.renderer.render_archive(self.posts)
             archive_path = self.output_dir / 'archive.html'
-            self._write_file(archive_path, html)
+            if not self._is_up_to_date(archive_path, self._fingerprint('archive', self.summaries)):
+                html = self.renderer.render_archive(self.summaries, archive=self.site_index.archive)
+                self._write_file(archive_path, html)
             print(f"  ✓ 归档页: archive.html")
         except Exception as e:
             # 如果没有归档模板，跳过
             print(f"  跳过归档页: {e}")
     
-    def _write_file(self, filepath: Path, content: str) -> None:
+    def _start_workers(self) -> None:
+        """
+        启动页面生成进程池
+        
+        每个工作进程根据配置和主题重新创建渲染器和生成器，
+        文章列表只在进程启动时传递一次。进程池不可用时回退到顺序生成。
+        """
+        if self.workers <= 1 or len(self.summaries) <= 1:
+            return
+        
+        try:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker_generator,
+                initargs=(type(self), type(self.renderer), self.renderer.cache_dir,
+                          self.config, self.theme, self.posts, self.summaries)
+            )
+        except (OSError, ImportError, NotImplementedError) as e:
+            print(f"  警告: 无法启动并行生成，改为顺序生成: {e}")
+            self._executor = None
+    
+    def _stop_workers(self) -> None:
+        """关闭页面生成进程池"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+    
+    def _run_page_jobs(self, jobs: List[PageJob]) -> None:
+        """
+        执行页面生成任务（渲染并写入）
+        
+        进程池可用时并行执行。无论是否并行，出错时都按任务顺序报告第一个错误，
+        保证错误信息是确定的。
+        
+        Args:
+            jobs: 页面生成任务列表
+            
+        Raises:
+            RendererError, GenerationError: 渲染或写入失败
+        """
+        if not jobs:
+            return
+        
+        if self._executor is None or len(jobs) == 1:
+            for job in jobs:
+                self._run_page_job(job)
+        else:
+            chunksize = max(1, len(jobs) // (self.workers * 4))
+            try:
+                results = list(self._executor.map(_run_page_job_in_worker, jobs, chunksize=chunksize))
+            except BrokenProcessPool as e:
+                raise GenerationError(f"并行生成进程异常退出: {e}")
+            
+            for _, error in results:
+                if error is not None:
+                    raise error
+            
+            # 工作进程中的统计不会传回，在主进程中累计未变化的文件数
+            self._unchanged_count += sum(1 for written, _ in results if not written)
+        
+        for _, filepath, _ in jobs:
+            self._record_output(filepath)
+    
+    def _run_page_job(self, job: PageJob) -> bool:
+        """
+        渲染并写入单个页面
+        
+        Args:
+            job: 页面生成任务
+            
+        Returns:
+            是否实际写入了文件
+        """
+        kind, filepath, arg = job
+        
+        # 性能分析时文章页按文章相对路径记录，其他页面按输出路径记录
+        if kind == 'post':
+            profile_key = self.posts[arg].relative_path
+        else:
+            profile_key = filepath.relative_to(self.output_dir).as_posix()
+        
+        with profile_step('render', profile_key):
+            if kind == 'index':
+                if arg is None:
+                    html = self.renderer.render_index(self.summaries)
+                else:
+                    page, posts_per_page = arg
+                    html = self.renderer.render_index(self.summaries, page=page, posts_per_page=posts_per_page)
+            elif kind == 'post':
+                post = self.posts[arg]
+                html = self.renderer.render_post(post)
+                # 文章页是最后一个需要完整正文的页面，渲染后释放按需加载的正文
+                post.release()
+            elif kind == 'tag':
+                tag, indexes = arg
+                html = self.renderer.render_tag_page(tag, [self.summaries[i] for i in indexes])
+            else:
+                raise GenerationError(f"未知的页面类型: {kind}")
+        
+        with profile_step('write', profile_key):
+            return self._write_file(filepath, html)
+    
+    def _write_file(self, filepath: Path, content: str) -> bool:
         """
         写入文件
         
+        启用 build.write_if_changed 时，内容与现有文件相同则跳过写入。
+        
         Args:
             filepath: 文件路径
             content: 文件内容
             
+        Returns:
+            是否实际写入了文件
+            
         Raises:
             GenerationError: 写入失败
         """
+        data = content.encode('utf-8')
+        written = False
+        
         try:
-            # 确保父目录存在
-            filepath.parent.mkdir(parents=True, exist_ok=True)
-            
-            # 写入文件
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(content)
+            if self.write_if_changed and self._has_same_content(filepath, data):
+                self._unchanged_count += 1
+            else:
+                # 确保父目录存在
+                filepath.parent.mkdir(parents=True, exist_ok=True)
+                
+                # 硬链接到源文件的旧输出不能原地改写，先删除
+                if filepath.is_file() and filepath.stat().st_nlink > 1:
+                    filepath.unlink()
+                
+                # 写入文件
+                with open(filepath, 'wb') as f:
+                    f.write(data)
+                written = True
         except Exception as e:
             raise GenerationError(f"写入文件失败 {filepath}: {e}")
+        
+        self._record_output(filepath)
+        return written
     
-    def _copy_post_images(self) -> None:
+    @staticmethod
+    def _has_same_content(filepath: Path, data: bytes) -> bool:
         """
-        复制文章中引用的图片到输出目录
+        判断现有文件的内容是否与要写入的内容相同
+        
+        先比较文件大小，大小相同时才读取文件比较内容。
+        
+        Args:
+            filepath: 文件路径
+            data: 要写入的内容
+            
+        Returns:
+            文件存在且内容相同时返回 True
+        """
+        try:
+            if filepath.stat().st_size != len(data):
+                return False
+            return filepath.read_bytes() == data
+        except OSError:
+            return False
+    
+    def _copy_file(self, src: Path, dest: Path, mode: Optional[str] = None) -> None:
+        """
+        复制文件到输出目录
+        
+        按 build.copy_mode 复制、硬链接或 reflink 源文件。保留输出目录时
+        （增量构建或 build.write_if_changed），目标文件与源文件相同则跳过。
         
-        将所有文章中引用的相对路径图片复制到 assets/images 目录
+        Args:
+            src: 源文件路径
+            dest: 目标文件路径
+            mode: 复制方式，None 表示使用 build.copy_mode
         """
-        images_dest = self.output_dir / 'assets' / 'images'
-        images_dest.mkdir(parents=True, exist_ok=True)
+        if self._keeps_output_dir() and is_unchanged(src, dest):
+            self._unchanged_count += 1
+        else:
+            self.copier.copy(src, dest, mode)
+        self._record_output(dest)
+    
+    def _record_output(self, filepath: Path, fingerprint: Optional[str] = None) -> None:
+        """
+        记录本次构建产生的输出文件
         
-        copied_count = 0
+        Args:
+            filepath: 输出文件路径
+            fingerprint: 依赖指纹，None 表示每次构建都重新生成
+        """
+        try:
+            key = filepath.relative_to(self.output_dir).as_posix()
+        except ValueError:
+            return
+        if fingerprint is not None or key not in self._outputs:
+            self._outputs[key] = fingerprint
+    
+    def _is_up_to_date(self, filepath: Path, fingerprint: str) -> bool:
+        """
+        判断输出文件是否可以沿用上次构建的结果
         
-        for post in self.posts:
-            if not post.images:
+        非增量模式下总是返回 False。无论结果如何，都会把输出记录到本次构建清单中。
+        
+        Args:
+            filepath: 输出文件路径
+            fingerprint: 输出依赖的指纹
+            
+        Returns:
+            依赖未变化且文件存在时返回 True
+        """
+        if not self.incremental:
+            return False
+        
+        self._record_output(filepath, fingerprint)
+        key = filepath.relative_to(self.output_dir).as_posix()
+        if self._previous_outputs.get(key) == fingerprint and filepath.exists():
+            self._skipped_count += 1
+            return True
+        return False
+    
+    def _fingerprint(self, kind: str, posts: List[Post], *extra: Any) -> str:
+        """
+        计算页面的依赖指纹
+        
+        页面依赖模板、配置、运行时版本（见 _compute_base_fingerprint）
+        以及页面中出现的文章。
+        
+        Args:
+            kind: 页面类型
+            posts: 页面依赖的文章（或文章摘要）列表
+            extra: 其他影响页面内容的参数（页码、标签名等）
+            
+        Returns:
+            指纹字符串
+        """
+        if not self.incremental:
+            return ""
+        digests = [self._post_digests.get(post.relative_path) or self._post_digest(post)
+                   for post in posts]
+        return hash_bytes(self._base_fingerprint, kind, *digests, *extra)
+    
+    def _post_digest(self, post: Post) -> str:
+        """
+        计算单篇文章的内容摘要
+        
+        计算后释放按需加载的正文（LazyPost），渲染文章页时重新加载。
+        
+        Args:
+            post: 文章对象
+            
+        Returns:
+            摘要字符串
+        """
+        metadata = json.dumps(post.metadata, sort_keys=True, ensure_ascii=False, default=str)
+        digest = hash_bytes(
+            post.relative_path, post.title, post.date.isoformat(), post.author,
+            post.description, '\x00'.join(post.tags), self.renderer.post_html(post),
+            post.encrypted, post.password, metadata
+        )
+        post.release()
+        return digest
+    
+    def _compute_base_fingerprint(self) -> str:
+        """
+        计算所有页面共同依赖的指纹
+        
+        包括主题模板和元数据、完整配置、静态资源指纹、渲染时的模板全局变量
+        （如 current_year）以及运行时源码。
+        
+        Returns:
+            指纹字符串
+        """
+        # 模板中的函数（url_for 等）由配置和运行时源码决定，只计入数据类的全局变量
+        render_globals = {
+            name: value for name, value in self.renderer.env.globals.items() if not callable(value)
+        }
+        parts: List[Any] = [
+            json.dumps(self.config.data, sort_keys=True, ensure_ascii=False, default=str),
+            json.dumps(self.renderer.assets.manifest, sort_keys=True),
+            json.dumps(render_globals, sort_keys=True, ensure_ascii=False, default=str),
+        ]
+        
+        theme_json = self.theme.theme_dir / 'theme.json'
+        if theme_json.exists():
+            parts.append(theme_json.read_bytes())
+        
+        templates_dir = Path(self.theme.get_templates_dir())
+        for template_file in sorted(templates_dir.rglob('*')):
+            if template_file.is_file():
+                parts.append(template_file.relative_to(templates_dir).as_posix())
+                parts.append(template_file.read_bytes())
+        
+        for runtime_file in sorted(Path(__file__).parent.glob('*.py')):
+            parts.append(runtime_file.read_bytes())
+        
+        return hash_bytes(*parts)
+    
+    def _keeps_output_dir(self) -> bool:
+        """是否保留输出目录的现有内容（通过构建清单删除过期文件）"""
+        return self.incremental or self.write_if_changed
+    
+    def _scan_output_dir(self) -> Dict[str, Optional[str]]:
+        """
+        列出输出目录中的现有文件
+        
+        Returns:
+            以输出相对路径为键、指纹为 None 的清单
+        """
+        if not self.output_dir.exists():
+            return {}
+        return {
+            path.relative_to(self.output_dir).as_posix(): None
+            for path in self.output_dir.rglob('*')
+            if path.is_file()
+        }
+    
+    def _load_manifest(self) -> Dict[str, Optional[str]]:
+        """
+        读取上次构建的输出清单
+        
+        Returns:
+            输出清单，不存在或输出目录已被删除时返回空字典
+        """
+        if not self.manifest_path.exists() or not self.output_dir.exists():
+            return {}
+        
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except Exception:
+            return {}
+        
+        # 清单属于其他输出目录时不能复用
+        if manifest.get('output_dir') != str(self.output_dir.resolve()):
+            return {}
+        return manifest.get('outputs', {})
+    
+    def _save_manifest(self) -> None:
+        """保存本次构建的输出清单"""
+        manifest = {
+            'output_dir': str(self.output_dir.resolve()),
+            'outputs': self._outputs,
+        }
+        try:
+            self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.manifest_path, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, ensure_ascii=False)
+        except Exception as e:
+            print(f"  警告: 无法保存构建清单: {e}")
+    
+    def _remove_stale_outputs(self) -> None:
+        """删除上次构建生成、本次构建不再生成的文件"""
+        removed_count = 0
+        
+        for key in self._previous_outputs:
+            if key in self._outputs:
                 continue
             
-            for img_path in post.images:
-                img_src = Path(img_path)
-                
-                if not img_src.exists():
-                    print(f"  警告: 图片不存在: {img_path}")
-                    continue
+            stale_path = self.output_dir / key
+            if stale_path.is_file():
+                stale_path.unlink()
+                removed_count += 1
                 
-                # 获取图片相对于 md 目录的路径
-                try:
-                    # 假设 md_dir 是 'md'
-                    md_dir = Path(self.config.get('build.md_dir', 'md')).resolve()
-                    rel_path = img_src.relative_to(md_dir)
-                    
-                    # 目标路径
-                    img_dest = images_dest / rel_path
-                    
-                    # 确保目标目录存在
-                    img_dest.parent.mkdir(parents=True, exist_ok=True)
-                    
-                    # 复制文件
-                    shutil.copy2(img_src, img_dest)
-                    copied_count += 1
-                    
-                except ValueError:
-                    # 图片不在 md_dir 下，跳过
-                    print(f"  警告: 图片不在 md 目录下: {img_path}")
-                    continue
-                except Exception as e:
-                    print(f"  警告: 复制图片失败 {img_path}: {e}")
-                    continue
+                # 删除因此变空的目录
+                parent = stale_path.parent
+                while parent != self.output_dir and parent.exists() and not any(parent.iterdir()):
+                    parent.rmdir()
+                    parent = parent.parent
         
-        if copied_count > 0:
-            print(f"✓ 文章图片已复制: {copied_count} 个文件")
+        if self._skipped_count > 0:
+            print(f"  ✓ 增量构建: 跳过 {self._skipped_count} 个未变化的页面")
+        if self._unchanged_count > 0:
+            print(f"  ✓ 内容未变化、跳过写入: {self._unchanged_count} 个文件")
+        if removed_count > 0:
+            print(f"  ✓ 已删除过期文件: {removed_count} 个")
+    
+    def _precompress_outputs(self) -> None:
+        """
+        为本次构建输出的 HTML、CSS、JS、JSON、XML 文件生成预压缩文件
+        
+        预压缩文件与源文件放在同一目录，文件名追加 .gz（安装了 brotli 时还有 .br）。
+        源文件内容未变化且预压缩文件存在时跳过压缩。
+        
+        Raises:
+            CompressionError: 压缩失败
+        """
+        paths = [self.output_dir / key for key in self._outputs if is_compressible(Path(key))]
+        compressed, skipped = self.precompressor.run(paths)
+        
+        for path in paths:
+            for sibling in self.precompressor.sibling_paths(path):
+                self._record_output(sibling)
+        
+        encodings = '/'.join(f'.{encoding}' for encoding in self.precompressor.encodings)
+        print(f"✓ 预压缩文件已生成（{encodings}）: {compressed} 个文件，跳过未变化的文件 {skipped} 个")
+    
+    def _collect_post_images(self) -> Dict[Path, Path]:
+        """
+        收集所有文章引用的图片
+        
+        多篇文章引用同一张图片时只收集一次，不存在或不在 md 目录下的图片只警告一次。
+        
+        Returns:
+            {图片源文件路径: 输出文件路径}，按首次引用的顺序排列
+        """
+        if self._post_images is not None:
+            return self._post_images
+        
+        md_dir = Path(self.config.get('build.md_dir', 'md')).resolve()
+        images_dest = self.output_dir / 'assets' / 'images'
+        images: Dict[Path, Path] = {}
+        seen = set()
+        
+        for img_path in self._post_image_paths():
+            if img_path in seen:
+                continue
+            seen.add(img_path)
+            
+            img_src = Path(img_path)
+            if not img_src.exists():
+                print(f"  警告: 图片不存在: {img_path}")
+                continue
+            
+            try:
+                rel_path = img_src.relative_to(md_dir)
+            except ValueError:
+                # 图片不在 md_dir 下，跳过
+                print(f"  警告: 图片不在 md 目录下: {img_path}")
+                continue
+            images[img_src] = images_dest / rel_path
+        
+        self._post_images = images
+        return images
     
-    def _sanitize_filename(self, name: str) -> str:
+    def _post_image_paths(self) -> Iterator[str]:
+        """按文章顺序列出文章中引用的图片路径（可能重复）"""
+        for post in self.posts:
+            yield from post.images
+    
+    def _find_duplicate_images(self, images: List[Path]) -> Dict[Path, Path]:
         """
-        清理文件名，移除或替换不安全的字符
+        查找内容相同但路径不同的图片
+        
+        先按文件大小分组，只对大小相同的文件计算内容哈希。
         
         Args:
-            name: 原始名称
+            images: 图片源文件路径
             
         Returns:
-            安全的文件名
+            {重复的图片: 内容相同且最先出现的图片}
+        """
+        by_size: Dict[int, List[Path]] = {}
+        for img_src in images:
+            by_size.setdefault(img_src.stat().st_size, []).append(img_src)
+        
+        duplicates: Dict[Path, Path] = {}
+        for group in by_size.values():
+            if len(group) < 2:
+                continue
+            first_by_digest: Dict[str, Path] = {}
+            for img_src in group:
+                canonical = first_by_digest.setdefault(hash_bytes(img_src.read_bytes()), img_src)
+                if canonical != img_src:
+                    duplicates[img_src] = canonical
+        return duplicates
+    
+    def _prepare_responsive_images(self) -> None:
+        """
+        生成文章图片的响应式版本，渲染文章页时把 <img> 改写为带 srcset 的标签
+        
+        图片版本按源图片内容哈希缓存在 build.cache_dir 中，只在第一次遇到该图片时生成。
+        改写在渲染时进行（见 Renderer.post_html），不修改文章对象，按需加载的正文仍可释放。
+        未安装 Pillow 时打印警告并保持原图。
+        """
+        images = self._collect_post_images()
+        if not images:
+            return
+        
+        try:
+            self._image_variants = self.image_pipeline.run(list(images))
+        except ImageError as e:
+            print(f"  警告: 跳过响应式图片: {e}")
+            return
+        
+        images_dest = self.output_dir / 'assets' / 'images'
+        self.renderer.responsive_images = {
+            images[img_src].relative_to(images_dest).as_posix(): info
+            for img_src, info in self._image_variants.items()
+        }
+        
+        variant_count = sum(len(info['variants']) for info in self._image_variants.values())
+        print(f"✓ 响应式图片: {len(self._image_variants)} 张图片, {variant_count} 个版本")
+    
+    def _copy_post_images(self) -> None:
+        """
+        复制文章中引用的图片到输出目录
+        
+        将所有文章中引用的相对路径图片复制到 assets/images 目录，每个文件只复制一次。
+        启用 build.responsive_images 时同时复制图片的各个宽度版本。
+        启用 build.dedupe_images 时，内容相同的图片只复制第一份，
+        其余路径以硬链接指向这一份（不支持时复制），页面中的图片 URL 保持不变。
         """
-        import re
+        images_dest = self.output_dir / 'assets' / 'images'
+        images_dest.mkdir(parents=True, exist_ok=True)
         
-        # 替换空格和特殊字符为连字符
-        safe_name = re.sub(r'[^\w\s\u4e00-\u9fff-]', '', name)
-        safe_name = re.sub(r'[\s_]+', '-', safe_name)
-        safe_name = safe_name.strip('-').lower()
+        images = self._collect_post_images()
+        duplicates: Dict[Path, Path] = {}
+        if self.dedupe_images:
+            try:
+                duplicates = self._find_duplicate_images(list(images))
+            except OSError as e:
+                print(f"  警告: 无法检查重复图片: {e}")
         
-        # 如果结果为空，使用默认名称
-        if not safe_name:
-            safe_name = 'tag'
+        copied_count = 0
+        for img_src, img_dest in images.items():
+            try:
+                if img_src in duplicates:
+                    self._copy_file(images[duplicates[img_src]], img_dest, mode='hardlink')
+                else:
+                    self._copy_file(img_src, img_dest)
+                copied_count += 1
+                
+                info = self._image_variants.get(img_src)
+                if info is not None:
+                    rel_path = img_dest.relative_to(images_dest).as_posix()
+                    for variant in info['variants']:
+                        variant_dest = images_dest / variant_path(rel_path, variant['width'], variant['suffix'])
+                        self._copy_file(self.image_pipeline.cached_file(info, variant), variant_dest)
+            except Exception as e:
+                print(f"  警告: 复制图片失败 {img_src}: {e}")
         
-        return safe_name
+        if copied_count > 0:
+            print(f"✓ 文章图片已复制: {copied_count} 个文件")
+        if duplicates:
+            print(f"  ✓ 内容重复的图片: {len(duplicates)} 个，已链接到相同内容的文件")
     
     def _generate_rss(self) -> None:
         """
@@ -381,12 +1012,12 @@ class StaticGenerator:
             ]
             
             # 添加文章（最多 20 篇）
-            for post in self.posts[:20]:
+            for index, post in enumerate(self.summaries[:20]):
                 post_url = f'{site_url}{base_path}/posts/{post.relative_path}.html'
                 pub_date = post.date.strftime('%a, %d %b %Y %H:%M:%S +0000')
                 
                 # 清理 HTML 内容作为描述
-                description = post.description or post.html[:200]
+                description = post.description or self._post_excerpt(index)
                 
                 rss_lines.extend([
                     '  <item>',
@@ -417,6 +1048,21 @@ class StaticGenerator:
         except Exception as e:
             print(f"  跳过 RSS 生成: {e}")
     
+    def _post_excerpt(self, index: int) -> str:
+        """
+        获取文章正文 HTML 的开头部分，作为没有描述的文章在订阅中的描述
+        
+        Args:
+            index: 文章下标
+            
+        Returns:
+            正文 HTML 的前 200 个字符
+        """
+        post = self.posts[index]
+        excerpt = post.html[:200]
+        post.release()
+        return excerpt
+    
     def _generate_sitemap(self) -> None:
         """
         生成 Sitemap 文件
@@ -474,7 +1120,7 @@ class StaticGenerator:
             ])
             
             # 所有文章
-            for post in self.posts:
+            for post in self.summaries:
                 post_url = f'{site_url}{base_path}/posts/{post.relative_path}.html'
                 lastmod = post.date.strftime('%Y-%m-%d')
                 
@@ -488,9 +1134,8 @@ class StaticGenerator:
                 ])
             
             # 所有标签页
-            tags_map = self.renderer.get_all_tags(self.posts)
-            for tag in tags_map.keys():
-                tag_filename = self._sanitize_filename(tag)
+            for tag in self.site_index.tags:
+                tag_filename = self.site_index.tag_filename(tag)
                 tag_url = f'{site_url}{base_path}/tags/{tag_filename}.html'
                 
                 sitemap_lines.extend([
@@ -517,7 +1162,10 @@ class StaticGenerator:
         """
         生成搜索索引 JSON 文件
         
-        创建包含所有文章元数据的 JSON 文件，用于客户端搜索功能
+        创建包含所有文章元数据的 JSON 文件，用于客户端搜索功能。
+        文章元数据按列编码（见 encode_posts），文章 URL 由 search.js 根据 base_path 和相对路径生成。
+        同时对标题、描述和正文建立倒排索引，加密文章只索引标题和描述。
+        倒排索引按索引词首字符分片写入 search-index/ 目录，由 search.js 按需加载。
         """
         try:
             import json
@@ -531,31 +1179,77 @@ class StaticGenerator:
             if base_path.endswith('/'):
                 base_path = base_path[:-1]
             
-            # 构建搜索索引数据
-            posts_data = []
-            for post in self.posts:
-                post_data = {
-                    'title': post.title,
-                    'url': f'{base_path}/posts/{post.relative_path}.html',
-                    'date': post.date.isoformat(),
-                    'tags': post.tags,
-                    'description': post.description,
-                    'relative_path': post.relative_path
-                }
-                posts_data.append(post_data)
+            # 构建倒排索引
+            index_builder = self._build_search_index()
+            
+            # 写入倒排索引分片
+            index_meta, shards = index_builder.build()
+            shard_dir = self.output_dir / SEARCH_SHARD_DIR
+            for shard_id, shard in shards.items():
+                shard_content = json.dumps(shard, ensure_ascii=False, separators=(',', ':'))
+                self._write_file(shard_dir / f'{shard_id}.json', shard_content)
             
             # 创建完整的索引对象
             search_index = {
-                'posts': posts_data,
+                'base_path': base_path,
+                **encode_posts(self.summaries),
+                'index': index_meta,
                 'generated_at': datetime.now().isoformat(),
-                'total_posts': len(posts_data)
+                'total_posts': len(self.summaries)
             }
             
             # 写入 JSON 文件
             index_path = self.output_dir / 'search-index.json'
-            json_content = json.dumps(search_index, ensure_ascii=False, indent=2)
+            json_content = json.dumps(search_index, ensure_ascii=False, separators=(',', ':'))
             self._write_file(index_path, json_content)
             
-            print(f"  ✓ 搜索索引: search-index.json ({len(posts_data)} 篇文章)")
+            print(f"  ✓ 搜索索引: search-index.json ({len(self.summaries)} 篇文章, {len(shards)} 个分片)")
         except Exception as e:
             print(f"  跳过搜索索引生成: {e}")
+
+    
+    def _build_search_index(self) -> SearchIndexBuilder:
+        """
+        对所有文章的标题、描述和正文建立倒排索引，加密文章只索引标题和描述
+        
+        Returns:
+            按文章顺序添加了所有文章的索引构建器
+        """
+        index_builder = SearchIndexBuilder()
+        for post in self.posts:
+            body = '' if post.encrypted else html_to_text(post.html)
+            post.release()
+            index_builder.add_post(post.title, post.description, body)
+        return index_builder
+
+
+# 工作进程中的生成器实例（由进程池的 initializer 创建）
+_worker_generator: Optional[StaticGenerator] = None
+
+
+def _init_worker_generator(generator_cls: type, renderer_cls: type, cache_dir: Optional[str],
+                           config: Config, theme: Theme, posts: List[Post],
+                           summaries: List[PostSummary]) -> None:
+    """在工作进程中创建独立的渲染器和生成器"""
+    global _worker_generator
+    renderer = renderer_cls(theme, config, cache_dir=cache_dir)
+    _worker_generator = generator_cls(config, theme, renderer, posts=posts)
+    # 流式生成时主进程不保留完整的文章列表，列表页只使用摘要
+    _worker_generator.summaries = summaries
+
+
+def _run_page_job_in_worker(job: PageJob) -> Tuple[bool, Optional[Exception]]:
+    """
+    在工作进程中执行页面生成任务
+
+    返回 (是否写入了文件, 错误)，错误不直接抛出，由主进程按顺序报告。
+    """
+    try:
+        return _worker_generator._run_page_job(job), None
+    except Exception as e:
+        try:
+            pickle.dumps(e)
+            return False, e
+        except Exception:
+            # 无法序列化的异常转换为 GenerationError 传回主进程
+            return False, GenerationError(str(e))
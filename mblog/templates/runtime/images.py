@@ -0,0 +1,314 @@
+"""
+响应式图片模块
+负责为文章图片生成不同宽度的版本（Pillow 支持时还生成 WebP 版本），
+并把文章 HTML 中的 <img> 改写为带 srcset 的 <picture>
+"""
+import html
+import io
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path, PurePosixPath
+from typing import Any, Dict, List, Optional, Tuple
+
+from .cache import hash_bytes
+
+try:
+    from PIL import Image, ImageOps, features
+except ImportError:
+    Image = None
+
+# 可以生成缩略图的图片类型（GIF 可能是动画，SVG 是矢量图，都保持原样）
+RESIZABLE_SUFFIXES = {'.jpg', '.jpeg', '.png', '.webp'}
+
+# 默认生成的图片宽度（只生成小于原图宽度的版本）
+DEFAULT_IMAGE_WIDTHS = [480, 960, 1600]
+
+# <img> 的 sizes 属性：默认主题的内容区最大宽度为 800px
+DEFAULT_IMAGE_SIZES = '(max-width: 800px) 100vw, 800px'
+
+# JPEG 和 WebP 的压缩质量
+IMAGE_QUALITY = 82
+
+# 缓存目录中存放图片版本的子目录，按源图片内容哈希寻址
+IMAGE_CACHE_NAMESPACE = 'images'
+
+# 图片处理规则的版本，修改生成方式时递增，使旧的缓存失效
+IMAGE_PIPELINE_VERSION = 1
+
+# 缓存条目中记录图片版本的文件，所有版本生成完成后最后写入
+VARIANTS_FILE = 'variants.json'
+
+_FORMATS = {'.jpg': 'JPEG', '.jpeg': 'JPEG', '.png': 'PNG', '.webp': 'WEBP'}
+_MIME_TYPES = {'.jpg': 'image/jpeg', '.jpeg': 'image/jpeg', '.png': 'image/png', '.webp': 'image/webp'}
+
+_IMG_TAG_RE = re.compile(r'<img\b[^>]*>', re.IGNORECASE)
+_SRC_ATTR_RE = re.compile(r'\ssrc="([^"]*)"')
+
+# 图片处理任务: (源文件路径, 缓存目录, 宽度列表)
+ImageJob = Tuple[str, str, Tuple[int, ...]]
+
+
+class ImageError(Exception):
+    """响应式图片处理错误"""
+    pass
+
+
+def is_available() -> bool:
+    """判断是否安装了 Pillow"""
+    return Image is not None
+
+
+def is_resizable(path: Path) -> bool:
+    """判断图片是否可以生成缩略图"""
+    return path.suffix.lower() in RESIZABLE_SUFFIXES
+
+
+def variant_path(rel_path: str, width: int, suffix: str) -> str:
+    """
+    生成图片版本的相对路径
+
+    Args:
+        rel_path: 原图相对路径，如 'images/photo.jpg'
+        width: 版本宽度
+        suffix: 版本的扩展名，如 '.webp'
+
+    Returns:
+        版本的相对路径，如 'images/photo.480w.webp'
+    """
+    path = PurePosixPath(rel_path)
+    return str(path.with_name(f'{path.stem}.{width}w{suffix}'))
+
+
+def _save_image(image: Any, path: Path, suffix: str) -> None:
+    """按扩展名对应的格式保存图片，先写临时文件再替换"""
+    image_format = _FORMATS[suffix]
+    options: Dict[str, Any] = {}
+    if image_format == 'JPEG':
+        if image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+        options = {'quality': IMAGE_QUALITY, 'optimize': True, 'progressive': True}
+    elif image_format == 'PNG':
+        options = {'optimize': True}
+    elif image_format == 'WEBP':
+        options = {'quality': IMAGE_QUALITY, 'method': 4}
+
+    tmp_path = path.with_name(f'.tmp-{os.getpid()}-{path.name}')
+    try:
+        image.save(tmp_path, format=image_format, **options)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if tmp_path.exists():
+            tmp_path.unlink()
+        raise
+
+
+def derive_image(src: Path, cache_root: Path, widths: Tuple[int, ...]) -> Optional[Dict[str, Any]]:
+    """
+    生成图片的各个宽度版本
+
+    版本保存在以源图片内容哈希命名的缓存目录中，内容相同的图片只处理一次。
+
+    Args:
+        src: 源图片路径
+        cache_root: 图片缓存目录
+        widths: 需要生成的宽度
+
+    Returns:
+        图片信息 {'digest', 'width', 'height', 'variants': [{'width', 'height', 'suffix', 'file'}]}；
+        动画图片返回 None
+
+    Raises:
+        ImageError: 图片无法读取或保存
+    """
+    data = src.read_bytes()
+    suffix = src.suffix.lower()
+    digest = hash_bytes(data, suffix, *widths, IMAGE_QUALITY, IMAGE_PIPELINE_VERSION)
+    entry_dir = cache_root / digest[:2] / digest
+    variants_file = entry_dir / VARIANTS_FILE
+
+    if variants_file.exists():
+        try:
+            with open(variants_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            pass
+
+    try:
+        with Image.open(io.BytesIO(data)) as opened:
+            if getattr(opened, 'is_animated', False):
+                return None
+            image = ImageOps.exif_transpose(opened)
+            width, height = image.size
+
+            suffixes = [suffix]
+            if suffix != '.webp' and features.check('webp'):
+                suffixes.append('.webp')
+
+            entry_dir.mkdir(parents=True, exist_ok=True)
+            variants = []
+            for target_width in sorted({w for w in widths if w < width} | {width}):
+                target_height = max(1, round(height * target_width / width))
+                resized = image
+                if target_width != width:
+                    resized = image.resize((target_width, target_height), Image.LANCZOS)
+                for variant_suffix in suffixes:
+                    if target_width == width and variant_suffix == suffix:
+                        # 原尺寸、原格式就是原图本身
+                        continue
+                    name = f'{target_width}{variant_suffix}'
+                    _save_image(resized, entry_dir / name, variant_suffix)
+                    variants.append({
+                        'width': target_width,
+                        'height': target_height,
+                        'suffix': variant_suffix,
+                        'file': name,
+                    })
+    except (OSError, ValueError, Image.DecompressionBombError) as e:
+        raise ImageError(f"{src}: {e}")
+
+    info = {'digest': digest, 'width': width, 'height': height, 'variants': variants}
+    with open(variants_file, 'w', encoding='utf-8') as f:
+        json.dump(info, f)
+    return info
+
+
+def _run_image_job(job: ImageJob) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """在工作进程中执行图片处理任务，返回 (图片信息, 错误信息)"""
+    src, cache_root, widths = job
+    try:
+        return derive_image(Path(src), Path(cache_root), widths), None
+    except (OSError, ImageError) as e:
+        return None, str(e)
+
+
+def rewrite_images(content: str, images: Dict[str, Dict[str, Any]], prefix: str,
+                   sizes: str = DEFAULT_IMAGE_SIZES) -> str:
+    """
+    把 HTML 中的 <img> 改写为带 srcset 的响应式图片
+
+    只改写 src 以 prefix 开头且在 images 中的图片。生成了 WebP 版本时用
+    <picture> 包裹，浏览器按支持情况选择格式；同时添加 width、height
+    （避免布局偏移）和 loading="lazy"。
+
+    Args:
+        content: 文章 HTML
+        images: {原图相对路径: derive_image 返回的图片信息}
+        prefix: 图片 URL 前缀，如 '/blog/assets/images/'
+        sizes: <img> 的 sizes 属性
+
+    Returns:
+        改写后的 HTML
+    """
+    def srcset(rel_path: str, info: Dict[str, Any], suffix: str, include_original: bool) -> str:
+        entries = [
+            (prefix + variant_path(rel_path, variant['width'], suffix), variant['width'])
+            for variant in info['variants'] if variant['suffix'] == suffix
+        ]
+        if include_original:
+            entries.append((prefix + rel_path, info['width']))
+        return ', '.join(f'{html.escape(url)} {width}w' for url, width in entries)
+
+    def replace(match: 're.Match') -> str:
+        tag = match.group(0)
+        src_match = _SRC_ATTR_RE.search(tag)
+        if not src_match:
+            return tag
+        src = html.unescape(src_match.group(1))
+        if not src.startswith(prefix):
+            return tag
+        rel_path = src[len(prefix):]
+        info = images.get(rel_path)
+        if info is None:
+            return tag
+
+        suffix = PurePosixPath(rel_path).suffix.lower()
+        attrs = (
+            f' srcset="{srcset(rel_path, info, suffix, True)}" sizes="{sizes}"'
+            f' width="{info["width"]}" height="{info["height"]}" loading="lazy"'
+        )
+        body = tag[:-1].rstrip('/').rstrip()
+        img = f'{body}{attrs} />'
+
+        sources = []
+        for source_suffix in sorted({variant['suffix'] for variant in info['variants']} - {suffix}):
+            sources.append(
+                f'<source type="{_MIME_TYPES[source_suffix]}" '
+                f'srcset="{srcset(rel_path, info, source_suffix, False)}" sizes="{sizes}" />'
+            )
+        if not sources:
+            return img
+        return f'<picture>{"".join(sources)}{img}</picture>'
+
+    return _IMG_TAG_RE.sub(replace, content)
+
+
+class ImagePipeline:
+    """批量生成文章图片的响应式版本，支持并行处理和按内容哈希缓存"""
+
+    def __init__(self, cache_dir: str, widths: Optional[List[int]] = None, workers: int = 1):
+        """
+        初始化图片处理流程
+
+        Args:
+            cache_dir: 缓存目录，图片版本保存在其中的 images 子目录
+            widths: 需要生成的宽度，默认 DEFAULT_IMAGE_WIDTHS
+            workers: 并行处理使用的进程数
+        """
+        self.cache_root = Path(cache_dir) / IMAGE_CACHE_NAMESPACE
+        self.widths = tuple(sorted(set(widths or DEFAULT_IMAGE_WIDTHS)))
+        self.workers = workers
+
+    def cached_file(self, info: Dict[str, Any], variant: Dict[str, Any]) -> Path:
+        """获取图片版本在缓存目录中的路径"""
+        digest = info['digest']
+        return self.cache_root / digest[:2] / digest / variant['file']
+
+    def run(self, sources: List[Path]) -> Dict[Path, Dict[str, Any]]:
+        """
+        为图片生成响应式版本
+
+        无法处理的图片打印警告后跳过。
+
+        Args:
+            sources: 源图片路径
+
+        Returns:
+            {源图片路径: 图片信息}，只包含成功处理的图片
+
+        Raises:
+            ImageError: 未安装 Pillow 或并行处理进程异常退出
+        """
+        if not is_available():
+            raise ImageError("未安装 Pillow（pip install Pillow）")
+
+        sources = [src for src in sources if is_resizable(src)]
+        jobs = [(str(src), str(self.cache_root), self.widths) for src in sources]
+
+        results: Dict[Path, Dict[str, Any]] = {}
+        for src, (info, error) in zip(sources, self._run_jobs(jobs)):
+            if error:
+                print(f"  警告: 无法生成响应式图片 {error}")
+            elif info is not None:
+                results[src] = info
+        return results
+
+    def _run_jobs(self, jobs: List[ImageJob]) -> List[Tuple[Optional[Dict[str, Any]], Optional[str]]]:
+        """执行图片处理任务，进程池不可用时回退到顺序执行"""
+        executor = None
+        if self.workers > 1 and len(jobs) > 1:
+            try:
+                executor = ProcessPoolExecutor(max_workers=self.workers)
+            except (OSError, ImportError, NotImplementedError) as e:
+                print(f"  警告: 无法启动并行图片处理，改为顺序处理: {e}")
+
+        if executor is None:
+            return [_run_image_job(job) for job in jobs]
+
+        with executor:
+            try:
+                return list(executor.map(_run_image_job, jobs))
+            except BrokenProcessPool as e:
+                raise ImageError(f"并行图片处理进程异常退出: {e}")
@@ -3,14 +3,51 @@
 Markdown 处理模块
 负责解析 Markdown 文件、提取 frontmatter 元数据、转换为 HTML
 """
+import json
+import os
 import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from dataclasses import dataclass, field
+from functools import partial
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, List, Tuple, Optional
+from typing import Callable, Dict, Any, List, Tuple, Optional, Set, Union
 import frontmatter
 import markdown
 
+try:
+    import pygments
+except ImportError:
+    # 未安装 Pygments 时 codehilite 不做语法高亮
+    pygments = None
+
+try:
+    from .cache import BuildCache, hash_bytes
+    from .profiler import get_profiler, profile_step
+except ImportError:
+    # 测试中会把 runtime 目录直接加入 sys.path，以独立模块的方式导入
+    from cache import BuildCache, hash_bytes
+    from profiler import get_profiler, profile_step
+
+# Markdown 扩展配置
+MARKDOWN_EXTENSIONS = [
+    'extra',           # 支持表格、代码块等扩展语法
+    'codehilite',      # 代码高亮
+    'toc',             # 目录生成
+    'meta',            # 元数据支持
+    'nl2br',           # 换行转 <br>
+    'sane_lists'       # 更好的列表处理
+]
+
+MARKDOWN_EXTENSION_CONFIGS = {
+    'codehilite': {
+        'css_class': 'highlight',
+        'linenums': False
+    }
+}
+
 
 @dataclass
 class Post:
@@ -29,62 +66,318 @@ class Post:
     password: str = ""         # 加密密码
     metadata: Dict[str, Any] = field(default_factory=dict)  # 其他元数据
     images: List[str] = field(default_factory=list)  # 文章中引用的图片路径
+    
+    def release(self) -> None:
+        """释放可以按需重新加载的正文（普通文章的正文始终保留在内存中）"""
+        pass
+
+
+class LazyPost(Post):
+    """
+    正文按需加载的文章
+    
+    content 和 html 不随文章列表常驻内存：第一次访问时从解析缓存读取
+    （未启用缓存或条目不存在时重新解析源文件），release() 后再次访问时重新加载。
+    被赋值的正文（如改写图片后的 HTML）保留在内存中，不会被 release() 释放。
+    """
+    
+    def __init__(self, *args: Any, body_loader: 'PostBodyLoader', body_key: str = "", **kwargs: Any):
+        """
+        初始化文章
+        
+        Args:
+            body_loader: 正文加载器
+            body_key: 正文在解析缓存中的键，空字符串表示重新解析源文件
+            其余参数与 Post 相同，content 和 html 传入 None 表示按需加载
+        """
+        self._body_loader = body_loader
+        self._body_key = body_key
+        self._content: Optional[str] = None
+        self._html: Optional[str] = None
+        # 被赋值的正文字段，release() 时保留
+        self._pinned: Set[str] = set()
+        super().__init__(*args, **kwargs)
+    
+    @property
+    def content(self) -> str:
+        if self._content is None:
+            self._load_body()
+        return self._content
+    
+    @content.setter
+    def content(self, value: Optional[str]) -> None:
+        self._content = value
+        self._pin('content', value)
+    
+    @property
+    def html(self) -> str:
+        if self._html is None:
+            self._load_body()
+        return self._html
+    
+    @html.setter
+    def html(self, value: Optional[str]) -> None:
+        self._html = value
+        self._pin('html', value)
+    
+    @property
+    def is_loaded(self) -> bool:
+        """正文是否在内存中"""
+        return self._content is not None and self._html is not None
+    
+    def release(self) -> None:
+        """释放已加载且未被赋值的正文"""
+        if 'content' not in self._pinned:
+            self._content = None
+        if 'html' not in self._pinned:
+            self._html = None
+    
+    def _pin(self, name: str, value: Optional[str]) -> None:
+        """记录被赋值的正文字段，赋值为 None 表示恢复按需加载"""
+        if value is None:
+            self._pinned.discard(name)
+        else:
+            self._pinned.add(name)
+    
+    def _load_body(self) -> None:
+        """加载正文，不覆盖被赋值的字段"""
+        content, html = self._body_loader.load(self.filepath, self._body_key)
+        if self._content is None:
+            self._content = content
+        if self._html is None:
+            self._html = html
+
+
+class TagTable:
+    """标签名称表：每个标签名称只保存一份，文章摘要中以编号引用"""
+    
+    __slots__ = ('names', '_ids')
+    
+    def __init__(self) -> None:
+        self.names: List[Any] = []
+        self._ids: Dict[Any, int] = {}
+    
+    def intern(self, name: Any) -> int:
+        """
+        获取标签的编号，新标签追加到表末尾
+        
+        Args:
+            name: 标签名称
+            
+        Returns:
+            标签编号
+        """
+        tag_id = self._ids.get(name)
+        if tag_id is None:
+            if isinstance(name, str):
+                name = sys.intern(name)
+            tag_id = self._ids[name] = len(self.names)
+            self.names.append(name)
+        return tag_id
+    
+    def __len__(self) -> int:
+        return len(self.names)
+
+
+class PostSummary:
+    """
+    列表页使用的文章摘要
+    
+    只包含首页、标签页、归档页、订阅和搜索索引需要的字段，不含正文和完整的 frontmatter，
+    标签以 TagTable 中的编号保存。遍历大量文章时比 Post 占用更少的内存。
+    
+    访问摘要中没有的文章字段（如自定义主题的列表页使用 html、content 或 metadata）时，
+    加载完整的文章并保留在摘要中。
+    """
+    
+    __slots__ = ('title', 'date', 'relative_path', 'slug', 'author', 'description',
+                 'encrypted', 'tag_ids', 'tag_table', '_source')
+    
+    def __init__(self, title: str, date: datetime, relative_path: str, slug: str, author: str,
+                 description: str, encrypted: bool, tag_ids: Tuple[int, ...], tag_table: TagTable,
+                 source: Union[Post, Callable[[], Post], None] = None):
+        """
+        初始化文章摘要
+        
+        Args:
+            source: 完整的文章，或加载完整文章的函数（需要可以被 pickle 序列化），
+                None 表示摘要中没有的字段不可用
+            其余参数为摘要字段
+        """
+        self.title = title
+        self.date = date
+        self.relative_path = relative_path
+        self.slug = slug
+        self.author = author
+        self.description = description
+        self.encrypted = encrypted
+        self.tag_ids = tag_ids
+        self.tag_table = tag_table
+        self._source = source
+    
+    @classmethod
+    def from_post(cls, post: Post, tag_table: TagTable) -> 'PostSummary':
+        """
+        从文章创建摘要
+        
+        Args:
+            post: 文章对象
+            tag_table: 标签名称表
+            
+        Returns:
+            文章摘要
+        """
+        return cls(
+            title=post.title,
+            date=post.date,
+            relative_path=post.relative_path,
+            slug=post.slug,
+            author=post.author,
+            description=post.description,
+            encrypted=bool(post.encrypted),
+            tag_ids=tuple(tag_table.intern(tag) for tag in post.tags),
+            tag_table=tag_table,
+            source=post,
+        )
+    
+    @property
+    def tags(self) -> Tuple[Any, ...]:
+        """标签名称"""
+        names = self.tag_table.names
+        return tuple(names[tag_id] for tag_id in self.tag_ids)
+    
+    def __getattr__(self, name: str) -> Any:
+        # 只在摘要中没有该属性时调用，只有 Post 的字段会加载完整的文章
+        if name not in Post.__dataclass_fields__:
+            raise AttributeError(f"'PostSummary' object has no attribute '{name}'")
+        source = self._source
+        if source is None:
+            raise AttributeError(f"文章摘要 {self.relative_path} 不包含字段 '{name}'")
+        if not isinstance(source, Post):
+            source = self._source = source()
+        return getattr(source, name)
+    
+    def __repr__(self) -> str:
+        return f"PostSummary(relative_path={self.relative_path!r}, title={self.title!r})"
 
 
 class MarkdownProcessor:
     """Markdown 处理器"""
     
-    def __init__(self, md_dir: str, base_path: str = ""):
+    def __init__(self, md_dir: str, base_path: str = "", cache_dir: Optional[str] = None,
+                 lazy: bool = False):
         """
         初始化 Markdown 处理器
         
         Args:
             md_dir: Markdown 文件目录路径
             base_path: 基础路径前缀（用于子目录部署）
+            cache_dir: 构建缓存目录，None 表示不使用缓存
+            lazy: 是否返回正文按需加载的文章（LazyPost），减少大量文章时的内存占用
         """
         self.md_dir = Path(md_dir).resolve()
+        self.lazy = lazy
         self.base_path = base_path.rstrip('/') if base_path else ""
         self.md_converter = markdown.Markdown(
-            extensions=[
-                'extra',           # 支持表格、代码块等扩展语法
-                'codehilite',      # 代码高亮
-                'toc',             # 目录生成
-                'meta',            # 元数据支持
-                'nl2br',           # 换行转 <br>
-                'sane_lists'       # 更好的列表处理
-            ],
-            extension_configs={
-                'codehilite': {
-                    'css_class': 'highlight',
-                    'linenums': False
-                }
-            }
+            extensions=MARKDOWN_EXTENSIONS,
+            extension_configs=MARKDOWN_EXTENSION_CONFIGS
         )
+        
+        # 解析结果缓存（按文件内容和处理器设置的哈希索引）
+        self.cache_dir = cache_dir
+        self.cache: Optional[BuildCache] = None
+        self._settings_digest = ""
+        if cache_dir:
+            self.cache = BuildCache(cache_dir, 'posts')
+            self._settings_digest = self._compute_settings_digest()
     
-    def load_posts(self) -> List[Post]:
+    def load_posts(self, workers: Optional[int] = 1) -> List[Post]:
         """
         加载所有文章（递归扫描子目录）
         
+        Args:
+            workers: 并行解析的进程数，1 表示在当前进程中顺序解析，
+                     None 或 0 表示使用全部 CPU 核心
+        
         Returns:
             文章列表，按日期降序排序
         """
-        if not self.md_dir.exists():
-            return []
+        md_files = self.find_post_files()
+        
+        if not workers:
+            workers = os.cpu_count() or 1
+        workers = min(workers, len(md_files))
+        
+        if workers > 1:
+            results = self._parse_posts_parallel(md_files, workers)
+        else:
+            results = (self._try_parse_post(str(md_file)) for md_file in md_files)
         
         posts = []
-        # 递归查找所有 .md 文件
-        for md_file in self.md_dir.rglob('*.md'):
-            try:
-                post = self.parse_post(str(md_file))
-                posts.append(post)
-            except Exception as e:
-                print(f"警告: 无法解析文件 {md_file}: {e}")
+        for md_file, (post, error) in zip(md_files, results):
+            if error is not None:
+                print(f"警告: 无法解析文件 {md_file}: {error}")
                 continue
+            posts.append(post)
         
         # 按日期降序排序（最新的在前）
         posts.sort(key=lambda p: p.date, reverse=True)
         return posts
     
+    def find_post_files(self) -> List[Path]:
+        """
+        递归查找 md 目录下的所有文章文件
+        
+        Returns:
+            .md 文件路径列表，md 目录不存在时返回空列表
+        """
+        if not self.md_dir.exists():
+            return []
+        return list(self.md_dir.rglob('*.md'))
+    
+    def _try_parse_post(self, filepath: str) -> Tuple[Optional[Post], Optional[str]]:
+        """
+        解析单个文章文件，捕获解析错误
+        
+        Args:
+            filepath: 文章文件路径
+            
+        Returns:
+            (Post 对象, None) 或 (None, 错误信息)
+        """
+        try:
+            return self.parse_post(filepath), None
+        except Exception as e:
+            return None, str(e)
+    
+    def _parse_posts_parallel(self, md_files: List[Path], workers: int) -> List[Tuple[Optional[Post], Optional[str]]]:
+        """
+        使用进程池并行解析文章
+        
+        每个工作进程持有自己的处理器（以及 Markdown 转换器），
+        结果按输入文件顺序返回。进程池不可用时回退到顺序解析。
+        
+        Args:
+            md_files: 文章文件列表
+            workers: 工作进程数
+            
+        Returns:
+            与 md_files 一一对应的解析结果列表
+        """
+        filepaths = [str(md_file) for md_file in md_files]
+        chunksize = max(1, len(filepaths) // (workers * 4))
+        
+        try:
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_worker_processor,
+                initargs=(type(self), str(self.md_dir), self.base_path, self.cache_dir, self.lazy)
+            ) as executor:
+                return list(executor.map(_parse_post_in_worker, filepaths, chunksize=chunksize))
+        except (OSError, ImportError, NotImplementedError, BrokenProcessPool) as e:
+            print(f"警告: 无法启动并行解析，改为顺序解析: {e}")
+            return [self._try_parse_post(filepath) for filepath in filepaths]
+    
     def parse_post(self, filepath: str) -> Post:
         """
         解析单个文章文件
@@ -101,11 +394,26 @@ class MarkdownProcessor:
         filepath_obj = Path(filepath)
         
         # 读取文件内容
-        with open(filepath_obj, 'r', encoding='utf-8') as f:
-            file_content = f.read()
-        
-        # 提取 frontmatter 和内容
-        metadata, content = self._extract_frontmatter(file_content)
+        with open(filepath_obj, 'rb') as f:
+            raw_content = f.read()
+        
+        # 优先从缓存读取解析结果（性能分析时总是重新解析，使每篇文章都有解析耗时）
+        cache_key = ""
+        entry = None
+        if self.cache is not None:
+            cache_key = self._cache_key(filepath_obj, raw_content)
+            if get_profiler() is None:
+                entry = self._load_cache_entry(cache_key)
+        
+        if entry is None:
+            entry = self._parse_source(raw_content.decode('utf-8'), filepath_obj)
+            if self.cache is not None:
+                self.cache.set(cache_key, entry)
+        
+        metadata = entry['metadata']
+        content = entry['content']
+        images = list(entry['images'])
+        html = entry['html']
         
         # 验证必需字段
         if 'title' not in metadata:
@@ -128,9 +436,6 @@ class MarkdownProcessor:
         if isinstance(tags, str):
             tags = [tag.strip() for tag in tags.split(',')]
         
-        # 提取图片路径并转换 Markdown 到 HTML
-        images, html = self._process_markdown_with_images(content, filepath_obj)
-        
         # 生成 slug
         slug = self._generate_slug(title, date)
         
@@ -141,8 +446,15 @@ class MarkdownProcessor:
         encrypted = metadata.get('encrypted', False)
         password = metadata.get('password', '')
         
-        # 创建 Post 对象
-        post = Post(
+        # 创建 Post 对象（按需加载时不保留正文，正文可以从缓存条目或源文件重新得到）
+        post_class = Post
+        lazy_fields: Dict[str, Any] = {}
+        if self.lazy:
+            post_class = LazyPost
+            lazy_fields = {'body_loader': self._post_body_loader(), 'body_key': cache_key}
+            content = html = None
+        
+        post = post_class(
             filepath=str(filepath_obj),
             slug=slug,
             relative_path=relative_path,
@@ -156,11 +468,117 @@ class MarkdownProcessor:
             encrypted=encrypted,
             password=password,
             metadata=metadata,
-            images=images
+            images=images,
+            **lazy_fields
         )
         
         return post
     
+    def post_loader(self, filepath: str) -> Callable[[], Post]:
+        """
+        获取重新解析文章的函数（可以被 pickle 序列化），用作文章摘要的完整文章来源
+        
+        Args:
+            filepath: 文章文件路径
+            
+        Returns:
+            返回 Post 对象的函数
+        """
+        return partial(self._post_body_loader().load_post, filepath)
+    
+    def _post_body_loader(self) -> 'PostBodyLoader':
+        """获取本处理器设置对应的正文加载器，加载器复用当前处理器"""
+        loader = _get_body_loader(type(self), str(self.md_dir), self.base_path, self.cache_dir)
+        if loader._processor is None:
+            loader._processor = self
+        return loader
+    
+    def _parse_source(self, file_content: str, filepath: Path) -> Dict[str, Any]:
+        """
+        解析文件内容：提取 frontmatter、处理图片引用并转换为 HTML
+        
+        返回值只依赖文件内容和处理器设置，可以直接写入缓存。
+        
+        Args:
+            file_content: 文件内容
+            filepath: 文件路径
+            
+        Returns:
+            包含 metadata、content、images、html、image_refs 的字典
+        """
+        profile_key = self._get_relative_path(filepath)
+        with profile_step('frontmatter', profile_key):
+            metadata, content = self._extract_frontmatter(file_content)
+        
+        image_refs: List[Tuple[str, bool]] = []
+        with profile_step('markdown', profile_key):
+            images, html = self._process_markdown_with_images(content, filepath, image_refs)
+        
+        return {
+            'metadata': metadata,
+            'content': content,
+            'images': images,
+            'html': html,
+            'image_refs': image_refs,
+        }
+    
+    def _compute_settings_digest(self) -> str:
+        """
+        计算影响解析结果的处理器设置的摘要
+        
+        包括 Markdown 扩展配置、base_path、md 目录、markdown 库和 Pygments（代码高亮）
+        的版本以及运行时源码，任一变化都会使已有缓存失效。
+        
+        Returns:
+            摘要字符串
+        """
+        settings = json.dumps({
+            'extensions': MARKDOWN_EXTENSIONS,
+            'extension_configs': MARKDOWN_EXTENSION_CONFIGS,
+            'base_path': self.base_path,
+            'md_dir': str(self.md_dir),
+            'markdown_version': markdown.__version__,
+            'pygments_version': pygments.__version__ if pygments is not None else None,
+        }, sort_keys=True)
+        runtime_source = Path(__file__).read_bytes()
+        return hash_bytes(settings, runtime_source)
+    
+    def _cache_key(self, filepath: Path, raw_content: bytes) -> str:
+        """
+        计算文件的缓存键
+        
+        Args:
+            filepath: 文件路径
+            raw_content: 文件原始字节内容
+            
+        Returns:
+            缓存键
+        """
+        return hash_bytes(self._settings_digest, str(filepath.resolve()), raw_content)
+    
+    def _load_cache_entry(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """
+        读取缓存条目并校验其引用的图片状态
+        
+        图片路径是否被改写取决于图片文件是否存在，
+        因此图片被新增或删除后缓存条目需要失效。
+        
+        Args:
+            cache_key: 缓存键
+            
+        Returns:
+            缓存条目，未命中或已失效时返回 None
+        """
+        entry = self.cache.get(cache_key)
+        if entry is None:
+            return None
+        
+        for img_path, existed in entry.get('image_refs', []):
+            if Path(img_path).is_file() != existed:
+                return None
+        
+        return entry
+    
     def _extract_frontmatter(self, content: str) -> Tuple[Dict[str, Any], str]:
         """
         提取 YAML frontmatter
@@ -284,13 +702,15 @@ class MarkdownProcessor:
             # 如果文件不在 md_dir 下，使用文件名（不含扩展名）
             return filepath.stem
     
-    def _process_markdown_with_images(self, markdown_text: str, md_filepath: Path) -> Tuple[List[str], str]:
+    def _process_markdown_with_images(self, markdown_text: str, md_filepath: Path,
+                                      image_refs: Optional[List[Tuple[str, bool]]] = None) -> Tuple[List[str], str]:
         """
         处理 Markdown 中的图片引用，提取图片路径并转换路径
         
         Args:
             markdown_text: Markdown 文本
             md_filepath: Markdown 文件的路径
+            image_refs: 可选，用于收集检查过的本地图片路径及其是否存在
             
         Returns:
             (图片文件路径列表, 转换后的 HTML)
@@ -318,7 +738,11 @@ class MarkdownProcessor:
             img_abs_path = (md_dir / img_path).resolve()
             
             # 检查图片文件是否存在
-            if img_abs_path.exists() and img_abs_path.is_file():
+            img_exists = img_abs_path.exists() and img_abs_path.is_file()
+            if image_refs is not None:
+                image_refs.append((str(img_abs_path), img_exists))
+            
+            if img_exists:
                 # 记录图片路径（相对于 md_dir 的父目录）
                 try:
                     # 获取相对于 markdown 文件所在目录的路径
@@ -344,3 +768,103 @@ class MarkdownProcessor:
         html = self._convert_to_html(processed_markdown)
         
         return images, html
+
+
+class PostBodyLoader:
+    """
+    LazyPost 的正文加载器，也用于流式生成时文章摘要加载完整的文章
+    
+    同一组处理器设置在每个进程中只有一个加载器实例（序列化时只保存设置），
+    从工作进程返回的大量文章共享同一个加载器和 Markdown 处理器。
+    """
+    
+    def __init__(self, processor_cls: type, md_dir: str, base_path: str, cache_dir: Optional[str]):
+        """
+        初始化加载器
+        
+        Args:
+            processor_cls: 重新解析源文件时使用的处理器类
+            md_dir: Markdown 文件目录路径
+            base_path: 基础路径前缀
+            cache_dir: 构建缓存目录，None 表示总是重新解析源文件
+        """
+        self.processor_cls = processor_cls
+        self.md_dir = md_dir
+        self.base_path = base_path
+        self.cache_dir = cache_dir
+        self._processor: Optional[MarkdownProcessor] = None
+    
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return _get_body_loader, (self.processor_cls, self.md_dir, self.base_path, self.cache_dir)
+    
+    def load_post(self, filepath: str) -> Post:
+        """
+        重新解析完整的文章（流式生成时文章摘要按需加载完整的文章）
+        
+        Args:
+            filepath: 文章文件路径
+            
+        Returns:
+            Post 对象
+        """
+        return self._get_processor().parse_post(filepath)
+    
+    def load(self, filepath: str, body_key: str) -> Tuple[str, str]:
+        """
+        加载文章正文
+        
+        Args:
+            filepath: 文章文件路径
+            body_key: 正文在解析缓存中的键
+            
+        Returns:
+            (原始 Markdown, 转换后的 HTML)
+        """
+        processor = self._get_processor()
+        
+        entry = None
+        if body_key and processor.cache is not None:
+            entry = processor.cache.get(body_key)
+        if entry is None:
+            # 未启用缓存或缓存条目已被删除，重新解析源文件
+            path = Path(filepath)
+            with open(path, 'rb') as f:
+                entry = processor._parse_source(f.read().decode('utf-8'), path)
+        return entry['content'], entry['html']
+    
+    def _get_processor(self) -> 'MarkdownProcessor':
+        """获取（第一次使用时创建）解析源文件使用的处理器"""
+        if self._processor is None:
+            self._processor = self.processor_cls(self.md_dir, base_path=self.base_path, cache_dir=self.cache_dir)
+        return self._processor
+
+
+# 每组处理器设置对应的正文加载器
+_body_loaders: Dict[Tuple[Any, ...], PostBodyLoader] = {}
+
+
+def _get_body_loader(processor_cls: type, md_dir: str, base_path: str,
+                     cache_dir: Optional[str]) -> PostBodyLoader:
+    """获取（或创建）一组处理器设置对应的正文加载器"""
+    key = (processor_cls, md_dir, base_path, cache_dir)
+    loader = _body_loaders.get(key)
+    if loader is None:
+        loader = _body_loaders[key] = PostBodyLoader(*key)
+    return loader
+
+
+# 工作进程中的处理器实例（由进程池的 initializer 创建）
+_worker_processor: Optional[MarkdownProcessor] = None
+
+
+def _init_worker_processor(processor_cls: type, md_dir: str, base_path: str,
+                           cache_dir: Optional[str], lazy: bool = False) -> None:
+    """在工作进程中创建独立的 Markdown 处理器"""
+    global _worker_processor
+    _worker_processor = processor_cls(md_dir, base_path=base_path, cache_dir=cache_dir)
+    _worker_processor.lazy = lazy
+
+
+def _parse_post_in_worker(filepath: str) -> Tuple[Optional[Post], Optional[str]]:
+    """在工作进程中解析单个文章文件"""
+    return _worker_processor._try_parse_post(filepath)
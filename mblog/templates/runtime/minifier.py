@@ -0,0 +1,331 @@
+"""
+资源压缩模块
+负责去除 CSS 和 JavaScript 中的注释和多余空白，减小主题静态资源的体积
+
+只做不改变语义的保守处理：不重命名变量、不改写表达式。JavaScript
+中的换行会保留（只合并连续的空行和缩进），避免影响自动分号插入。
+"""
+import re
+from typing import List, Optional, Tuple
+
+# CSS 中前后空白可以省略的符号（冒号只省略其后的空白，
+# 冒号前的空白在选择器中有意义，如 "a :hover"）
+_CSS_TIGHT_AFTER = set('{};:,>')
+_CSS_TIGHT_BEFORE = set('{};,>!')
+
+# 不含空白、引号、注释起始符和上述符号的连续片段
+_CSS_CHUNK_RE = re.compile(r'[^\s"\'/{};:,>!]+')
+
+# JavaScript 标识符、关键字和数字
+_JS_WORD_RE = re.compile(r'[\w$\u0080-\uffff]+')
+
+# 这些符号或关键字之后的 "/" 是正则表达式的开始，其余情况是除号
+_JS_REGEX_AFTER_PUNCT = set('(,=:[!&|?{};+-*%<>~^')
+_JS_REGEX_AFTER_KEYWORDS = {
+    'return', 'typeof', 'instanceof', 'in', 'of', 'new', 'delete', 'void',
+    'throw', 'case', 'do', 'else', 'yield', 'await',
+}
+
+# 换行前后是这些符号时可以去掉换行，不影响自动分号插入
+_JS_NEWLINE_AFTER = set('{[(,;:')
+_JS_NEWLINE_BEFORE = set('}]),;.')
+
+
+class MinifyError(Exception):
+    """资源压缩错误"""
+    pass
+
+
+def _is_word_char(char: str) -> bool:
+    """判断字符是否可以出现在标识符或数字中"""
+    return char.isalnum() or char in '_$' or ord(char) > 127
+
+
+def _scan_string(source: str, start: int) -> int:
+    """
+    扫描字符串字面量
+
+    Args:
+        source: 源码
+        start: 起始引号的位置
+
+    Returns:
+        结束引号之后的位置
+
+    Raises:
+        MinifyError: 字符串没有结束
+    """
+    quote = source[start]
+    i = start + 1
+    n = len(source)
+    while i < n:
+        char = source[i]
+        if char == '\\':
+            i += 2
+            continue
+        if char == quote:
+            return i + 1
+        i += 1
+    raise MinifyError(f"字符串没有结束（位置 {start}）")
+
+
+def minify_css(source: str) -> str:
+    """
+    压缩 CSS
+
+    去除注释，合并空白，去掉大括号、分号、逗号等符号前后的空白以及
+    声明块中最后一个分号。字符串内容保持不变。
+
+    Args:
+        source: CSS 源码
+
+    Returns:
+        压缩后的 CSS
+
+    Raises:
+        MinifyError: 注释或字符串没有结束
+    """
+    out: List[str] = []
+    i = 0
+    n = len(source)
+    pending_space = False
+
+    while i < n:
+        char = source[i]
+
+        if char == '/' and source.startswith('/*', i):
+            end = source.find('*/', i + 2)
+            if end < 0:
+                raise MinifyError(f"注释没有结束（位置 {i}）")
+            i = end + 2
+            pending_space = True
+            continue
+
+        if char.isspace():
+            pending_space = True
+            i += 1
+            continue
+
+        if char in '"\'':
+            end = _scan_string(source, i)
+        else:
+            match = _CSS_CHUNK_RE.match(source, i)
+            end = match.end() if match else i + 1
+        token = source[i:end]
+        i = end
+
+        if token == '}' and out and out[-1] == ';':
+            out.pop()
+        if pending_space and out and out[-1][-1] not in _CSS_TIGHT_AFTER and token[0] not in _CSS_TIGHT_BEFORE:
+            out.append(' ')
+        pending_space = False
+        out.append(token)
+
+    return ''.join(out)
+
+
+def _scan_regex(source: str, start: int) -> Optional[int]:
+    """
+    扫描正则表达式字面量
+
+    Args:
+        source: 源码
+        start: 起始 "/" 的位置
+
+    Returns:
+        标志之后的位置；遇到换行说明不是正则表达式，返回 None
+    """
+    i = start + 1
+    n = len(source)
+    in_class = False
+    while i < n:
+        char = source[i]
+        if char == '\\':
+            i += 2
+            continue
+        if char == '\n':
+            return None
+        if in_class:
+            if char == ']':
+                in_class = False
+        elif char == '[':
+            in_class = True
+        elif char == '/':
+            break
+        i += 1
+    else:
+        return None
+
+    i += 1
+    while i < n and _is_word_char(source[i]):
+        i += 1
+    return i
+
+
+def _scan_template(source: str, start: int) -> Tuple[int, bool]:
+    """
+    扫描模板字符串的一段文本
+
+    Args:
+        source: 源码
+        start: 反引号或表达式结束的 "}" 之后的位置
+
+    Returns:
+        (扫描结束的位置, 是否停在 "${" 表达式开始处)
+
+    Raises:
+        MinifyError: 模板字符串没有结束
+    """
+    i = start
+    n = len(source)
+    while i < n:
+        char = source[i]
+        if char == '\\':
+            i += 2
+            continue
+        if char == '`':
+            return i + 1, False
+        if char == '$' and source.startswith('${', i):
+            return i + 2, True
+        i += 1
+    raise MinifyError(f"模板字符串没有结束（位置 {start}）")
+
+
+def minify_js(source: str) -> str:
+    """
+    压缩 JavaScript
+
+    去除注释、缩进和空行，合并行内的空白。字符串、模板字符串和
+    正则表达式保持不变；换行只在前后是括号、分号等不影响自动分号插入的
+    符号时去掉。
+
+    Args:
+        source: JavaScript 源码
+
+    Returns:
+        压缩后的 JavaScript
+
+    Raises:
+        MinifyError: 注释、字符串或模板字符串没有结束
+    """
+    out: List[str] = []
+    i = 0
+    n = len(source)
+    # 上一个输出的记号，用于判断 "/" 是除号还是正则表达式
+    last = ''
+    # 空白: None、' ' 或 '\n'
+    pending: Optional[str] = None
+    # 大括号深度，以及模板字符串中每个 ${ 表达式开始时的深度
+    depth = 0
+    templates: List[int] = []
+
+    def emit(token: str, kind: str) -> None:
+        nonlocal last, pending
+        if pending and out:
+            prev = out[-1][-1]
+            first = token[0]
+            if pending == '\n':
+                if prev not in _JS_NEWLINE_AFTER and first not in _JS_NEWLINE_BEFORE:
+                    out.append('\n')
+            elif (_is_word_char(prev) and _is_word_char(first)) or (prev == first and first in '+-/'):
+                out.append(' ')
+        pending = None
+        out.append(token)
+        last = kind
+
+    def emit_template(start: int) -> int:
+        nonlocal depth
+        end, opens_expression = _scan_template(source, start)
+        if opens_expression:
+            depth += 1
+            templates.append(depth)
+        return end
+
+    while i < n:
+        char = source[i]
+
+        if char.isspace():
+            if char == '\n':
+                pending = '\n'
+            elif pending is None:
+                pending = ' '
+            i += 1
+            continue
+
+        if char == '/' and source.startswith('//', i):
+            end = source.find('\n', i)
+            i = n if end < 0 else end
+            continue
+
+        if char == '/' and source.startswith('/*', i):
+            end = source.find('*/', i + 2)
+            if end < 0:
+                raise MinifyError(f"注释没有结束（位置 {i}）")
+            if '\n' in source[i:end]:
+                pending = '\n'
+            elif pending is None:
+                pending = ' '
+            i = end + 2
+            continue
+
+        if char in '"\'':
+            end = _scan_string(source, i)
+            emit(source[i:end], '"')
+            i = end
+            continue
+
+        if char == '`':
+            end = emit_template(i + 1)
+            emit(source[i:end], '{' if source[end - 1] == '{' else '`')
+            i = end
+            continue
+
+        if char == '/' and (not last or last in _JS_REGEX_AFTER_PUNCT or last in _JS_REGEX_AFTER_KEYWORDS):
+            end = _scan_regex(source, i)
+            if end is not None:
+                emit(source[i:end], '"')
+                i = end
+                continue
+
+        match = _JS_WORD_RE.match(source, i)
+        if match:
+            emit(match.group(), match.group())
+            i = match.end()
+            continue
+
+        if char == '{':
+            depth += 1
+        elif char == '}':
+            if templates and templates[-1] == depth:
+                # ${ 表达式结束，继续扫描模板字符串的剩余部分
+                templates.pop()
+                depth -= 1
+                end = emit_template(i + 1)
+                emit(source[i:end], '{' if source[end - 1] == '{' else '`')
+                i = end
+                continue
+            depth -= 1
+
+        emit(char, char)
+        i += 1
+
+    return ''.join(out)
+
+
+def minify(rel_path: str, content: str) -> str:
+    """
+    按文件类型压缩资源
+
+    Args:
+        rel_path: 文件路径（根据扩展名判断类型）
+        content: 文件内容
+
+    Returns:
+        压缩后的内容，不支持的类型原样返回
+    """
+    suffix = rel_path.rsplit('.', 1)[-1].lower() if '.' in rel_path else ''
+    if suffix == 'css':
+        return minify_css(content)
+    if suffix == 'js':
+        return minify_js(content)
+    return content
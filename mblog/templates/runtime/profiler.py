@@ -0,0 +1,263 @@
+"""
+构建性能分析模块
+负责记录构建各阶段以及每篇文章各个步骤的耗时和内存分配，生成 JSON 报告
+"""
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from pathlib import Path
+from typing import Any, ContextManager, Dict, Iterator, List, Optional
+
+# 分析报告格式版本
+PROFILE_REPORT_VERSION = 1
+
+# 默认的报告文件名
+DEFAULT_PROFILE_REPORT = 'mblog-profile.json'
+
+# 嵌套在其他步骤中执行的步骤（如加密在渲染中执行），不重复计入文章总耗时
+NESTED_STEPS = {'encrypt'}
+
+# tracemalloc.reset_peak() 在 Python 3.9 才加入
+_CAN_RESET_PEAK = hasattr(tracemalloc, 'reset_peak')
+
+# 当前启用的分析器，未启用时各处的记录调用不做任何事
+_active_profiler: Optional['BuildProfiler'] = None
+
+
+def get_profiler() -> Optional['BuildProfiler']:
+    """获取当前启用的分析器，未启用时返回 None"""
+    return _active_profiler
+
+
+def profile_phase(name: str) -> ContextManager[None]:
+    """
+    记录一个构建阶段的耗时和内存分配
+
+    Args:
+        name: 阶段名称
+    """
+    if _active_profiler is None:
+        return nullcontext()
+    return _active_profiler.measure('phase', name)
+
+
+def profile_step(step: str, key: str) -> ContextManager[None]:
+    """
+    记录单篇文章或单个页面某个步骤的耗时和内存分配
+
+    Args:
+        step: 步骤名称，如 'markdown'、'render'、'write'
+        key: 文章相对路径或页面输出路径
+    """
+    if _active_profiler is None:
+        return nullcontext()
+    return _active_profiler.measure(step, key)
+
+
+class BuildProfiler:
+    """
+    构建性能分析器
+
+    启用后（作为上下文管理器进入），profile_phase 和 profile_step 记录的耗时和内存分配
+    汇总到分析器中。内存分配通过 tracemalloc 统计，会使构建变慢，
+    但各部分之间的相对耗时仍然可以比较。
+    """
+
+    def __init__(self, track_memory: bool = True):
+        """
+        初始化分析器
+
+        Args:
+            track_memory: 是否使用 tracemalloc 统计内存分配
+        """
+        self.track_memory = track_memory
+        # 阶段记录，按开始顺序排列
+        self.phases: List[Dict[str, Any]] = []
+        # 步骤记录 {步骤名称: {文章或页面: {'seconds', 'allocated', 'count'}}}
+        self.steps: Dict[str, Dict[str, Dict[str, float]]] = {}
+        # 嵌套的测量中，每一层已观察到的内存峰值
+        self._peak_stack: List[int] = []
+        self._started = 0.0
+        self._total_seconds = 0.0
+        self._peak_memory = 0
+        self._owns_tracemalloc = False
+
+    def __enter__(self) -> 'BuildProfiler':
+        global _active_profiler
+        if self.track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._owns_tracemalloc = True
+        self._started = time.perf_counter()
+        _active_profiler = self
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        global _active_profiler
+        _active_profiler = None
+        self._total_seconds = time.perf_counter() - self._started
+        if self.track_memory and tracemalloc.is_tracing():
+            self._peak_memory = tracemalloc.get_traced_memory()[1]
+            if self._owns_tracemalloc:
+                tracemalloc.stop()
+                self._owns_tracemalloc = False
+
+    @contextmanager
+    def measure(self, category: str, name: str) -> Iterator[None]:
+        """
+        测量代码块的耗时、净内存分配和内存峰值
+
+        Args:
+            category: 'phase' 表示构建阶段，否则为步骤名称
+            name: 阶段名称，或文章 / 页面的标识
+        """
+        tracing = self.track_memory and tracemalloc.is_tracing()
+        record: Optional[Dict[str, Any]] = None
+        if category == 'phase':
+            # 先占位，使阶段按开始顺序排列
+            record = {'name': name}
+            self.phases.append(record)
+
+        memory_before = 0
+        peak_before = 0
+        if tracing:
+            current, peak_before = tracemalloc.get_traced_memory()
+            memory_before = current
+            if _CAN_RESET_PEAK:
+                if self._peak_stack:
+                    self._peak_stack[-1] = max(self._peak_stack[-1], peak_before)
+                tracemalloc.reset_peak()
+            self._peak_stack.append(current)
+        start = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            allocated = 0
+            peak = 0
+            if tracing:
+                current, traced_peak = tracemalloc.get_traced_memory()
+                allocated = current - memory_before
+                if not _CAN_RESET_PEAK and traced_peak <= peak_before:
+                    # 无法重置峰值（Python 3.8）时，全局峰值未在本阶段升高，只能以前后的内存用量估计
+                    traced_peak = max(memory_before, current)
+                peak = max(self._peak_stack.pop(), traced_peak)
+                if self._peak_stack:
+                    # 把本层的峰值传给外层
+                    self._peak_stack[-1] = max(self._peak_stack[-1], peak)
+
+            if record is not None:
+                record.update({'seconds': seconds, 'allocated': allocated, 'peak': peak})
+            else:
+                entry = self.steps.setdefault(category, {}).setdefault(
+                    name, {'seconds': 0.0, 'allocated': 0, 'count': 0}
+                )
+                entry['seconds'] += seconds
+                entry['allocated'] += allocated
+                entry['count'] += 1
+
+    def slowest(self, top: int = 10) -> List[Dict[str, Any]]:
+        """
+        获取总耗时最长的文章或页面
+
+        Args:
+            top: 返回的数量
+
+        Returns:
+            [{'key', 'seconds', 'allocated', 'steps': {步骤名称: 耗时}}]，按总耗时降序排列
+        """
+        totals: Dict[str, Dict[str, Any]] = {}
+        for step, entries in self.steps.items():
+            for key, entry in entries.items():
+                total = totals.setdefault(key, {'key': key, 'seconds': 0.0, 'allocated': 0, 'steps': {}})
+                total['steps'][step] = entry['seconds']
+                if step not in NESTED_STEPS:
+                    total['seconds'] += entry['seconds']
+                    total['allocated'] += entry['allocated']
+        return sorted(totals.values(), key=lambda total: (-total['seconds'], total['key']))[:top]
+
+    def report(self, top: int = 10) -> Dict[str, Any]:
+        """
+        生成分析报告
+
+        Args:
+            top: 报告中列出的最慢文章 / 页面数量
+
+        Returns:
+            可以序列化为 JSON 的报告
+        """
+        return {
+            'version': PROFILE_REPORT_VERSION,
+            'generated_at': datetime.now().isoformat(),
+            'track_memory': self.track_memory,
+            'total_seconds': self._total_seconds,
+            'peak_memory': self._peak_memory,
+            'phases': self.phases,
+            'steps': {
+                step: {
+                    'count': sum(entry['count'] for entry in entries.values()),
+                    'seconds': sum(entry['seconds'] for entry in entries.values()),
+                    'allocated': sum(entry['allocated'] for entry in entries.values()),
+                }
+                for step, entries in self.steps.items()
+            },
+            'slowest': self.slowest(top),
+            'items': self.steps,
+        }
+
+    def write_report(self, path: str, top: int = 10) -> Path:
+        """
+        把分析报告写入 JSON 文件
+
+        Args:
+            path: 报告文件路径
+            top: 报告中列出的最慢文章 / 页面数量
+
+        Returns:
+            报告文件路径
+        """
+        report_path = Path(path)
+        report_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(top), f, ensure_ascii=False, indent=2)
+        return report_path
+
+    def summary(self, top: int = 10) -> str:
+        """
+        生成可读的分析摘要
+
+        Args:
+            top: 列出的最慢文章 / 页面数量
+
+        Returns:
+            多行文本
+        """
+        lines = [f"构建总耗时: {self._total_seconds:.3f}s"]
+        if self.track_memory:
+            lines[0] += f"，内存峰值: {_format_bytes(self._peak_memory)}"
+
+        lines.append("各阶段耗时:")
+        for phase in self.phases:
+            line = f"  {phase['name']:<24} {phase.get('seconds', 0.0):>9.3f}s"
+            if self.track_memory:
+                line += f"  分配 {_format_bytes(phase.get('allocated', 0)):>10}"
+            lines.append(line)
+
+        slowest = self.slowest(top)
+        if slowest:
+            lines.append(f"最慢的 {len(slowest)} 篇文章 / 页面:")
+            for total in slowest:
+                steps = ', '.join(f"{step} {seconds:.3f}s" for step, seconds in sorted(total['steps'].items()))
+                lines.append(f"  {total['seconds']:>9.3f}s  {total['key']}  ({steps})")
+        return '\n'.join(lines)
+
+
+def _format_bytes(size: float) -> str:
+    """把字节数格式化为带单位的字符串"""
+    for unit in ('B', 'KB', 'MB'):
+        if abs(size) < 1024:
+            return f"{size:.0f}{unit}" if unit == 'B' else f"{size:.1f}{unit}"
+        size /= 1024
+    return f"{size:.1f}GB"
@@ -2,20 +2,41 @@
 模板渲染模块
 负责使用 Jinja2 模板引擎渲染各种页面
 """
+from contextlib import contextmanager
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 from datetime import datetime
 from copy import copy
 import base64
+import hashlib
+import hmac
+import json
 import os
-from jinja2 import Environment, FileSystemLoader, TemplateNotFound
+import shutil
+import tempfile
+import jinja2
+from jinja2 import (
+    ChoiceLoader, Environment, FileSystemBytecodeCache, FileSystemLoader,
+    ModuleLoader, Template, TemplateNotFound
+)
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
 
+try:
+    import fcntl
+except ImportError:
+    # Windows 上没有 fcntl，保存密钥文件时不加锁
+    fcntl = None
+
+from .assets import DEFAULT_BUNDLE, AssetError, AssetPipeline
+from .cache import DEFAULT_CACHE_DIR, BuildCache, hash_bytes
 from .config import Config
+from .images import rewrite_images
 from .theme import Theme
 from .markdown_processor import Post
+from .profiler import profile_step
+from .site_index import SiteIndex
 
 # AES-GCM Encryption Constants
 PBKDF2_ITERATIONS = 100_000  # OWASP recommended minimum
@@ -29,27 +50,240 @@ class RendererError(Exception):
     pass
 
 
+class EncryptionKeyCache:
+    """
+    PBKDF2 派生密钥缓存
+    
+    同一密码在一次构建中复用同一个盐值和派生密钥，避免为每篇文章重复执行
+    PBKDF2。可选地将盐值和密钥保存到本地密钥文件，在多次构建之间复用。
+    
+    条目以 HMAC-SHA256(随机密钥, 密码) 为索引，不保存明文密码，也不使用可被
+    离线快速试探的无盐摘要。内存缓存的 HMAC 密钥每次构建随机生成；密钥文件中
+    的 HMAC 密钥随文件一起保存。文件中的派生密钥可以直接解密文章，因此文件权限
+    为仅当前用户可读写，且必须放在构建缓存目录和输出目录之外。
+    
+    并行生成时每个工作进程各有一个缓存实例，保存时在文件锁内合并其他进程写入的条目。
+    """
+    
+    def __init__(self, cache_file: Optional[Path] = None):
+        """
+        初始化密钥缓存
+        
+        Args:
+            cache_file: 本地密钥文件路径，None 表示只在内存中缓存
+        """
+        self.cache_file = cache_file
+        self._secret = os.urandom(KEY_SIZE)
+        self._keys: Dict[str, Tuple[bytes, bytes]] = {}
+        # 本进程新派生的条目（以密码为索引），其他进程先创建了密钥文件时按文件的 HMAC 密钥重新索引
+        self._added: Dict[str, Tuple[bytes, bytes]] = {}
+        self._file_loaded = False
+    
+    def _password_id(self, password: str) -> str:
+        """计算密码的索引（以缓存密钥计算的 HMAC）"""
+        return hmac.new(self._secret, password.encode('utf-8'), hashlib.sha256).hexdigest()
+    
+    def get(self, password: str) -> Optional[Tuple[bytes, bytes]]:
+        """
+        获取密码对应的盐值和派生密钥
+        
+        Args:
+            password: 文章密码
+            
+        Returns:
+            (盐值, 密钥)，未缓存时返回 None
+        """
+        if not self._file_loaded:
+            self._load_file()
+        return self._keys.get(self._password_id(password))
+    
+    def put(self, password: str, salt: bytes, key: bytes) -> None:
+        """
+        缓存密码对应的盐值和派生密钥
+        
+        Args:
+            password: 文章密码
+            salt: 盐值
+            key: 派生密钥
+        """
+        if not self._file_loaded:
+            self._load_file()
+        self._keys[self._password_id(password)] = (salt, key)
+        if self.cache_file is not None:
+            self._added[password] = (salt, key)
+            self._save_file()
+    
+    def _read_file(self) -> Optional[Tuple[bytes, Dict[str, Tuple[bytes, bytes]]]]:
+        """读取密钥文件，返回 (HMAC 密钥, 条目)，文件不存在时返回 None"""
+        if self.cache_file is None or not self.cache_file.exists():
+            return None
+        
+        with open(self.cache_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        secret = base64.b64decode(data['hmac_key'])
+        keys = {
+            password_id: (base64.b64decode(entry['salt']), base64.b64decode(entry['key']))
+            for password_id, entry in data['keys'].items()
+        }
+        return secret, keys
+    
+    def _load_file(self) -> None:
+        """从本地密钥文件加载 HMAC 密钥和条目"""
+        self._file_loaded = True
+        try:
+            loaded = self._read_file()
+        except Exception as e:
+            print(f"  警告: 无法读取密钥缓存，将重新派生密钥: {e}")
+            return
+        if loaded is None:
+            return
+        
+        secret, keys = loaded
+        if secret != self._secret:
+            # 内存中的条目以旧的 HMAC 密钥为索引，切换密钥后无法再命中
+            self._secret = secret
+            self._keys = {}
+        for password_id, entry in keys.items():
+            self._keys.setdefault(password_id, entry)
+    
+    def _save_file(self) -> None:
+        """
+        将密钥写入本地密钥文件（仅当前用户可读写）
+        
+        在文件锁内重新读取密钥文件，合并其他进程已经写入的条目后原子地替换文件，
+        多个进程同时保存时不会互相覆盖。
+        """
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            with self._file_lock():
+                self._merge_file()
+                self._write_file()
+        except Exception as e:
+            print(f"  警告: 无法保存密钥缓存: {e}")
+    
+    @contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        """独占锁定密钥文件旁的锁文件（没有 fcntl 的平台上不加锁）"""
+        if fcntl is None:
+            yield
+            return
+        lock_path = self.cache_file.with_name(self.cache_file.name + '.lock')
+        fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            # 关闭文件时释放锁
+            os.close(fd)
+    
+    def _merge_file(self) -> None:
+        """合并其他进程已经写入密钥文件的条目"""
+        try:
+            loaded = self._read_file()
+        except Exception:
+            loaded = None
+        if loaded is None:
+            return
+        
+        secret, keys = loaded
+        if secret != self._secret:
+            # 其他进程在本进程读取之后创建了密钥文件，改用文件中的 HMAC 密钥
+            self._secret = secret
+            self._keys = {self._password_id(password): entry for password, entry in self._added.items()}
+        for password_id, entry in keys.items():
+            self._keys.setdefault(password_id, entry)
+    
+    def _write_file(self) -> None:
+        """原子地替换密钥文件"""
+        data = {
+            'hmac_key': base64.b64encode(self._secret).decode('utf-8'),
+            'keys': {
+                password_id: {
+                    'salt': base64.b64encode(salt).decode('utf-8'),
+                    'key': base64.b64encode(key).decode('utf-8')
+                }
+                for password_id, (salt, key) in self._keys.items()
+            }
+        }
+        
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_file.parent, suffix='.tmp')
+        try:
+            os.chmod(tmp_path, 0o600)
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.cache_file)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+
+
+class _PostView:
+    """传给模板的文章视图，替换部分属性，其余属性从文章对象读取"""
+    
+    def __init__(self, post: Post, **overrides: Any):
+        self._post = post
+        self.__dict__.update(overrides)
+    
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._post, name)
+
+
 class Renderer:
     """模板渲染器"""
     
-    def __init__(self, theme: Theme, config: Config):
+    def __init__(self, theme: Theme, config: Config, cache_dir: Optional[str] = None):
         """
         初始化渲染器
         
         Args:
             theme: 主题管理器实例
             config: 配置管理器实例
+            cache_dir: 构建缓存目录，用于保存模板字节码，None 表示不缓存
         """
         self.theme = theme
         self.config = config
+        self.cache_dir = cache_dir
+        
+        # 加密密钥缓存（默认只在内存中，可选持久化到本地密钥文件）
+        self.key_cache = EncryptionKeyCache(self._key_cache_file())
+        
+        # 加密结果缓存：明文和密码未变化时复用上次的密文，使页面字节保持不变
+        self.ciphertext_cache: Optional[BuildCache] = None
+        if self.config.get('build.reuse_ciphertext', False):
+            cache_dir = self.config.get('build.cache_dir', DEFAULT_CACHE_DIR)
+            self.ciphertext_cache = BuildCache(cache_dir, 'ciphertext')
+        
+        # 已生成响应式版本的图片 {原图相对 assets/images 的路径: 图片信息}，渲染文章页时改写 <img>
+        self.responsive_images: Dict[str, Dict[str, Any]] = {}
+        
+        # 静态资源处理结果（压缩、脚本包和指纹），url_for_static 和 script_urls 据此生成 URL
+        try:
+            self.assets = AssetPipeline(
+                theme.get_static_dir(),
+                bundles=theme.metadata.get('bundles'),
+                minify=self.config.get('build.minify_assets', False),
+                bundle=self.config.get('build.bundle_assets', False),
+                fingerprint=self.config.get('build.fingerprint_assets', False),
+            )
+        except AssetError as e:
+            raise RendererError(f"处理静态资源失败: {e}")
         
         # 初始化 Jinja2 环境
         templates_dir = theme.get_templates_dir()
+        
+        # 模板字节码缓存：Jinja2 会校验模板源码的校验和，模板修改后自动失效
+        bytecode_cache = None
+        if cache_dir:
+            bytecode_dir = Path(cache_dir) / 'jinja'
+            bytecode_dir.mkdir(parents=True, exist_ok=True)
+            bytecode_cache = FileSystemBytecodeCache(str(bytecode_dir))
+        
         self.env = Environment(
             loader=FileSystemLoader(templates_dir),
             autoescape=True,  # 自动转义 HTML，防止 XSS
             trim_blocks=True,
-            lstrip_blocks=True
+            lstrip_blocks=True,
+            bytecode_cache=bytecode_cache
         )
         
         # 注册自定义过滤器
@@ -57,6 +291,129 @@ class Renderer:
         
         # 注册全局变量
         self._register_globals()
+        
+        # 已解析的模板对象（按逻辑名称索引，如 'post'、'index'）
+        self._templates: Dict[str, Template] = {}
+        
+        # 使用预编译的主题模板模块（编译需要在注册过滤器之后进行）
+        if cache_dir and self.config.get('build.precompile_templates', False):
+            try:
+                compiled_dir = self.precompile_templates()
+                self.env.loader = ChoiceLoader([
+                    ModuleLoader(str(compiled_dir)),
+                    FileSystemLoader(templates_dir)
+                ])
+            except Exception as e:
+                print(f"  警告: 预编译模板失败，使用模板源文件: {e}")
+    
+    def _key_cache_file(self) -> Optional[Path]:
+        """
+        获取跨构建密钥文件路径（build.key_cache_file）
+        
+        构建缓存目录会被 CI 缓存，输出目录会被发布，密钥文件位于其中时拒绝持久化，
+        只在内存中缓存密钥。
+        
+        Returns:
+            密钥文件路径，未配置或位置不安全时返回 None
+        """
+        key_cache_file = self.config.get('build.key_cache_file')
+        if not key_cache_file:
+            return None
+        
+        path = Path(key_cache_file).resolve()
+        for option, default in (('build.cache_dir', DEFAULT_CACHE_DIR), ('build.output_dir', 'public')):
+            directory = Path(self.config.get(option, default)).resolve()
+            if path == directory or directory in path.parents:
+                print(f"  警告: 密钥文件不能位于 {option} 中，密钥只在内存中缓存: {key_cache_file}")
+                return None
+        return path
+    
+    def get_template(self, name: str, fallback: Optional[str] = None) -> Template:
+        """
+        获取已编译的模板对象
+        
+        模板按逻辑名称在整个构建中只解析一次，避免每个页面都检查文件系统。
+        
+        Args:
+            name: 模板逻辑名称（如 'post'、'index'、'encrypted_post'）
+            fallback: 主题未配置该模板时使用的模板逻辑名称
+            
+        Returns:
+            Jinja2 模板对象
+            
+        Raises:
+            ThemeError, TemplateNotFound: 模板未配置或文件不存在
+        """
+        if fallback is not None and not self.theme.has_template(name):
+            name = fallback
+        
+        template = self._templates.get(name)
+        if template is None:
+            template_path = self.theme.get_template(name)
+            template = self.env.get_template(Path(template_path).name)
+            self._templates[name] = template
+        return template
+    
+    def invalidate_templates(self) -> None:
+        """
+        清空已解析的模板
+        
+        主题模板或 theme.json 发生变化时调用（例如监视模式下），
+        下次渲染时会重新解析模板。
+        """
+        self._templates.clear()
+        if self.env.cache is not None:
+            self.env.cache.clear()
+    
+    def _templates_digest(self) -> str:
+        """
+        计算主题模板的摘要
+        
+        Returns:
+            由所有模板文件内容和 Jinja2 版本计算的摘要
+        """
+        templates_dir = Path(self.theme.get_templates_dir())
+        parts: List[Any] = [jinja2.__version__]
+        for template_file in sorted(templates_dir.rglob('*')):
+            if template_file.is_file():
+                parts.append(template_file.relative_to(templates_dir).as_posix())
+                parts.append(template_file.read_bytes())
+        return hash_bytes(*parts)
+    
+    def precompile_templates(self) -> Path:
+        """
+        将主题模板预编译为 Python 模块
+        
+        编译结果保存在缓存目录中，目录名包含模板摘要，
+        模板未变化时直接复用已编译的模块。
+        
+        Returns:
+            预编译模块所在目录
+            
+        Raises:
+            RendererError: 未配置缓存目录
+        """
+        if not self.cache_dir:
+            raise RendererError("预编译模板需要配置缓存目录")
+        
+        compiled_root = Path(self.cache_dir) / 'templates-compiled'
+        compiled_dir = compiled_root / self._templates_digest()
+        if compiled_dir.exists():
+            return compiled_dir
+        
+        # 先编译到临时目录再重命名，避免其他进程读到不完整的结果
+        compiled_root.mkdir(parents=True, exist_ok=True)
+        tmp_dir = Path(tempfile.mkdtemp(dir=compiled_root, prefix='.tmp-'))
+        try:
+            self.env.compile_templates(str(tmp_dir), zip=None)
+            os.replace(tmp_dir, compiled_dir)
+        except OSError:
+            # 其他进程已经完成了编译
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            if not compiled_dir.exists():
+                raise
+        
+        return compiled_dir
     
     def _register_filters(self) -> None:
         """注册自定义 Jinja2 过滤器"""
@@ -112,14 +469,18 @@ class Renderer:
             return f'{base_path}{path}'
         
         def url_for_static(path: str) -> str:
-            """生成静态资源 URL"""
-            # 确保路径以 static/ 开头
-            if not path.startswith('static/'):
-                path = f'static/{path}'
-            return url_for(path)
+            """生成静态资源 URL（启用资源指纹时使用带哈希的文件名）"""
+            if path.startswith('static/'):
+                path = path[len('static/'):]
+            return url_for(f'static/{self.assets.url_path(path)}')
+        
+        def script_urls(page_type: str = DEFAULT_BUNDLE) -> List[str]:
+            """生成页面需要加载的脚本 URL（启用打包时只有一个脚本包）"""
+            return [url_for_static(path) for path in self.assets.scripts(page_type)]
         
         self.env.globals['url_for'] = url_for
         self.env.globals['url_for_static'] = url_for_static
+        self.env.globals['script_urls'] = script_urls
     
     def _derive_key(self, password: str, salt: bytes) -> bytes:
         """
@@ -140,6 +501,25 @@ class Renderer:
         )
         return kdf.derive(password.encode('utf-8'))
     
+    def _get_key(self, password: str) -> Tuple[bytes, bytes]:
+        """
+        Get the salt and derived key for a password, deriving them only once.
+        
+        Args:
+            password: User's password
+        
+        Returns:
+            (salt, key) tuple
+        """
+        cached = self.key_cache.get(password)
+        if cached is not None:
+            return cached
+        
+        salt = os.urandom(SALT_SIZE)
+        key = self._derive_key(password, salt)
+        self.key_cache.put(password, salt, key)
+        return salt, key
+    
     def _encrypt_content(self, content: str, password: str) -> str:
         """
         Encrypt content using AES-GCM-256.
@@ -151,13 +531,10 @@ class Renderer:
         Returns:
             Encrypted data in format: "salt:nonce:ciphertext" (Base64 encoded)
         """
-        # Generate random salt and nonce
-        salt = os.urandom(SALT_SIZE)
+        # Reuse the per-password salt and key; the nonce must be fresh for every encryption
+        salt, key = self._get_key(password)
         nonce = os.urandom(NONCE_SIZE)
         
-        # Derive key from password
-        key = self._derive_key(password, salt)
-        
         # Encrypt using AES-GCM
         cipher = Cipher(
             algorithms.AES(key),
@@ -177,13 +554,59 @@ class Renderer:
         
         return f"{salt_b64}:{nonce_b64}:{ciphertext_b64}"
     
+    def _encrypt_post_html(self, post: Post) -> str:
+        """
+        加密文章 HTML，明文未变化时复用上次构建的密文
+        
+        复用条件通过保存的摘要判断：摘要由文章 HTML 和密码摘要计算，
+        任一变化都会重新加密。
+        
+        Args:
+            post: 加密文章
+            
+        Returns:
+            加密后的数据（格式同 _encrypt_content）
+        """
+        html = self.post_html(post)
+        if self.ciphertext_cache is None:
+            return self._encrypt_content(html, post.password)
+        
+        cache_key = hash_bytes('ciphertext', post.relative_path)
+        digest = hash_bytes('ciphertext', html, post.password)
+        
+        entry = self.ciphertext_cache.get(cache_key)
+        if entry is not None and entry.get('digest') == digest:
+            return entry['ciphertext']
+        
+        encrypted_html = self._encrypt_content(html, post.password)
+        self.ciphertext_cache.set(cache_key, {'digest': digest, 'ciphertext': encrypted_html})
+        return encrypted_html
+    
+    def post_html(self, post: Post) -> str:
+        """
+        获取文章页使用的正文 HTML
+        
+        文章引用了已生成响应式版本的图片时，把 <img> 改写为带 srcset 的标签。
+        改写结果不赋值回文章对象，按需加载的正文（LazyPost）渲染后仍可释放。
+        
+        Args:
+            post: 文章对象
+            
+        Returns:
+            正文 HTML
+        """
+        if not self.responsive_images or not post.images:
+            return post.html
+        base_path = (self.config.get('site.base_path', '') or '').rstrip('/')
+        return rewrite_images(post.html, self.responsive_images, f'{base_path}/assets/images/')
+    
     def render_index(self, posts: List[Post], page: int = 1, 
                     posts_per_page: Optional[int] = None) -> str:
         """
         渲染首页
         
         Args:
-            posts: 文章列表（已排序）
+            posts: 文章或文章摘要（PostSummary）列表（已排序）
             page: 当前页码（从 1 开始）
             posts_per_page: 每页文章数，None 表示不分页
             
@@ -194,8 +617,7 @@ class Renderer:
             RendererError: 渲染失败
         """
         try:
-            template_path = self.theme.get_template('index')
-            template = self.env.get_template(Path(template_path).name)
+            template = self.get_template('index')
         except Exception as e:
             raise RendererError(f"无法加载首页模板: {e}")
         
@@ -261,11 +683,11 @@ class Renderer:
             if self.theme.has_template('encrypted_post'):
                 # 主题支持加密 - 加密内容并使用加密模板
                 try:
-                    encrypted_html = self._encrypt_content(post.html, post.password)
+                    with profile_step('encrypt', post.relative_path):
+                        encrypted_html = self._encrypt_post_html(post)
                     
                     # 使用加密模板渲染，传递加密后的内容
-                    template_path = self.theme.get_template('encrypted_post')
-                    template = self.env.get_template(Path(template_path).name)
+                    template = self.get_template('encrypted_post')
                     
                     # 创建一个包含加密内容的上下文
                     context = {
@@ -273,11 +695,8 @@ class Renderer:
                         'encrypted_html': encrypted_html
                     }
                     
-                    # 临时替换 post.html 为加密内容
-                    original_html = post.html
-                    post.html = encrypted_html
-                    html = template.render(post=post)
-                    post.html = original_html  # 恢复原始内容
+                    # 模板中的 post.html 替换为加密内容（不修改文章对象）
+                    html = template.render(post=_PostView(post, html=encrypted_html))
                     
                     return html
                 except Exception as e:
@@ -285,36 +704,34 @@ class Renderer:
             else:
                 # 主题不支持加密 - 显示提示信息
                 try:
-                    template_path = self.theme.get_template('post')
-                    template = self.env.get_template(Path(template_path).name)
+                    template = self.get_template('post')
                     
-                    # 临时替换内容为提示信息
-                    original_html = post.html
-                    post.html = '<div class="encrypted-notice"><p>⚠️ 当前主题不支持加密文章功能</p><p>请更换支持加密的主题或联系主题开发者添加加密模板支持。</p></div>'
-                    html = template.render(post=post)
-                    post.html = original_html  # 恢复原始内容
+                    # 模板中的 post.html 替换为提示信息（不修改文章对象）
+                    notice = '<div class="encrypted-notice"><p>⚠️ 当前主题不支持加密文章功能</p><p>请更换支持加密的主题或联系主题开发者添加加密模板支持。</p></div>'
+                    html = template.render(post=_PostView(post, html=notice))
                     
                     return html
                 except Exception as e:
                     raise RendererError(f"渲染文章页失败: {e}")
         
-        # 普通文章 - 正常渲染
+        # 普通文章 - 正常渲染（模板中的 post.html 替换为改写图片后的正文，不修改文章对象）
         try:
-            template_path = self.theme.get_template('post')
-            template = self.env.get_template(Path(template_path).name)
-            html = template.render(post=post)
+            template = self.get_template('post')
+            html = template.render(post=_PostView(post, html=self.post_html(post)))
             return html
         except Exception as e:
             raise RendererError(f"渲染文章页失败: {e}")
 
-    def render_archive(self, posts: List[Post]) -> str:
+    def render_archive(self, posts: List[Post],
+                       archive: Optional[Dict[int, Dict[int, List[Post]]]] = None) -> str:
         """
         渲染归档页
         
         归档页按年份和月份组织文章列表
         
         Args:
-            posts: 文章列表（已排序）
+            posts: 文章或文章摘要列表（已排序）
+            archive: 按年份和月份分组的文章（见 SiteIndex.archive），None 表示根据 posts 分组
             
         Returns:
             渲染后的 HTML 字符串
@@ -324,16 +741,12 @@ class Renderer:
         """
         # 尝试使用归档模板，如果不存在则使用首页模板
         try:
-            if self.theme.has_template('archive'):
-                template_path = self.theme.get_template('archive')
-            else:
-                template_path = self.theme.get_template('index')
-            template = self.env.get_template(Path(template_path).name)
+            template = self.get_template('archive', fallback='index')
         except Exception as e:
             raise RendererError(f"无法加载归档模板: {e}")
         
         # 按年份和月份组织文章
-        archive_data = self._organize_posts_by_date(posts)
+        archive_data = archive if archive is not None else SiteIndex(posts).archive
         
         try:
             html = template.render(
@@ -353,7 +766,7 @@ class Renderer:
         
         Args:
             tag: 标签名称
-            posts: 该标签下的文章列表
+            posts: 该标签下的文章或文章摘要列表
             
         Returns:
             渲染后的 HTML 字符串
@@ -363,11 +776,7 @@ class Renderer:
         """
         # 尝试使用标签模板，如果不存在则使用首页模板
         try:
-            if self.theme.has_template('tag'):
-                template_path = self.theme.get_template('tag')
-            else:
-                template_path = self.theme.get_template('index')
-            template = self.env.get_template(Path(template_path).name)
+            template = self.get_template('tag', fallback='index')
         except Exception as e:
             raise RendererError(f"无法加载标签模板: {e}")
         
@@ -398,11 +807,7 @@ class Renderer:
         """
         # 尝试使用标签索引模板，如果不存在则使用首页模板
         try:
-            if self.theme.has_template('tags'):
-                template_path = self.theme.get_template('tags')
-            else:
-                template_path = self.theme.get_template('index')
-            template = self.env.get_template(Path(template_path).name)
+            template = self.get_template('tags', fallback='index')
         except Exception as e:
             raise RendererError(f"无法加载标签索引模板: {e}")
         
@@ -425,48 +830,14 @@ class Renderer:
         except Exception as e:
             raise RendererError(f"渲染标签索引页失败: {e}")
     
-    def _organize_posts_by_date(self, posts: List[Post]) -> Dict[int, Dict[int, List[Post]]]:
-        """
-        按年份和月份组织文章
-        
-        Args:
-            posts: 文章列表
-            
-        Returns:
-            嵌套字典: {year: {month: [posts]}}
-        """
-        archive: Dict[int, Dict[int, List[Post]]] = {}
-        
-        for post in posts:
-            year = post.date.year
-            month = post.date.month
-            
-            if year not in archive:
-                archive[year] = {}
-            
-            if month not in archive[year]:
-                archive[year][month] = []
-            
-            archive[year][month].append(post)
-        
-        return archive
-    
     def get_all_tags(self, posts: List[Post]) -> Dict[str, List[Post]]:
         """
         从文章列表中提取所有标签
         
         Args:
-            posts: 文章列表
+            posts: 文章或文章摘要列表
             
         Returns:
-            标签到文章列表的映射
+            标签到文章列表的映射（生成器使用 SiteIndex.tags，不重复遍历文章）
         """
-        tags_map: Dict[str, List[Post]] = {}
-        
-        for post in posts:
-            for tag in post.tags:
-                if tag not in tags_map:
-                    tags_map[tag] = []
-                tags_map[tag].append(post)
-        
-        return tags_map
+        return SiteIndex(posts).tags
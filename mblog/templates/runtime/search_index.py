@@ -0,0 +1,261 @@
+"""
+搜索索引模块
+负责构建客户端全文搜索使用的倒排索引
+"""
+import html
+import math
+import re
+from collections import Counter
+from datetime import date, timedelta
+from typing import Any, Dict, List, Tuple
+
+from .markdown_processor import Post
+
+# 倒排索引格式版本，search.js 根据版本判断能否使用索引
+SEARCH_INDEX_VERSION = 2
+
+# 倒排索引分片所在目录（相对于输出目录）
+SEARCH_SHARD_DIR = 'search-index'
+
+# 每个分片的目标索引词数量，分片数量按索引词总数计算
+TERMS_PER_SHARD = 2000
+MAX_SHARDS = 256
+
+# 中日韩文字范围（中文、日文假名、韩文），这些文字之间没有空格，按二元组切分
+CJK_CHARS = '\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff'
+
+# 由字母和数字组成的连续片段（不含下划线）
+_WORD_RE = re.compile(r'[^\W_]+')
+_CJK_SPLIT_RE = re.compile(f'([{CJK_CHARS}]+)')
+
+_TAG_RE = re.compile(r'<[^>]+>')
+_SCRIPT_STYLE_RE = re.compile(r'<(script|style)\b.*?</\1\s*>', re.IGNORECASE | re.DOTALL)
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    将文本切分为索引词
+
+    文本先转换为小写，按字母和数字的连续片段切分。片段中的中日韩文字
+    按相邻两个字切分为二元组，并保留最后一个字，使每个字都是某个索引词的开头，
+    单字查询可以按前缀找到所有包含该字的文章；其余部分作为完整的词。
+    search.js 中的 tokenize 使用相同的规则处理查询。
+
+    Args:
+        text: 原始文本
+
+    Returns:
+        索引词列表（可能包含重复的词）
+
+    Examples:
+        "Python 入门教程" -> ["python", "入门", "门教", "教程", "程"]
+    """
+    tokens = []
+    for word in _WORD_RE.findall(text.lower()):
+        for i, part in enumerate(_CJK_SPLIT_RE.split(word)):
+            if not part:
+                continue
+            if i % 2 == 0:
+                # 非中日韩文字部分
+                tokens.append(part)
+            elif len(part) == 1:
+                tokens.append(part)
+            else:
+                tokens.extend(part[j:j + 2] for j in range(len(part) - 1))
+                tokens.append(part[-1])
+    return tokens
+
+
+def post_terms(*texts: str) -> List[str]:
+    """
+    获取一篇文章的索引词（去重，保持首次出现的顺序）
+
+    Args:
+        texts: 需要索引的文本（标题、描述、正文等）
+
+    Returns:
+        索引词列表
+    """
+    terms: Dict[str, None] = {}
+    for text in texts:
+        if text:
+            terms.update(dict.fromkeys(tokenize(text)))
+    return list(terms)
+
+
+def shard_for(term: str, shard_count: int) -> int:
+    """
+    计算索引词所在的分片
+
+    按首字符分片，同一前缀的索引词总在同一个分片中，前缀查询只需加载一个分片。
+    search.js 中的 shardFor 使用相同的规则。
+
+    Args:
+        term: 索引词
+        shard_count: 分片数量
+
+    Returns:
+        分片编号
+    """
+    return ord(term[0]) % shard_count
+
+
+def html_to_text(content: str) -> str:
+    """
+    提取 HTML 中的纯文本
+
+    Args:
+        content: HTML 内容
+
+    Returns:
+        去除标签、脚本和样式后的文本
+    """
+    content = _SCRIPT_STYLE_RE.sub(' ', content)
+    content = _TAG_RE.sub(' ', content)
+    return html.unescape(content)
+
+
+def encode_posts(posts: List[Post]) -> Dict[str, Any]:
+    """
+    将文章元数据编码为列式结构
+
+    每个字段保存为一个与文章顺序一致的数组：标签替换为标签表中的编号，
+    日期保存为相对于最早日期的天数，文章 URL 由客户端根据相对路径生成。
+
+    Args:
+        posts: 文章列表
+
+    Returns:
+        {'epoch': 最早日期, 'tags': 标签表, 'columns': {字段名: 数组}}
+    """
+    # 出现次数多的标签使用较小的编号
+    tag_counts = Counter(tag for post in posts for tag in post.tags)
+    tag_names = sorted(tag_counts, key=lambda tag: (-tag_counts[tag], tag))
+    tag_ids = {tag: i for i, tag in enumerate(tag_names)}
+
+    dates = [post.date.date() for post in posts]
+    epoch = min(dates) if dates else date(1970, 1, 1)
+
+    return {
+        'epoch': epoch.isoformat(),
+        'tags': tag_names,
+        'columns': {
+            'title': [post.title for post in posts],
+            'path': [post.relative_path for post in posts],
+            'date': [(post_date - epoch).days for post_date in dates],
+            'tags': [[tag_ids[tag] for tag in post.tags] for post in posts],
+            'description': [post.description for post in posts],
+        },
+    }
+
+
+def decode_posts(data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    将搜索索引中的列式文章元数据还原为逐篇文章的字典
+
+    与 search.js 中的 decodePosts 相同，主要用于测试和调试。
+
+    Args:
+        data: 搜索索引文件的内容
+
+    Returns:
+        文章字典列表，包含 title、url、date、tags、description、relative_path
+    """
+    columns = data['columns']
+    base_path = data.get('base_path', '')
+    epoch = date.fromisoformat(data['epoch'])
+    tag_names = data['tags']
+
+    return [
+        {
+            'title': title,
+            'url': f'{base_path}/posts/{path}.html',
+            'date': (epoch + timedelta(days=offset)).isoformat(),
+            'tags': [tag_names[i] for i in tag_ids],
+            'description': description,
+            'relative_path': path,
+        }
+        for title, path, offset, tag_ids, description in zip(
+            columns['title'], columns['path'], columns['date'],
+            columns['tags'], columns['description']
+        )
+    ]
+
+
+class SearchIndexBuilder:
+    """倒排索引构建器，逐篇添加文章后生成 {索引词: 文章编号列表}"""
+
+    def __init__(self):
+        """初始化构建器"""
+        self._postings: Dict[str, List[int]] = {}
+        self.doc_count = 0
+
+    def add_post(self, *texts: str) -> int:
+        """
+        添加一篇文章
+
+        文章编号按添加顺序从 0 开始递增，与搜索索引中 posts 列表的下标一致，
+        因此每个索引词的文章编号列表总是升序的。
+
+        Args:
+            texts: 需要索引的文本（标题、描述、正文等）
+
+        Returns:
+            文章编号
+        """
+        return self.add_terms(post_terms(*texts))
+
+    def add_terms(self, terms: List[str]) -> int:
+        """
+        添加一篇已切分为索引词的文章（见 post_terms）
+
+        Args:
+            terms: 文章的索引词，不能重复
+
+        Returns:
+            文章编号
+        """
+        doc_id = self.doc_count
+        self.doc_count += 1
+
+        for term in terms:
+            self._postings.setdefault(term, []).append(doc_id)
+        return doc_id
+
+    def reorder(self, order: List[int]) -> None:
+        """
+        按新的文章顺序重新编号
+
+        流式生成时文章按解析完成的顺序添加，全部添加后才能按日期排序，
+        排序后用此方法使文章编号与搜索索引中 posts 列表的下标重新一致。
+
+        Args:
+            order: 新顺序中每个位置对应的原文章编号
+        """
+        new_ids = [0] * len(order)
+        for new_id, old_id in enumerate(order):
+            new_ids[old_id] = new_id
+        for term, postings in self._postings.items():
+            self._postings[term] = sorted(new_ids[doc_id] for doc_id in postings)
+
+    def build(self) -> Tuple[Dict[str, Any], Dict[int, Dict[str, Any]]]:
+        """
+        生成分片的倒排索引
+
+        Returns:
+            (索引描述, {分片编号: 分片内容})。索引描述写入搜索索引文件，
+            记录分片数量和非空分片的编号；分片内容中的索引词按字典序排列
+        """
+        shard_count = min(MAX_SHARDS, max(1, math.ceil(len(self._postings) / TERMS_PER_SHARD)))
+
+        shards: Dict[int, Dict[str, Any]] = {}
+        for term in sorted(self._postings):
+            shard = shards.setdefault(shard_for(term, shard_count), {'terms': {}})
+            shard['terms'][term] = self._postings[term]
+
+        index = {
+            'version': SEARCH_INDEX_VERSION,
+            'shard_count': shard_count,
+            'shards': sorted(shards),
+        }
+        return index, shards
@@ -0,0 +1,552 @@
+"""
+本地预览服务器模块
+监视文章、主题和配置文件的变化，只重新生成受影响的页面并保存在内存中，
+通过本地 HTTP 服务器提供访问，页面更新后浏览器自动刷新
+"""
+import argparse
+import mimetypes
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+from urllib.parse import parse_qs, unquote, urlparse
+
+from .assets import AssetPipeline
+from .cache import DEFAULT_CACHE_DIR
+from .config import Config
+from .generator import StaticGenerator
+from .markdown_processor import MarkdownProcessor, Post
+from .renderer import Renderer
+from .search_index import SEARCH_SHARD_DIR
+from .theme import Theme
+
+# 浏览器轮询页面版本的接口地址
+RELOAD_ENDPOINT = '/__mblog/reload'
+
+# 注入到每个 HTML 页面的自动刷新脚本（长轮询，版本变化后刷新页面）
+LIVE_RELOAD_SCRIPT = """<script>
+(function () {
+    var version = %d;
+    function poll() {
+        fetch('%s?v=' + version).then(function (response) {
+            return response.text();
+        }).then(function (text) {
+            if (text !== String(version)) {
+                location.reload();
+            } else {
+                poll();
+            }
+        }).catch(function () {
+            setTimeout(poll, 1000);
+        });
+    }
+    poll();
+})();
+</script>
+"""
+
+
+class MemoryGenerator(StaticGenerator):
+    """
+    将页面保存在内存中而不是写入输出目录的生成器
+
+    预览服务器的请求线程不加锁读取 pages。重新生成时在页面副本上删除和写入
+    （见 rebuilding()），完成后以一次赋值替换 pages，请求线程始终读到完整的页面集合。
+    """
+
+    def __init__(self, config: Config, theme: Theme, renderer: Renderer, posts: List[Post]):
+        """
+        初始化生成器
+
+        Args:
+            config: 配置管理器实例
+            theme: 主题管理器实例
+            renderer: 渲染器实例
+            posts: 文章列表
+        """
+        super().__init__(config, theme, renderer, posts)
+        self.pages: Dict[str, bytes] = {}
+        # 文章引用的图片 {相对 assets/images 的路径: 源文件}，服务器只提供这些图片
+        self.images: Dict[str, Path] = {}
+        # 重新生成期间写入的页面副本，None 表示直接写入 pages
+        self._staging: Optional[Dict[str, bytes]] = None
+
+        # 内存中的页面只能在当前进程中生成，也不需要增量清单
+        self.workers = 1
+        self.incremental = False
+        self.write_if_changed = False
+        self.precompress = False
+
+    def _prepare_output_dir(self) -> None:
+        """不使用输出目录"""
+        pass
+
+    def _copy_static_assets(self) -> None:
+        """静态资源和文章图片由服务器直接从主题目录和 md 目录读取"""
+        pass
+
+    def _write_file(self, filepath: Path, content: str) -> bool:
+        """
+        保存页面内容到内存
+
+        Args:
+            filepath: 页面在输出目录中的路径
+            content: 页面内容
+
+        Returns:
+            总是返回 True
+        """
+        key = filepath.relative_to(self.output_dir).as_posix()
+        self._target_pages[key] = content.encode('utf-8')
+        return True
+
+    def refresh_images(self) -> None:
+        """重新收集文章引用的图片（文章列表变化后调用），完成后以一次赋值替换 images"""
+        self._post_images = None
+        images_dest = self.output_dir / 'assets' / 'images'
+        self.images = {
+            img_dest.relative_to(images_dest).as_posix(): img_src
+            for img_src, img_dest in self._collect_post_images().items()
+        }
+
+    @property
+    def _target_pages(self) -> Dict[str, bytes]:
+        """页面写入和删除的目标（重新生成期间为副本）"""
+        return self.pages if self._staging is None else self._staging
+
+    @contextmanager
+    def rebuilding(self) -> Iterator[Dict[str, bytes]]:
+        """
+        在页面副本上重新生成，成功后以一次赋值替换 pages
+
+        生成失败时保留原来的页面。
+
+        Yields:
+            页面副本，可直接删除其中的页面
+        """
+        self._staging = dict(self.pages)
+        try:
+            yield self._staging
+            self.pages = self._staging
+        finally:
+            self._staging = None
+
+    def remove_pages(self, prefix: str) -> None:
+        """
+        删除指定前缀下的所有页面
+
+        Args:
+            prefix: 页面路径前缀，如 'tags/'
+        """
+        pages = self._target_pages
+        for key in [key for key in pages if key.startswith(prefix)]:
+            del pages[key]
+
+    def generate_post_pages(self, posts: List[Post]) -> None:
+        """
+        重新生成指定文章的详情页
+
+        Args:
+            posts: 需要重新生成的文章
+        """
+        indexes = {id(post): index for index, post in enumerate(self.posts)}
+        jobs = [
+            ('post', self.output_dir / 'posts' / f'{post.relative_path}.html', indexes[id(post)])
+            for post in posts
+        ]
+        self._run_page_jobs(jobs)
+
+    def generate_listing_pages(self) -> None:
+        """重新生成依赖文章列表的页面（首页分页、标签页、归档页、订阅、搜索索引）"""
+        self.remove_pages('page/')
+        self.remove_pages('tags/')
+        self.remove_pages(f'{SEARCH_SHARD_DIR}/')
+
+        self._generate_index_pages()
+        self._generate_tag_pages()
+        self._generate_archive_page()
+
+        if self.config.get('build.generate_rss', True):
+            self._generate_rss()
+        if self.config.get('build.generate_sitemap', True):
+            self._generate_sitemap()
+        self._generate_search_index()
+
+
+class FileWatcher:
+    """基于轮询的文件变化监视器"""
+
+    def __init__(self, paths: List[Path]):
+        """
+        初始化监视器
+
+        Args:
+            paths: 需要监视的文件或目录
+        """
+        self.paths = paths
+        self._snapshot = self._take_snapshot()
+
+    def _take_snapshot(self) -> Dict[Path, Tuple[int, int]]:
+        """记录所有被监视文件的修改时间和大小"""
+        snapshot: Dict[Path, Tuple[int, int]] = {}
+        for path in self.paths:
+            if path.is_file():
+                files = [path]
+            elif path.is_dir():
+                files = [f for f in path.rglob('*') if f.is_file()]
+            else:
+                continue
+
+            for file in files:
+                try:
+                    stat = file.stat()
+                except OSError:
+                    continue
+                snapshot[file] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def poll(self) -> Tuple[Set[Path], Set[Path]]:
+        """
+        检查自上次轮询以来的变化
+
+        Returns:
+            (新增或修改的文件, 删除的文件)
+        """
+        snapshot = self._take_snapshot()
+        changed = {path for path, state in snapshot.items() if self._snapshot.get(path) != state}
+        removed = set(self._snapshot) - set(snapshot)
+        self._snapshot = snapshot
+        return changed, removed
+
+
+class DevServer:
+    """本地预览服务器"""
+
+    def __init__(self, config_path: str = 'config.json', md_dir: str = 'md', theme_dir: str = 'theme',
+                 host: str = '127.0.0.1', port: int = 8000, interval: float = 0.1):
+        """
+        初始化预览服务器
+
+        Args:
+            config_path: 配置文件路径
+            md_dir: Markdown 文章目录
+            theme_dir: 主题目录
+            host: 监听地址
+            port: 监听端口
+            interval: 文件变化轮询间隔（秒）
+        """
+        self.config_path = Path(config_path).resolve()
+        self.md_dir = Path(md_dir).resolve()
+        self.theme_dir = Path(theme_dir).resolve()
+        self.host = host
+        self.port = port
+        self.interval = interval
+
+        self.version = 0
+        self._condition = threading.Condition()
+        self._httpd: Optional[ThreadingHTTPServer] = None
+
+        self.config: Optional[Config] = None
+        self.theme: Optional[Theme] = None
+        self.renderer: Optional[Renderer] = None
+        self.processor: Optional[MarkdownProcessor] = None
+        self.generator: Optional[MemoryGenerator] = None
+        self.base_path = ""
+
+    # ------------------------------------------------------------------
+    # 构建
+    # ------------------------------------------------------------------
+
+    def load(self) -> None:
+        """加载配置、主题和所有文章，并在内存中生成全部页面"""
+        self.config = Config(str(self.config_path))
+        self.config.load()
+
+        base_path = self.config.get('site.base_path', '') or ''
+        base_path = base_path.strip().rstrip('/')
+        if base_path and not base_path.startswith('/'):
+            base_path = '/' + base_path
+        self.base_path = base_path
+
+        cache_dir = None
+        if self.config.get('build.cache', True):
+            cache_dir = self.config.get('build.cache_dir', DEFAULT_CACHE_DIR)
+
+        self.processor = MarkdownProcessor(str(self.md_dir), base_path=base_path, cache_dir=cache_dir)
+        posts = self.processor.load_posts(workers=self.config.get('build.workers', 1))
+
+        self._load_theme(cache_dir)
+        # 生成完全部页面后再替换生成器，请求线程不会读到未生成完的页面
+        generator = MemoryGenerator(self.config, self.theme, self.renderer, posts)
+        generator._generate_pages()
+        generator.refresh_images()
+        self.generator = generator
+
+    def _load_theme(self, cache_dir: Optional[str]) -> None:
+        """加载主题并创建渲染器"""
+        self.theme = Theme(str(self.theme_dir))
+        self.theme.load()
+        self.renderer = Renderer(self.theme, self.config, cache_dir=cache_dir)
+        # 预览时静态资源直接从主题目录读取，不压缩、不打包，也不使用带指纹的文件名
+        self.renderer.assets = AssetPipeline(
+            self.theme.get_static_dir(), bundles=self.theme.metadata.get('bundles')
+        )
+
+    def rebuild_posts(self, changed: Set[Path], removed: Set[Path]) -> None:
+        """
+        重新解析变化的文章，只重新生成这些文章的详情页和依赖文章列表的页面
+
+        Args:
+            changed: 新增或修改的 Markdown 文件
+            removed: 删除的 Markdown 文件
+        """
+        generator = self.generator
+        affected = {str(path) for path in changed | removed}
+
+        # 重新解析新增或修改的文章
+        updated = []
+        for path in sorted(changed):
+            try:
+                updated.append(self.processor.parse_post(str(path)))
+            except Exception as e:
+                print(f"警告: 无法解析文件 {path}: {e}")
+
+        with generator.rebuilding() as pages:
+            # 移除变化和删除的文章的详情页
+            stale = []
+            for post in generator.posts:
+                if post.filepath in affected:
+                    pages.pop(f'posts/{post.relative_path}.html', None)
+                    stale.append(post.relative_path)
+
+            # 增量更新文章列表和站点索引
+            generator.update_posts(updated, stale)
+
+            generator.generate_post_pages(updated)
+            generator.generate_listing_pages()
+        generator.refresh_images()
+
+    def rebuild_all(self) -> None:
+        """使用已加载的文章重新生成所有页面（主题变化时）"""
+        self.renderer.invalidate_templates()
+        with self.generator.rebuilding() as pages:
+            pages.clear()
+            self.generator._generate_pages()
+
+    def handle_changes(self, changed: Set[Path], removed: Set[Path]) -> bool:
+        """
+        根据变化的文件决定需要重新生成的内容
+
+        Args:
+            changed: 新增或修改的文件
+            removed: 删除的文件
+
+        Returns:
+            是否有需要浏览器刷新的变化
+        """
+        paths = changed | removed
+        if not paths:
+            return False
+
+        templates_dir = self.theme_dir / 'templates'
+
+        if self.config_path in paths:
+            # 配置变化影响所有页面
+            self.load()
+        elif self.theme_dir / 'theme.json' in paths:
+            # 模板映射变化，重新加载主题
+            self._load_theme(self.renderer.cache_dir)
+            self.generator.theme = self.theme
+            self.generator.renderer = self.renderer
+            self.rebuild_all()
+        elif any(self._is_within(path, templates_dir) for path in paths):
+            self.rebuild_all()
+        else:
+            md_changed = {p for p in changed if self._is_within(p, self.md_dir) and p.suffix == '.md'}
+            md_removed = {p for p in removed if self._is_within(p, self.md_dir) and p.suffix == '.md'}
+            other_md_files = {p for p in paths if self._is_within(p, self.md_dir) and p.suffix != '.md'}
+
+            if other_md_files:
+                # 图片增删会改变文章中的图片路径，重新加载全部文章（未变化的文章命中缓存）
+                md_changed |= set(self.md_dir.rglob('*.md'))
+            if md_changed or md_removed:
+                self.rebuild_posts(md_changed, md_removed)
+
+        return True
+
+    @staticmethod
+    def _is_within(path: Path, directory: Path) -> bool:
+        """判断路径是否位于目录中"""
+        try:
+            path.relative_to(directory)
+            return True
+        except ValueError:
+            return False
+
+    # ------------------------------------------------------------------
+    # HTTP 服务
+    # ------------------------------------------------------------------
+
+    def notify_reload(self) -> None:
+        """增加页面版本号，通知等待中的浏览器刷新"""
+        with self._condition:
+            self.version += 1
+            self._condition.notify_all()
+
+    def wait_for_change(self, version: int, timeout: float = 25.0) -> int:
+        """
+        等待页面版本变化（长轮询）
+
+        Args:
+            version: 浏览器当前的页面版本
+            timeout: 最长等待时间（秒）
+
+        Returns:
+            最新的页面版本
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self.version != version, timeout=timeout)
+            return self.version
+
+    def resolve(self, url_path: str) -> Optional[Tuple[bytes, str]]:
+        """
+        根据请求路径查找内容
+
+        Args:
+            url_path: 请求的 URL 路径（已解码）
+
+        Returns:
+            (内容, Content-Type)，不存在时返回 None
+        """
+        # 只去掉完整的路径段，/blogfoo 不属于 /blog
+        if self.base_path and (url_path == self.base_path or url_path.startswith(self.base_path + '/')):
+            url_path = url_path[len(self.base_path):]
+
+        rel_path = url_path.lstrip('/')
+        if rel_path == '' or rel_path.endswith('/'):
+            rel_path += 'index.html'
+
+        content_type = mimetypes.guess_type(rel_path)[0] or 'application/octet-stream'
+
+        page = self.generator.pages.get(rel_path)
+        if page is not None:
+            if rel_path.endswith('.html'):
+                script = (LIVE_RELOAD_SCRIPT % (self.version, RELOAD_ENDPOINT)).encode('utf-8')
+                if b'</body>' in page:
+                    page = page.replace(b'</body>', script + b'</body>', 1)
+                else:
+                    page += script
+                content_type = 'text/html; charset=utf-8'
+            return page, content_type
+
+        # 文章图片只提供文章中引用的文件（md 目录中还有包含加密文章密码的源文件）
+        if rel_path.startswith('assets/images/'):
+            img_src = self.generator.images.get(rel_path[len('assets/images/'):])
+            if img_src is not None and img_src.is_file():
+                return img_src.read_bytes(), content_type
+            return None
+
+        # 静态资源直接从主题目录读取
+        static_dir = self.theme.get_static_dir()
+        if static_dir and rel_path.startswith('static/'):
+            file_path = (Path(static_dir) / rel_path[len('static/'):]).resolve()
+            if self._is_within(file_path, Path(static_dir).resolve()) and file_path.is_file():
+                return file_path.read_bytes(), content_type
+
+        return None
+
+    def _make_handler(self) -> type:
+        """创建绑定到当前服务器实例的请求处理器"""
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                parsed = urlparse(self.path)
+                url_path = unquote(parsed.path)
+
+                if url_path == RELOAD_ENDPOINT:
+                    try:
+                        version = int(parse_qs(parsed.query).get('v', ['0'])[0])
+                    except ValueError:
+                        version = 0
+                    body = str(server.wait_for_change(version)).encode('utf-8')
+                    self._send(200, body, 'text/plain; charset=utf-8')
+                    return
+
+                result = server.resolve(url_path)
+                if result is None:
+                    self._send(404, '404 Not Found'.encode('utf-8'), 'text/plain; charset=utf-8')
+                else:
+                    self._send(200, *result)
+
+            def _send(self, status: int, body: bytes, content_type: str) -> None:
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.send_header('Cache-Control', 'no-store')
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args) -> None:
+                # 不输出每个请求的访问日志
+                pass
+
+        return Handler
+
+    def start(self) -> None:
+        """生成页面并在后台线程中启动 HTTP 服务器"""
+        self.load()
+        self._httpd = ThreadingHTTPServer((self.host, self.port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self.port = self._httpd.server_address[1]
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+
+    def stop(self) -> None:
+        """停止 HTTP 服务器"""
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def serve_forever(self) -> None:
+        """启动服务器并持续监视文件变化，直到被中断"""
+        self.start()
+        print(f"✓ 预览服务器已启动: http://{self.host}:{self.port}{self.base_path}/")
+        print("  监视 md/、theme/ 和 config.json 的变化，按 Ctrl+C 停止")
+
+        watcher = FileWatcher([self.config_path, self.md_dir, self.theme_dir])
+        try:
+            while True:
+                time.sleep(self.interval)
+                changed, removed = watcher.poll()
+                if not changed and not removed:
+                    continue
+
+                start = time.perf_counter()
+                try:
+                    if self.handle_changes(changed, removed):
+                        elapsed = (time.perf_counter() - start) * 1000
+                        print(f"✓ 已更新 ({len(changed | removed)} 个文件变化, {elapsed:.0f}ms)")
+                        self.notify_reload()
+                except Exception as e:
+                    print(f"✗ 重新生成失败: {e}")
+        except KeyboardInterrupt:
+            print("\n✓ 预览服务器已停止")
+        finally:
+            self.stop()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """命令行入口：python -m _mblog.server"""
+    parser = argparse.ArgumentParser(description='启动本地预览服务器')
+    parser.add_argument('--host', default='127.0.0.1', help='监听地址（默认 127.0.0.1）')
+    parser.add_argument('--port', type=int, default=8000, help='监听端口（默认 8000）')
+    args = parser.parse_args(argv)
+
+    DevServer(host=args.host, port=args.port).serve_forever()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,189 @@
+"""
+站点索引模块
+负责在加载文章后一次遍历建立标签、归档（年 / 月）和标签文件名索引，
+供首页、标签页、归档页和 Sitemap 等生成阶段共用，预览服务器中可以增量更新
+"""
+import re
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from .markdown_processor import PostSummary
+
+
+def sanitize_filename(name: str) -> str:
+    """
+    清理文件名，移除或替换不安全的字符
+
+    Args:
+        name: 原始名称
+
+    Returns:
+        安全的文件名
+    """
+    # 替换空格和特殊字符为连字符
+    safe_name = re.sub(r'[^\w\s\u4e00-\u9fff-]', '', name)
+    safe_name = re.sub(r'[\s_]+', '-', safe_name)
+    safe_name = safe_name.strip('-').lower()
+
+    # 如果结果为空，使用默认名称
+    if not safe_name:
+        safe_name = 'tag'
+
+    return safe_name
+
+
+class SiteIndex:
+    """
+    站点索引
+
+    保存按日期降序排列的文章摘要，以及一次遍历建立的：
+    - tags: {标签: 文章列表}，标签按首次出现的顺序排列
+    - archive: {年: {月: 文章列表}}，年份和月份按降序排列
+    - 标签对应的文件名（首次使用时计算）
+    每个列表中的文章都保持与 posts 相同的顺序。也接受完整的 Post 对象。
+    """
+
+    def __init__(self, posts: Optional[List[PostSummary]] = None):
+        """
+        建立索引
+
+        Args:
+            posts: 按日期降序排列的文章摘要，保持给定的顺序
+        """
+        self.posts: List[PostSummary] = posts if posts is not None else []
+        self.tags: Dict[Any, List[PostSummary]] = {}
+        self.archive: Dict[int, Dict[int, List[PostSummary]]] = {}
+        self._tag_filenames: Dict[Any, str] = {}
+        # 文章在 posts 中的下标 {id(文章): 下标}，首次使用时建立
+        self._positions: Optional[Dict[int, int]] = None
+
+        for post in self.posts:
+            self._link(post, append=True)
+
+    def __len__(self) -> int:
+        return len(self.posts)
+
+    def tag_filename(self, tag: Any) -> str:
+        """
+        获取标签页的文件名（不含扩展名）
+
+        Args:
+            tag: 标签名称
+
+        Returns:
+            安全的文件名
+        """
+        filename = self._tag_filenames.get(tag)
+        if filename is None:
+            filename = self._tag_filenames[tag] = sanitize_filename(tag)
+        return filename
+
+    def index_of(self, post: PostSummary) -> int:
+        """
+        获取文章在 posts 中的下标
+
+        Args:
+            post: 索引中的文章
+
+        Returns:
+            下标
+        """
+        if self._positions is None:
+            self._positions = {id(item): index for index, item in enumerate(self.posts)}
+        return self._positions[id(post)]
+
+    def update(self, added: Iterable[PostSummary], removed: Iterable[str] = ()) -> None:
+        """
+        增量更新索引（预览服务器监视到文章变化时）
+
+        先移除文章，再把新增的文章按日期插入：日期相同的文章排在已有文章之后，
+        与把新文章追加到列表末尾再稳定排序的结果相同。
+        只调整受影响的标签和归档分组，不重新遍历所有文章。
+
+        Args:
+            added: 新增或重新解析的文章
+            removed: 需要移除的文章的相对路径
+        """
+        removed_paths: Set[str] = set(removed)
+        if removed_paths:
+            kept = []
+            for post in self.posts:
+                if post.relative_path in removed_paths:
+                    self._unlink(post)
+                else:
+                    kept.append(post)
+            self.posts[:] = kept
+
+        for post in added:
+            self.posts.insert(self._insert_position(self.posts, post), post)
+            self._link(post)
+
+        self._restore_order()
+
+    def _link(self, post: PostSummary, append: bool = False) -> None:
+        """
+        把文章加入标签和归档分组
+
+        Args:
+            post: 文章
+            append: 追加到分组末尾（按 posts 顺序建立索引时），否则按日期插入
+        """
+        groups = [self.tags.setdefault(tag, []) for tag in post.tags]
+        groups.append(self.archive.setdefault(post.date.year, {}).setdefault(post.date.month, []))
+        for group in groups:
+            if append:
+                group.append(post)
+            else:
+                group.insert(self._insert_position(group, post), post)
+
+    def _unlink(self, post: PostSummary) -> None:
+        """把文章从标签和归档分组中移除，删除变空的分组"""
+        for tag in post.tags:
+            tag_posts = self.tags.get(tag)
+            if tag_posts is not None:
+                self._remove_item(tag_posts, post)
+                if not tag_posts:
+                    del self.tags[tag]
+        months = self.archive.get(post.date.year, {})
+        month_posts = months.get(post.date.month)
+        if month_posts is not None:
+            self._remove_item(month_posts, post)
+            if not month_posts:
+                del months[post.date.month]
+                if not months:
+                    del self.archive[post.date.year]
+
+    def _restore_order(self) -> None:
+        """增量更新后恢复标签和归档分组的顺序，与重新建立索引的结果一致"""
+        positions = {id(post): index for index, post in enumerate(self.posts)}
+        self._positions = positions
+
+        def first_appearance(item: Any) -> Any:
+            tag, tag_posts = item
+            first = tag_posts[0]
+            return positions[id(first)], list(first.tags).index(tag)
+
+        self.tags = dict(sorted(self.tags.items(), key=first_appearance))
+        self.archive = {
+            year: {month: self.archive[year][month] for month in sorted(self.archive[year], reverse=True)}
+            for year in sorted(self.archive, reverse=True)
+        }
+
+    @staticmethod
+    def _insert_position(posts: List[PostSummary], post: PostSummary) -> int:
+        """二分查找插入位置：排在日期不早于该文章的所有文章之后"""
+        low, high = 0, len(posts)
+        while low < high:
+            middle = (low + high) // 2
+            if posts[middle].date >= post.date:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    @staticmethod
+    def _remove_item(posts: List[PostSummary], post: PostSummary) -> None:
+        """按对象身份移除文章"""
+        for index, item in enumerate(posts):
+            if item is post:
+                del posts[index]
+                return
@@ -0,0 +1,421 @@
+"""
+流式生成模块
+文章逐篇解析、渲染并写入详情页，生成器只保留列表页需要的文章摘要，
+所有文章处理完成后再生成首页、标签页、归档页、订阅和搜索索引
+"""
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from .config import Config
+from .generator import GenerationError, StaticGenerator
+from .images import ImageError
+from .markdown_processor import MarkdownProcessor, Post, PostSummary
+from .profiler import profile_phase, profile_step
+from .renderer import Renderer
+from .search_index import SearchIndexBuilder, html_to_text, post_terms
+from .theme import Theme
+
+
+@dataclass
+class StreamedPost:
+    """单篇文章处理完成后保留的信息（不含正文），由工作进程传回主进程"""
+    title: str
+    date: datetime
+    relative_path: str
+    slug: str
+    author: str
+    description: str
+    encrypted: bool
+    tags: List[Any]
+    images: List[str]           # 文章中引用的图片路径
+    terms: List[str]            # 搜索索引词（见 post_terms）
+    excerpt: str = ""           # 没有描述时订阅使用的正文开头
+    digest: str = ""            # 文章内容摘要（增量构建）
+    fingerprint: str = ""       # 文章页的依赖指纹（增量构建）
+    skipped: bool = False       # 文章页未变化、沿用上次构建的结果
+    written: bool = False       # 是否实际写入了文章页
+    variants: Dict[str, Dict[str, Any]] = field(default_factory=dict)  # {图片源文件路径: 响应式图片信息}
+
+
+# 流式处理单篇文章的结果: (处理结果, 解析错误信息, 渲染或写入错误)
+StreamResult = Tuple[Optional[StreamedPost], Optional[str], Optional[Exception]]
+
+
+class StreamingGenerator(StaticGenerator):
+    """
+    流式静态文件生成器
+
+    不需要预先加载所有文章：生成时逐篇解析文章，立即渲染并写入文章详情页，
+    随后释放正文，只保留文章摘要、搜索索引词和订阅摘录。启用并行生成时，
+    每个工作进程独立完成解析、渲染和写入，只把摘要信息传回主进程，
+    内存占用取决于进程数而不是文章数。列表页在所有文章处理完成后生成。
+    """
+
+    def __init__(self, config: Config, theme: Theme, renderer: Renderer,
+                 processor: Optional[MarkdownProcessor] = None, posts: Optional[List[Post]] = None):
+        """
+        初始化生成器
+
+        Args:
+            config: 配置管理器实例
+            theme: 主题管理器实例
+            renderer: 渲染器实例
+            processor: 解析文章使用的 Markdown 处理器
+            posts: 已加载的文章（列表页工作进程中使用，流式生成时为空）
+        """
+        super().__init__(config, theme, renderer, posts or [])
+        self.processor = processor
+
+        # 图片随文章逐篇处理，并行由文章工作进程提供
+        if self.image_pipeline is not None:
+            self.image_pipeline.workers = 1
+        # 已尝试生成响应式版本的图片
+        self._derived_images: Set[Path] = set()
+
+        # 每篇文章引用的图片 {文章相对路径: 图片路径}
+        self._streamed_images: Dict[str, List[str]] = {}
+        # 没有描述的文章的正文开头 {文章相对路径: 摘录}
+        self._excerpts: Dict[str, str] = {}
+        self._search_builder = SearchIndexBuilder()
+
+    def generate(self) -> bool:
+        """
+        执行流式生成流程
+
+        Returns:
+            生成是否成功
+
+        Raises:
+            GenerationError: 生成过程中出现错误
+        """
+        if self.processor is None:
+            raise GenerationError("流式生成需要 Markdown 处理器")
+
+        try:
+            print("开始生成静态文件（流式处理文章）...")
+
+            # 1. 准备输出目录
+            with profile_phase('prepare_output'):
+                self._prepare_output_dir()
+
+            # 2. 复制主题静态资源
+            with profile_phase('static_assets'):
+                self._copy_theme_assets()
+
+            # 3. 逐篇解析文章并生成详情页
+            with profile_phase('stream_posts'):
+                self._stream_posts()
+
+            # 4. 复制文章中引用的图片（所有文章处理完成后才知道全部图片）
+            with profile_phase('post_images'):
+                self._copy_post_images()
+
+            # 5. 生成列表页、订阅和搜索索引
+            self._generate_pages()
+
+            # 6. 生成预压缩文件
+            if self.precompress:
+                with profile_phase('precompress'):
+                    self._precompress_outputs()
+
+            # 7. 清理过期输出并保存构建清单
+            if self._keeps_output_dir():
+                with profile_phase('cleanup'):
+                    self._remove_stale_outputs()
+                    self._save_manifest()
+
+            print(f"✓ 静态文件生成完成，输出目录: {self.output_dir}")
+            return True
+
+        except Exception as e:
+            raise GenerationError(f"生成失败: {e}")
+
+    def _stream_posts(self) -> None:
+        """
+        逐篇处理文章，收集文章摘要后按日期降序排序
+
+        文章按 MarkdownProcessor.find_post_files 的顺序处理，排序规则与 load_posts 相同，
+        因此文章顺序与先加载全部文章再生成时一致。无法解析的文章打印警告后跳过，
+        渲染或写入失败时按文件顺序报告第一个错误。
+        """
+        print("开始生成文章详情页...")
+        md_files = self.processor.find_post_files()
+
+        summaries: List[PostSummary] = []
+        parallel = self.workers > 1 and len(md_files) > 1
+        if parallel:
+            results = self._stream_posts_parallel(md_files)
+        else:
+            results = (self._process_file(str(md_file)) + (None,) for md_file in md_files)
+
+        for md_file, (streamed, warning, error) in zip(md_files, results):
+            if error is not None:
+                raise error
+            if warning is not None:
+                print(f"警告: 无法解析文件 {md_file}: {warning}")
+                continue
+            summaries.append(self._add_streamed_post(streamed, str(md_file), from_worker=parallel))
+
+        # 按日期降序排序（最新的在前）后建立站点索引，搜索索引中的文章编号随之调整
+        order = sorted(range(len(summaries)), key=lambda i: summaries[i].date, reverse=True)
+        self.summaries = [summaries[i] for i in order]
+        self._search_builder.reorder(order)
+
+        print(f"  ✓ 文章详情页: {len(self.summaries)} 篇")
+        if self._image_variants:
+            variant_count = sum(len(info['variants']) for info in self._image_variants.values())
+            print(f"✓ 响应式图片: {len(self._image_variants)} 张图片, {variant_count} 个版本")
+
+    def _stream_posts_parallel(self, md_files: List[Path]) -> Iterable[StreamResult]:
+        """
+        使用进程池并行处理文章
+
+        每个工作进程持有自己的处理器、渲染器和生成器，结果按输入文件顺序返回。
+        进程池不可用时回退到顺序处理。
+
+        Args:
+            md_files: 文章文件列表
+
+        Returns:
+            与 md_files 一一对应的处理结果
+        """
+        filepaths = [str(md_file) for md_file in md_files]
+        chunksize = max(1, len(filepaths) // (self.workers * 4))
+        processor = self.processor
+
+        try:
+            executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_stream_worker,
+                initargs=(type(self), type(self.renderer), self.renderer.cache_dir,
+                          self.config, self.theme,
+                          (type(processor), str(processor.md_dir), processor.base_path, processor.cache_dir),
+                          self._previous_outputs, self._base_fingerprint)
+            )
+        except (OSError, ImportError, NotImplementedError) as e:
+            print(f"  警告: 无法启动并行生成，改为顺序生成: {e}")
+            for filepath in filepaths:
+                yield self._process_file(filepath) + (None,)
+            return
+
+        with executor:
+            try:
+                yield from executor.map(_stream_post_in_worker, filepaths, chunksize=chunksize)
+            except BrokenProcessPool as e:
+                raise GenerationError(f"并行生成进程异常退出: {e}")
+
+    def _process_file(self, filepath: str) -> Tuple[Optional[StreamedPost], Optional[str]]:
+        """
+        解析并处理单个文章文件，捕获解析错误
+
+        Args:
+            filepath: 文章文件路径
+
+        Returns:
+            (处理结果, None) 或 (None, 解析错误信息)
+
+        Raises:
+            RendererError, GenerationError: 渲染或写入失败
+        """
+        try:
+            post = self.processor.parse_post(filepath)
+        except Exception as e:
+            return None, str(e)
+        return self._stream_post(post), None
+
+    def _stream_post(self, post: Post) -> StreamedPost:
+        """
+        生成单篇文章的详情页，并提取列表页、订阅和搜索索引需要的信息
+
+        Args:
+            post: 文章对象
+
+        Returns:
+            不含正文的处理结果
+        """
+        variants = self._rewrite_post_images(post)
+
+        digest = ""
+        if self.incremental:
+            digest = self._post_digests[post.relative_path] = self._post_digest(post)
+
+        post_path = self.output_dir / 'posts' / f'{post.relative_path}.html'
+        fingerprint = self._fingerprint('post', [post])
+        skipped = self._is_up_to_date(post_path, fingerprint)
+        written = False
+        if not skipped:
+            with profile_step('render', post.relative_path):
+                html = self.renderer.render_post(post)
+            with profile_step('write', post.relative_path):
+                written = self._write_file(post_path, html)
+
+        body = '' if post.encrypted else html_to_text(post.html)
+        streamed = StreamedPost(
+            title=post.title,
+            date=post.date,
+            relative_path=post.relative_path,
+            slug=post.slug,
+            author=post.author,
+            description=post.description,
+            encrypted=bool(post.encrypted),
+            tags=list(post.tags),
+            images=list(post.images),
+            terms=post_terms(post.title, post.description, body),
+            excerpt='' if post.description else post.html[:200],
+            digest=digest,
+            fingerprint=fingerprint,
+            skipped=skipped,
+            written=written,
+            variants=variants,
+        )
+        post.release()
+        return streamed
+
+    def _rewrite_post_images(self, post: Post) -> Dict[str, Dict[str, Any]]:
+        """
+        生成文章图片的响应式版本，渲染文章页时把 <img> 改写为带 srcset 的标签
+
+        每张图片在每个进程中只处理一次（图片版本按内容哈希缓存，见 ImagePipeline）。
+
+        Args:
+            post: 文章对象
+
+        Returns:
+            {图片源文件路径: 图片信息}，只包含本文章中成功处理的图片
+        """
+        if self.image_pipeline is None or not post.images:
+            return {}
+
+        md_dir = Path(self.config.get('build.md_dir', 'md')).resolve()
+        sources: Dict[Path, str] = {}
+        for img_path in post.images:
+            img_src = Path(img_path)
+            try:
+                if img_src.exists():
+                    sources[img_src] = img_src.relative_to(md_dir).as_posix()
+            except ValueError:
+                # 图片不在 md_dir 下，复制图片时再警告
+                continue
+
+        pending = [img_src for img_src in sources if img_src not in self._derived_images]
+        if pending:
+            self._derived_images.update(pending)
+            try:
+                self._image_variants.update(self.image_pipeline.run(pending))
+            except ImageError as e:
+                print(f"  警告: 跳过响应式图片: {e}")
+                self.image_pipeline = None
+                return {}
+
+        responsive = {
+            rel_path: self._image_variants[img_src]
+            for img_src, rel_path in sources.items() if img_src in self._image_variants
+        }
+        # 渲染文章页时改写 <img>（见 Renderer.post_html）
+        self.renderer.responsive_images.update(responsive)
+        return {
+            str(img_src): self._image_variants[img_src]
+            for img_src in sources if img_src in self._image_variants
+        }
+
+    def _add_streamed_post(self, streamed: StreamedPost, filepath: str, from_worker: bool) -> PostSummary:
+        """
+        收集一篇文章的处理结果
+
+        Args:
+            streamed: 处理结果
+            filepath: 文章文件路径（列表页模板使用摘要中没有的字段时重新解析）
+            from_worker: 是否来自工作进程（工作进程中的输出清单和统计不会传回，在主进程中累计）
+
+        Returns:
+            文章摘要
+        """
+        rel_path = streamed.relative_path
+        summary = PostSummary(
+            title=streamed.title,
+            date=streamed.date,
+            relative_path=rel_path,
+            slug=streamed.slug,
+            author=streamed.author,
+            description=streamed.description,
+            encrypted=streamed.encrypted,
+            tag_ids=tuple(self.tag_table.intern(tag) for tag in streamed.tags),
+            tag_table=self.tag_table,
+            source=self.processor.post_loader(filepath),
+        )
+        self._search_builder.add_terms(streamed.terms)
+        if streamed.images:
+            self._streamed_images[rel_path] = streamed.images
+        if streamed.excerpt:
+            self._excerpts[rel_path] = streamed.excerpt
+        if self.incremental:
+            self._post_digests[rel_path] = streamed.digest
+
+        if from_worker:
+            post_path = self.output_dir / 'posts' / f'{rel_path}.html'
+            self._record_output(post_path, streamed.fingerprint if self.incremental else None)
+            if streamed.skipped:
+                self._skipped_count += 1
+            elif not streamed.written:
+                self._unchanged_count += 1
+            for img_path, info in streamed.variants.items():
+                self._image_variants[Path(img_path)] = info
+        return summary
+
+    def _generate_post_pages(self) -> None:
+        """文章详情页已在流式处理文章时生成"""
+        pass
+
+    def _post_image_paths(self) -> Iterator[str]:
+        """按文章顺序列出文章中引用的图片路径（可能重复）"""
+        for summary in self.summaries:
+            yield from self._streamed_images.get(summary.relative_path, ())
+
+    def _post_excerpt(self, index: int) -> str:
+        """获取处理文章时保存的正文开头"""
+        return self._excerpts.get(self.summaries[index].relative_path, '')
+
+    def _build_search_index(self) -> SearchIndexBuilder:
+        """返回处理文章时逐篇建立的倒排索引"""
+        return self._search_builder
+
+
+# 工作进程中的流式生成器实例（由进程池的 initializer 创建）
+_worker_streamer: Optional[StreamingGenerator] = None
+
+
+def _init_stream_worker(generator_cls: type, renderer_cls: type, cache_dir: Optional[str],
+                        config: Config, theme: Theme, processor_args: Tuple[Any, ...],
+                        previous_outputs: Dict[str, Optional[str]], base_fingerprint: str) -> None:
+    """在工作进程中创建独立的处理器、渲染器和生成器"""
+    global _worker_streamer
+    processor_cls, md_dir, base_path, processor_cache_dir = processor_args
+    processor = processor_cls(md_dir, base_path=base_path, cache_dir=processor_cache_dir)
+    renderer = renderer_cls(theme, config, cache_dir=cache_dir)
+    _worker_streamer = generator_cls(config, theme, renderer, processor)
+    # 增量构建需要上次构建的清单和公共指纹判断文章页是否可以沿用
+    _worker_streamer._previous_outputs = previous_outputs
+    _worker_streamer._base_fingerprint = base_fingerprint
+
+
+def _stream_post_in_worker(filepath: str) -> StreamResult:
+    """
+    在工作进程中处理单个文章文件
+
+    渲染或写入错误不直接抛出，由主进程按文件顺序报告。
+    """
+    try:
+        streamed, warning = _worker_streamer._process_file(filepath)
+        return streamed, warning, None
+    except Exception as e:
+        try:
+            pickle.dumps(e)
+            return None, None, e
+        except Exception:
+            # 无法序列化的异常转换为 GenerationError 传回主进程
+            return None, None, GenerationError(str(e))
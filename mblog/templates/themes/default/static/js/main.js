@@ -190,64 +190,83 @@
         // 初始化搜索引擎
         const searchEngine = new SearchEngine(indexUrl);
         
-        // 加载搜索索引
-        searchEngine.loadIndex()
-            .then(() => {
-                console.log('Search index loaded successfully');
-                
-                // 添加实时搜索事件监听器
-                let searchTimeout;
-                searchInput.addEventListener('input', function(e) {
-                    const query = e.target.value;
-                    
-                    // 使用防抖来避免过于频繁的搜索
-                    clearTimeout(searchTimeout);
-                    searchTimeout = setTimeout(() => {
-                        performSearch(query);
-                    }, 150);
-                });
+        // 搜索索引在第一次使用搜索框时才加载，倒排索引分片按查询需要加载
+        let indexPromise = null;
+        function ensureIndexLoaded() {
+            if (!indexPromise) {
+                indexPromise = searchEngine.loadIndex()
+                    .then(() => {
+                        console.log('Search index loaded successfully');
+                    })
+                    .catch(error => {
+                        showLoadError(error);
+                        throw error;
+                    });
+            }
+            return indexPromise;
+        }
+        
+        // 索引加载失败时禁用搜索框并显示错误消息
+        function showLoadError(error) {
+            console.error('Failed to load search index:', error);
+            
+            searchInput.disabled = true;
+            searchInput.placeholder = '搜索功能暂时不可用';
+            searchInput.setAttribute('aria-label', '搜索功能暂时不可用');
+            
+            searchResults.innerHTML = '<div class="search-error">搜索索引加载失败，请刷新页面重试</div>';
+            searchResults.style.display = 'block';
+        }
+        
+        // 添加实时搜索事件监听器
+        let searchTimeout;
+        searchInput.addEventListener('input', function(e) {
+            const query = e.target.value;
+            
+            // 使用防抖来避免过于频繁的搜索
+            clearTimeout(searchTimeout);
+            searchTimeout = setTimeout(() => {
+                performSearch(query);
+            }, 150);
+        });
+
+        // 执行搜索并显示结果
+        function performSearch(query) {
+            if (!query || query.trim().length === 0) {
+                // 空查询时隐藏结果
+                searchResults.style.display = 'none';
+                searchResults.innerHTML = '';
+                return;
+            }
 
-                // 执行搜索并显示结果
-                function performSearch(query) {
-                    if (!query || query.trim().length === 0) {
-                        // 空查询时隐藏结果
-                        searchResults.style.display = 'none';
-                        searchResults.innerHTML = '';
+            ensureIndexLoaded()
+                .then(() => searchEngine.searchAsync(query))
+                .then(results => {
+                    // 等待分片加载期间输入已经变化，丢弃过期的结果
+                    if (searchInput.value !== query) {
                         return;
                     }
-
-                    const results = searchEngine.search(query);
                     searchEngine.displayResults(results, '#search-results', query);
-                }
-
-                // 点击搜索结果外部时隐藏结果
-                document.addEventListener('click', function(e) {
-                    if (!searchInput.contains(e.target) && !searchResults.contains(e.target)) {
-                        searchResults.style.display = 'none';
-                    }
+                })
+                .catch(error => {
+                    console.error('Search failed:', error);
                 });
+        }
 
-                // 点击搜索框时，如果有内容则显示结果
-                searchInput.addEventListener('focus', function() {
-                    if (searchInput.value.trim().length > 0 && searchResults.innerHTML.trim().length > 0) {
-                        searchResults.style.display = 'block';
-                    }
-                });
-            })
-            .catch(error => {
-                console.error('Failed to load search index:', error);
-                
-                // 显示错误消息给用户
-                searchInput.disabled = true;
-                searchInput.placeholder = '搜索功能暂时不可用';
-                searchInput.setAttribute('aria-label', '搜索功能暂时不可用');
-                
-                // 在结果区域显示错误（当用户尝试使用时）
-                searchInput.addEventListener('click', function() {
-                    searchResults.innerHTML = '<div class="search-error">搜索索引加载失败，请刷新页面重试</div>';
-                    searchResults.style.display = 'block';
-                });
-            });
+        // 点击搜索结果外部时隐藏结果
+        document.addEventListener('click', function(e) {
+            if (!searchInput.contains(e.target) && !searchResults.contains(e.target)) {
+                searchResults.style.display = 'none';
+            }
+        });
+
+        // 点击搜索框时预先加载索引，如果有内容则显示结果
+        searchInput.addEventListener('focus', function() {
+            ensureIndexLoaded().catch(() => {});
+            if (searchInput.value.trim().length > 0 && searchResults.innerHTML.trim().length > 0) {
+                searchResults.style.display = 'block';
+            }
+        });
     }
 
     /**
@@ -6,8 +6,24 @@
  * - Tag filtering (using #tag syntax)
  * - Combined tag and keyword filtering
  * - Unicode/Chinese character support
+ * - Full-text search over title, description and body using the
+ *   inverted index generated at build time (CJK text is indexed as bigrams)
+ *
+ * The inverted index is split into shards by the first character of each
+ * term. Shards are fetched only when a query needs them and then cached.
  */
 
+// Inverted index format version understood by this file
+const SEARCH_INDEX_VERSION = 2;
+
+// Directory of the index shards, next to the search index file
+const SEARCH_SHARD_DIR = 'search-index';
+
+// CJK characters (must match CJK_CHARS in search_index.py)
+const CJK_CHARS = '\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff';
+const WORD_RE = /[\p{L}\p{N}]+/gu;
+const CJK_SPLIT_RE = new RegExp(`([${CJK_CHARS}]+)`, 'u');
+
 class SearchEngine {
     /**
      * Initialize the search engine
@@ -17,6 +33,18 @@ class SearchEngine {
         this.indexUrl = indexUrl;
         this.posts = [];
         this.loaded = false;
+        // Whether the index has a sharded inverted index
+        this.indexed = false;
+        this.shardCount = 0;
+        this.availableShards = new Set();
+        // Loaded shards: id -> {terms: term -> ascending post ids, termList: sorted terms}
+        this.shards = new Map();
+        // Pending shard requests: id -> Promise
+        this.shardRequests = new Map();
+        // Lowercased tag -> ascending post ids
+        this.tagIndex = new Map();
+        // Cache of term lookups, reused across keystrokes
+        this.termCache = new Map();
     }
 
     /**
@@ -32,7 +60,8 @@ class SearchEngine {
             }
             
             const data = await response.json();
-            this.posts = data.posts || [];
+            this.posts = this.decodePosts(data);
+            this.buildIndex(data.index);
             this.loaded = true;
         } catch (error) {
             console.error('Error loading search index:', error);
@@ -40,6 +69,338 @@ class SearchEngine {
         }
     }
 
+    /**
+     * Decode post metadata from the search index
+     *
+     * The generator stores posts column by column: parallel arrays of
+     * titles, relative paths, dates (days after data.epoch), tag ids
+     * (into data.tags) and descriptions. URLs are derived from
+     * data.base_path and the relative path. Indexes with a plain
+     * "posts" array are returned as is.
+     *
+     * @param {Object} data - Parsed search index
+     * @returns {Array} Posts with title, url, date, tags, description and relative_path
+     */
+    decodePosts(data) {
+        const columns = data.columns;
+        if (!columns) {
+            return data.posts || [];
+        }
+
+        const basePath = data.base_path || '';
+        const tagNames = data.tags || [];
+        const [year, month, day] = (data.epoch || '1970-01-01').split('-').map(Number);
+        const epoch = Date.UTC(year, month - 1, day);
+        const DAY_MS = 24 * 60 * 60 * 1000;
+
+        return columns.title.map((title, i) => {
+            const path = columns.path[i];
+            return {
+                title,
+                url: `${basePath}/posts/${path}.html`,
+                date: new Date(epoch + columns.date[i] * DAY_MS).toISOString().substring(0, 10),
+                tags: columns.tags[i].map(id => tagNames[id]),
+                description: columns.description[i],
+                relative_path: path
+            };
+        });
+    }
+
+    /**
+     * Prepare lookup structures for the loaded index
+     *
+     * Indexes without an inverted index (or with an unknown version)
+     * fall back to scanning post titles.
+     *
+     * @param {Object|undefined} index - The "index" field of the search index
+     */
+    buildIndex(index) {
+        this.termCache = new Map();
+        this.shards = new Map();
+        this.shardRequests = new Map();
+        this.tagIndex = new Map();
+        this.posts.forEach((post, id) => {
+            for (const tag of post.tags || []) {
+                const key = tag.toLowerCase();
+                const ids = this.tagIndex.get(key);
+                if (!ids) {
+                    this.tagIndex.set(key, [id]);
+                } else if (ids[ids.length - 1] !== id) {
+                    ids.push(id);
+                }
+            }
+        });
+
+        if (index && index.version === SEARCH_INDEX_VERSION && index.shard_count > 0) {
+            this.indexed = true;
+            this.shardCount = index.shard_count;
+            this.availableShards = new Set(index.shards || []);
+        } else {
+            this.indexed = false;
+            this.shardCount = 0;
+            this.availableShards = new Set();
+        }
+    }
+
+    /**
+     * Get the shard that contains a term (same rule as shard_for() in search_index.py)
+     * @param {string} term - Index term
+     * @returns {number} Shard id
+     */
+    shardFor(term) {
+        return term.codePointAt(0) % this.shardCount;
+    }
+
+    /**
+     * Get the URL of an index shard
+     * @param {number} id - Shard id
+     * @returns {string} Shard URL, relative to the search index file
+     */
+    shardUrl(id) {
+        return this.indexUrl.replace(/[^/]*$/, '') + `${SEARCH_SHARD_DIR}/${id}.json`;
+    }
+
+    /**
+     * Load an index shard (each shard is fetched at most once)
+     * @param {number} id - Shard id
+     * @returns {Promise<void>}
+     * @throws {Error} If the shard fails to load
+     */
+    loadShard(id) {
+        if (!this.shardRequests.has(id)) {
+            const request = fetch(this.shardUrl(id))
+                .then(response => {
+                    if (!response.ok) {
+                        throw new Error(`Failed to load search index shard ${id}: ${response.status}`);
+                    }
+                    return response.json();
+                })
+                .then(data => {
+                    const terms = data.terms || {};
+                    this.shards.set(id, { terms, termList: Object.keys(terms).sort() });
+                })
+                .catch(error => {
+                    // Allow retrying on the next query
+                    this.shardRequests.delete(id);
+                    throw error;
+                });
+            this.shardRequests.set(id, request);
+        }
+        return this.shardRequests.get(id);
+    }
+
+    /**
+     * Load the shards needed to answer a query
+     * @param {string} queryString - The search query
+     * @returns {Promise<void>}
+     */
+    async loadShardsFor(queryString) {
+        if (!this.indexed) {
+            return;
+        }
+        const { keywords } = this.parseQuery(queryString || '');
+        const ids = new Set();
+        for (const keyword of keywords) {
+            for (const term of this.tokenize(keyword)) {
+                const id = this.shardFor(term);
+                if (this.availableShards.has(id) && !this.shards.has(id)) {
+                    ids.add(id);
+                }
+            }
+        }
+        await Promise.all([...ids].map(id => this.loadShard(id)));
+    }
+
+    /**
+     * Search posts by query string, loading the needed index shards first
+     * @param {string} queryString - The search query
+     * @returns {Promise<Array>} Filtered array of posts matching the query
+     */
+    async searchAsync(queryString) {
+        await this.loadShardsFor(queryString);
+        return this.search(queryString);
+    }
+
+    /**
+     * Split text into index terms (same rules as tokenize() in search_index.py)
+     *
+     * Text is lowercased and split into runs of letters and digits.
+     * CJK characters inside a run are split into overlapping bigrams plus
+     * the last character of the run (so every character starts some term);
+     * other parts are whole terms.
+     *
+     * @param {string} text - Text to tokenize
+     * @returns {string[]} Terms
+     *
+     * Example:
+     *   "Python 入门教程" -> ["python", "入门", "门教", "教程", "程"]
+     */
+    tokenize(text) {
+        const tokens = [];
+        const words = (text || '').toLowerCase().match(WORD_RE) || [];
+        for (const word of words) {
+            word.split(CJK_SPLIT_RE).forEach((part, i) => {
+                if (!part) {
+                    return;
+                }
+                if (i % 2 === 0 || part.length === 1) {
+                    tokens.push(part);
+                } else {
+                    for (let j = 0; j < part.length - 1; j++) {
+                        tokens.push(part.substring(j, j + 2));
+                    }
+                    tokens.push(part[part.length - 1]);
+                }
+            });
+        }
+        return tokens;
+    }
+
+    /**
+     * Find the ids of posts containing a query term
+     *
+     * Terms match index terms by prefix (so results update while typing).
+     * The shard containing the term must already be loaded.
+     *
+     * @param {string} term - Query term
+     * @returns {number[]} Ascending post ids
+     */
+    lookupTerm(term) {
+        const cached = this.termCache.get(term);
+        if (cached) {
+            return cached;
+        }
+
+        const id = this.shardFor(term);
+        const shard = this.shards.get(id);
+        if (!shard) {
+            if (this.availableShards.has(id)) {
+                console.warn(`Search index shard ${id} not loaded yet`);
+                return [];
+            }
+            // No index term starts with this character
+            this.termCache.set(term, []);
+            return [];
+        }
+
+        // Binary search for the first term >= query term
+        const { terms, termList } = shard;
+        let lo = 0;
+        let hi = termList.length;
+        while (lo < hi) {
+            const mid = (lo + hi) >> 1;
+            if (termList[mid] < term) {
+                lo = mid + 1;
+            } else {
+                hi = mid;
+            }
+        }
+        const lists = [];
+        for (let i = lo; i < termList.length && termList[i].startsWith(term); i++) {
+            lists.push(terms[termList[i]]);
+        }
+
+        const ids = this.unionPostings(lists);
+        this.termCache.set(term, ids);
+        return ids;
+    }
+
+    /**
+     * Merge several ascending post id lists
+     * @param {number[][]} lists - Ascending post id lists
+     * @returns {number[]} Ascending ids contained in any list
+     */
+    unionPostings(lists) {
+        if (lists.length === 0) {
+            return [];
+        }
+        if (lists.length === 1) {
+            return lists[0];
+        }
+        const marks = new Uint8Array(this.posts.length);
+        for (const list of lists) {
+            for (const id of list) {
+                marks[id] = 1;
+            }
+        }
+        const ids = [];
+        for (let id = 0; id < marks.length; id++) {
+            if (marks[id]) {
+                ids.push(id);
+            }
+        }
+        return ids;
+    }
+
+    /**
+     * Intersect two ascending post id lists
+     * @param {number[]} a - Ascending post ids
+     * @param {number[]} b - Ascending post ids
+     * @returns {number[]} Ascending ids contained in both lists
+     */
+    intersectPostings(a, b) {
+        const result = [];
+        let i = 0;
+        let j = 0;
+        while (i < a.length && j < b.length) {
+            if (a[i] === b[j]) {
+                result.push(a[i]);
+                i++;
+                j++;
+            } else if (a[i] < b[j]) {
+                i++;
+            } else {
+                j++;
+            }
+        }
+        return result;
+    }
+
+    /**
+     * Answer a parsed query from the inverted index
+     *
+     * Every tag must partially match a post tag and every term of every
+     * keyword must occur in the title, description or body. The shards
+     * needed by the keywords must be loaded (see loadShardsFor).
+     *
+     * @param {string[]} tags - Tag filters
+     * @param {string[]} keywords - Keywords
+     * @returns {Array} Matching posts in original order
+     */
+    searchIndex(tags, keywords) {
+        const lists = [];
+
+        for (const searchTag of tags) {
+            const searchTagLower = searchTag.toLowerCase();
+            const tagLists = [];
+            for (const [tag, ids] of this.tagIndex) {
+                if (tag.includes(searchTagLower)) {
+                    tagLists.push(ids);
+                }
+            }
+            lists.push(this.unionPostings(tagLists));
+        }
+
+        for (const keyword of keywords) {
+            const terms = this.tokenize(keyword);
+            if (terms.length === 0) {
+                // Keywords without letters or digits (e.g. "++") can't match any term
+                return [];
+            }
+            for (const term of terms) {
+                lists.push(this.lookupTerm(term));
+            }
+        }
+
+        // Intersect starting from the shortest list
+        lists.sort((a, b) => a.length - b.length);
+        let ids = lists[0];
+        for (let i = 1; i < lists.length && ids.length > 0; i++) {
+            ids = this.intersectPostings(ids, lists[i]);
+        }
+        return ids.map(id => this.posts[id]);
+    }
+
     /**
      * Parse a search query into tags and keywords
      * 
@@ -86,7 +447,12 @@ class SearchEngine {
      * 
      * Filters posts based on:
      * - All specified tags must partially match post.tags (支持部分匹配)
-     * - All specified keywords must be present in post.title (case-insensitive)
+     * - All specified keywords must be present in the title, description or
+     *   body (matched by term prefix via the inverted index); without an
+     *   inverted index keywords must be present in post.title (case-insensitive)
+     *
+     * Index shards needed by the query must already be loaded; use
+     * searchAsync() to load them on demand.
      * 
      * Empty query returns all posts
      * Results maintain original date ordering
@@ -119,6 +485,10 @@ class SearchEngine {
             return [...this.posts];
         }
 
+        if (this.indexed) {
+            return this.searchIndex(tags, keywords);
+        }
+
         return this.posts.filter(post => {
             // Check tag matching - all specified tags must partially match at least one post tag
             // 标签部分匹配：#逆 可以匹配 "逆向破解"、"逆向工程" 等
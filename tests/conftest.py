@@ -0,0 +1,124 @@
+"""
+测试共用的辅助函数和 fixture
+
+生成站点的测试使用 write_config() 写入配置（只需传入与被测功能相关的 build 选项），
+再用 build_site() 按 gen.py 的流程生成站点。
+"""
+import json
+from pathlib import Path
+
+import pytest
+
+from mblog.templates.runtime.cache import DEFAULT_CACHE_DIR
+from mblog.templates.runtime.config import Config
+from mblog.templates.runtime.theme import Theme
+from mblog.templates.runtime.renderer import Renderer
+from mblog.templates.runtime.generator import StaticGenerator
+from mblog.templates.runtime.markdown_processor import MarkdownProcessor
+from mblog.templates.runtime.streaming import StreamingGenerator
+
+
+DEFAULT_THEME_DIR = Path(__file__).parent.parent / 'mblog' / 'templates' / 'themes' / 'default'
+
+# 早于任何一次构建的修改时间，用于判断文件是否被重写
+OLD_MTIME_NS = 1_000_000_000 * 10 ** 9
+
+
+def write_post(md_dir, name, title, date, tags='python', body='正文'):
+    """
+    写入一篇测试文章
+
+    Args:
+        md_dir: Markdown 文章目录
+        name: 文件名（不含扩展名）
+        title: 标题
+        date: 发布日期（如 '2024-01-01'），决定文章在列表中的顺序
+        tags: 标签（YAML 列表的内容）
+        body: 正文
+    """
+    (md_dir / f'{name}.md').write_text(f"""---
+title: {title}
+date: {date}
+tags: [{tags}]
+---
+
+{body}
+""", encoding='utf-8')
+
+
+def write_config(tmpdir, name='config.json', site=None, theme_config=None, **build_options):
+    """
+    写入测试项目的配置文件
+
+    默认从 tmpdir/md 读取文章，输出到 tmpdir/public，缓存保存在 tmpdir/.mblog-cache。
+
+    Args:
+        tmpdir: 项目目录
+        name: 配置文件名
+        site: 额外的 site 配置
+        theme_config: 额外的 theme_config 配置
+        build_options: 额外的 build 配置，覆盖默认值
+
+    Returns:
+        配置文件路径
+    """
+    config_file = tmpdir / name
+    config_file.write_text(json.dumps({
+        "site": {"title": "Test", "description": "Test", "author": "Tester", **(site or {})},
+        "build": {
+            "output_dir": str(tmpdir / 'public'),
+            "md_dir": str(tmpdir / 'md'),
+            "cache_dir": str(tmpdir / DEFAULT_CACHE_DIR),
+            "theme": "default",
+            **build_options
+        },
+        "theme_config": {"posts_per_page": 10, "date_format": "%Y-%m-%d", **(theme_config or {})}
+    }))
+    return config_file
+
+
+def build_site(config_file, md_dir, theme_dir=DEFAULT_THEME_DIR, **build_options):
+    """
+    按 gen.py 的流程完整生成一次站点
+
+    Args:
+        config_file: 配置文件路径
+        md_dir: Markdown 文章目录
+        theme_dir: 主题目录
+        build_options: 覆盖配置文件中的 build 选项
+
+    Returns:
+        生成器
+    """
+    config = Config(str(config_file))
+    config.load()
+    config.data['build'].update(build_options)
+    theme = Theme(str(theme_dir))
+    theme.load()
+
+    cache_dir = None
+    if config.get('build.cache', True):
+        cache_dir = config.get('build.cache_dir', DEFAULT_CACHE_DIR)
+    streaming = config.get('build.streaming', False)
+    processor = MarkdownProcessor(
+        str(md_dir), base_path=config.get('site.base_path', ''), cache_dir=cache_dir,
+        lazy=config.get('build.lazy_posts', False) and not streaming
+    )
+    renderer = Renderer(theme, config, cache_dir=cache_dir)
+    if streaming:
+        generator = StreamingGenerator(config, theme, renderer, processor)
+    else:
+        posts = processor.load_posts(workers=config.get('build.workers', 1))
+        generator = StaticGenerator(config, theme, renderer, posts)
+    generator.generate()
+    return generator
+
+
+@pytest.fixture
+def project_dir(tmp_path):
+    """创建包含两篇文章（标签分别为 python 和 go，second 较新）的测试项目目录"""
+    md_dir = tmp_path / 'md'
+    md_dir.mkdir()
+    write_post(md_dir, 'first', 'First Post', '2024-01-01')
+    write_post(md_dir, 'second', 'Second Post', '2024-01-02', tags='go')
+    return tmp_path
@@ -0,0 +1,50 @@
+"""
+测试静态资源指纹
+"""
+import json
+import pytest
+import re
+
+from mblog.templates.runtime.assets import AssetPipeline, fingerprint_name
+from tests.conftest import DEFAULT_THEME_DIR, build_site, write_config, write_post
+
+
+def test_fingerprint_name():
+    """测试带哈希的文件名保留目录和扩展名，并随内容变化"""
+    name = fingerprint_name('css/style.css', b'body {}')
+    assert re.fullmatch(r'css/style\.[0-9a-f]{10}\.css', name)
+    assert fingerprint_name('css/style.css', b'body {}') == name
+    assert fingerprint_name('css/style.css', b'p {}') != name
+    assert re.fullmatch(r'LICENSE\.[0-9a-f]{10}', fingerprint_name('LICENSE', b''))
+
+
+def test_pipeline_fingerprint_manifest():
+    """测试为 static 目录中的所有文件生成清单"""
+    manifest = AssetPipeline(str(DEFAULT_THEME_DIR / 'static'), fingerprint=True).manifest
+    assert set(manifest) >= {'css/style.css', 'js/main.js', 'js/search.js', 'js/crypto.js'}
+    assert AssetPipeline(None, fingerprint=True).manifest == {}
+
+
+@pytest.fixture
+def site(tmp_path):
+    """启用资源指纹生成站点，返回输出目录"""
+    md_dir = tmp_path / 'md'
+    md_dir.mkdir()
+    write_post(md_dir, 'hello', 'Hello', '2024-01-01')
+    build_site(write_config(tmp_path, site={"base_path": "/blog"}, fingerprint_assets=True), md_dir)
+    return tmp_path / 'public'
+
+
+def test_pages_reference_fingerprinted_assets(site):
+    """测试页面引用带指纹的资源，指纹文件和原始文件都存在"""
+    manifest = json.loads((site / 'asset-manifest.json').read_text(encoding='utf-8'))
+    style = manifest['css/style.css']
+    assert style != 'css/style.css'
+
+    html = (site / 'posts' / 'hello.html').read_text(encoding='utf-8')
+    assert f'href="/blog/static/{style}"' in html
+    assert f'src="/blog/static/{manifest["js/search.js"]}"' in html
+    assert 'static/css/style.css"' not in html
+
+    for original, fingerprinted in manifest.items():
+        assert (site / 'static' / fingerprinted).read_bytes() == (site / 'static' / original).read_bytes()
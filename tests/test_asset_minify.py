@@ -0,0 +1,172 @@
+"""
+测试静态资源压缩和脚本打包
+"""
+import json
+import re
+import shutil
+import subprocess
+import pytest
+import tempfile
+from pathlib import Path
+
+from mblog.templates.runtime.assets import AssetError, AssetPipeline
+from mblog.templates.runtime.minifier import MinifyError, minify_css, minify_js
+from tests.conftest import DEFAULT_THEME_DIR, build_site, write_config, write_post
+
+
+STATIC_DIR = DEFAULT_THEME_DIR / 'static'
+BUNDLES = json.loads((DEFAULT_THEME_DIR / 'theme.json').read_text(encoding='utf-8'))['bundles']
+
+
+def test_minify_css():
+    """测试去除注释和空白，保留字符串和有意义的空格"""
+    source = """
+/* 注释 */
+a :hover, .b > .c {
+    content: "a  /* b */";
+    width: calc(100% - 2px);
+    margin: 0 auto !important;
+}
+@media (max-width: 600px) { .d { color: red; } }
+"""
+    assert minify_css(source) == (
+        'a :hover,.b>.c{content:"a  /* b */";width:calc(100% - 2px);margin:0 auto!important}'
+        '@media (max-width:600px){.d{color:red}}'
+    )
+
+    with pytest.raises(MinifyError):
+        minify_css('a { /* 未结束')
+
+
+def test_minify_js_preserves_literals():
+    """测试字符串、正则表达式和嵌套模板字符串保持不变，保留影响自动分号插入的换行"""
+    source = """
+// 行注释
+const url = 'http://example.com'; /* 块注释 */
+const re = /[/*]+\\//g, half = total / 2 / count;
+function render(items) {
+    return `<ul>${items.map(item => `<li>${item.name}  ${ {a: 1}.a }</li>`).join('')}</ul>`;
+}
+let a = b
++ +c
+const d = e
+(f)
+"""
+    assert minify_js(source) == (
+        "const url='http://example.com';"
+        "const re=/[/*]+\\//g,half=total/2/count;"
+        "function render(items){return`<ul>${items.map(item=>`<li>${item.name}  ${{a:1}.a}</li>`).join('')}</ul>`;}\n"
+        "let a=b\n"
+        "+ +c\n"
+        "const d=e\n"
+        "(f)"
+    )
+
+    with pytest.raises(MinifyError):
+        minify_js('const s = `未结束')
+
+
+@pytest.mark.skipif(shutil.which('node') is None, reason='需要 Node.js')
+def test_minified_theme_scripts_are_valid():
+    """测试默认主题的脚本压缩后语法正确，search.js 行为不变"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for script in ['js/main.js', 'js/search.js', 'js/crypto.js']:
+            source = (STATIC_DIR / script).read_text(encoding='utf-8')
+            minified = minify_js(source)
+            assert len(minified) < len(source)
+
+            target = Path(tmpdir) / Path(script).name
+            target.write_text(minified, encoding='utf-8')
+            result = subprocess.run(['node', '--check', str(target)], capture_output=True, text=True)
+            assert result.returncode == 0, result.stderr
+
+        script = (
+            "const text = 'Python 入门教程 café';"
+            "const a = new (require(process.argv[1]))('').tokenize(text);"
+            "const b = new (require(process.argv[2]))('').tokenize(text);"
+            "console.log(JSON.stringify([a, b]));"
+        )
+        result = subprocess.run(
+            ['node', '-e', script, str(STATIC_DIR / 'js' / 'search.js'), str(Path(tmpdir) / 'search.js')],
+            capture_output=True, text=True, encoding='utf-8'
+        )
+        assert result.returncode == 0, result.stderr
+        original, minified = json.loads(result.stdout)
+        assert minified == original
+
+
+def test_pipeline_scripts_by_page_type():
+    """测试按页面类型返回脚本，未声明的页面类型使用 default"""
+    plain = AssetPipeline(str(STATIC_DIR), bundles=BUNDLES)
+    assert plain.contents == {}
+    assert plain.scripts() == ['js/search.js', 'js/main.js']
+    assert plain.scripts('encrypted_post') == ['js/search.js', 'js/main.js', 'js/crypto.js']
+    assert plain.scripts('archive') == ['js/search.js', 'js/main.js']
+    assert AssetPipeline(str(STATIC_DIR)).scripts() == []
+
+    bundled = AssetPipeline(str(STATIC_DIR), bundles=BUNDLES, minify=True, bundle=True)
+    assert bundled.scripts('archive') == ['bundles/default.js']
+    assert bundled.scripts('encrypted_post') == ['bundles/encrypted_post.js']
+    assert 'decryptContent' in bundled.contents['bundles/encrypted_post.js']
+    assert 'decryptContent' not in bundled.contents['bundles/default.js']
+    assert bundled.contents['css/style.css'] == minify_css((STATIC_DIR / 'css' / 'style.css').read_text(encoding='utf-8'))
+
+    with pytest.raises(AssetError):
+        AssetPipeline(str(STATIC_DIR), bundles={'default': ['js/missing.js']}, bundle=True)
+
+
+def generate_site(tmpdir, **build_options):
+    """生成包含普通文章和加密文章的站点，返回输出目录"""
+    md_dir = tmpdir / 'md'
+    md_dir.mkdir(exist_ok=True)
+    write_post(md_dir, 'hello', 'Hello', '2024-01-01')
+    (md_dir / 'secret.md').write_text("""---
+title: Secret
+date: 2024-01-01
+encrypted: true
+password: secret
+---
+
+加密正文
+""", encoding='utf-8')
+
+    build_site(write_config(tmpdir, **build_options), md_dir)
+    return tmpdir / 'public'
+
+
+def script_sources(html_file):
+    """提取页面中加载的外部脚本"""
+    return re.findall(r'<script src="([^"]+)"', html_file.read_text(encoding='utf-8'))
+
+
+def test_unbundled_pages_load_scripts_by_page_type():
+    """测试不打包时加密文章页面额外加载 crypto.js，其他页面不加载"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        site = generate_site(Path(tmpdir))
+        assert script_sources(site / 'posts' / 'hello.html') == ['/static/js/search.js', '/static/js/main.js']
+        assert script_sources(site / 'posts' / 'secret.html') == [
+            '/static/js/search.js', '/static/js/main.js', '/static/js/crypto.js'
+        ]
+        assert not (site / 'static' / 'bundles').exists()
+        assert (site / 'static' / 'js' / 'main.js').read_bytes() == (STATIC_DIR / 'js' / 'main.js').read_bytes()
+
+
+def test_bundled_pages_load_one_fingerprinted_script():
+    """测试打包、压缩和指纹同时启用时每个页面只加载一个脚本包"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        site = generate_site(
+            Path(tmpdir), minify_assets=True, bundle_assets=True, fingerprint_assets=True
+        )
+        manifest = json.loads((site / 'asset-manifest.json').read_text(encoding='utf-8'))
+        default_bundle = manifest['bundles/default.js']
+        encrypted_bundle = manifest['bundles/encrypted_post.js']
+
+        assert script_sources(site / 'index.html') == [f'/static/{default_bundle}']
+        assert script_sources(site / 'posts' / 'hello.html') == [f'/static/{default_bundle}']
+        assert script_sources(site / 'posts' / 'secret.html') == [f'/static/{encrypted_bundle}']
+
+        style = (site / 'static' / manifest['css/style.css']).read_text(encoding='utf-8')
+        assert style == minify_css((STATIC_DIR / 'css' / 'style.css').read_text(encoding='utf-8'))
+        assert (site / 'static' / encrypted_bundle).read_bytes() == (
+            site / 'static' / 'bundles' / 'encrypted_post.js'
+        ).read_bytes()
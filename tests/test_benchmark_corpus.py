@@ -0,0 +1,34 @@
+"""
+测试基准测试的合成语料生成
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'benchmarks'))
+
+from corpus import CorpusSpec, generate_corpus
+from mblog.templates.runtime.markdown_processor import MarkdownProcessor
+
+
+def test_corpus_is_deterministic(tmp_path):
+    """测试相同的参数和种子生成相同的语料"""
+    spec = CorpusSpec(posts=5, tags=3, images=2, seed=7)
+    first = generate_corpus(tmp_path / 'a', spec)
+    second = generate_corpus(tmp_path / 'b', spec)
+
+    assert [p.read_bytes() for p in first] == [p.read_bytes() for p in second]
+    assert (tmp_path / 'a' / 'images' / 'img-0000.png').read_bytes() == \
+        (tmp_path / 'b' / 'images' / 'img-0000.png').read_bytes()
+
+
+def test_corpus_can_be_parsed(tmp_path):
+    """测试生成的语料可以被解析，加密比例和图片引用生效"""
+    spec = CorpusSpec(posts=12, code_density=1.0, tags=4, images=3, encrypted_fraction=1.0, cjk_ratio=1.0)
+    generate_corpus(tmp_path, spec)
+
+    posts = MarkdownProcessor(str(tmp_path)).load_posts()
+    assert len(posts) == 12
+    assert all(post.encrypted and post.password for post in posts)
+    assert {tag for post in posts for tag in post.tags} <= {f'标签{i}' for i in range(4)}
+    assert any(post.images for post in posts)
+    assert all('class="highlight"' in post.html for post in posts)
@@ -0,0 +1,117 @@
+"""
+测试构建缓存
+"""
+import pytest
+import tempfile
+from pathlib import Path
+
+from mblog.templates.runtime.cache import BuildCache, hash_bytes
+from mblog.templates.runtime.markdown_processor import MarkdownProcessor
+
+
+POST_CONTENT = """---
+title: 缓存测试
+date: 2024-01-01
+tags: [python]
+---
+
+# 标题
+
+![图片](./img.png)
+"""
+
+
+@pytest.fixture
+def workspace():
+    """创建包含 md 目录和缓存目录的临时工作区"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmpdir = Path(tmpdir)
+        md_dir = tmpdir / 'md'
+        md_dir.mkdir()
+        (md_dir / 'post.md').write_text(POST_CONTENT, encoding='utf-8')
+        yield tmpdir, md_dir, tmpdir / '.mblog-cache'
+
+
+def test_build_cache_roundtrip(workspace):
+    """测试缓存条目的读写"""
+    _, _, cache_dir = workspace
+    cache = BuildCache(str(cache_dir), 'test')
+
+    assert cache.get('missing') is None
+    cache.set('abc123', {'value': 1})
+    assert cache.get('abc123') == {'value': 1}
+
+    cache.clear()
+    assert cache.get('abc123') is None
+
+
+def test_hash_bytes_separates_parts():
+    """测试摘要计算区分片段边界"""
+    assert hash_bytes('ab', 'c') != hash_bytes('a', 'bc')
+    assert hash_bytes(b'x', 1) == hash_bytes('x', '1')
+
+
+def test_unchanged_post_loaded_from_cache(workspace, monkeypatch):
+    """测试未修改的文章直接从缓存加载"""
+    _, md_dir, cache_dir = workspace
+
+    first = MarkdownProcessor(str(md_dir), cache_dir=str(cache_dir)).load_posts()
+
+    processor = MarkdownProcessor(str(md_dir), cache_dir=str(cache_dir))
+
+    def fail_convert(text):
+        raise AssertionError("命中缓存时不应重新转换 Markdown")
+
+    monkeypatch.setattr(processor, '_convert_to_html', fail_convert)
+    second = processor.load_posts()
+
+    assert len(second) == 1
+    assert second[0].html == first[0].html
+    assert second[0].metadata == first[0].metadata
+    assert second[0].date == first[0].date
+
+
+def test_changed_post_is_reconverted(workspace):
+    """测试修改后的文章会重新解析"""
+    _, md_dir, cache_dir = workspace
+
+    MarkdownProcessor(str(md_dir), cache_dir=str(cache_dir)).load_posts()
+    (md_dir / 'post.md').write_text(POST_CONTENT.replace('# 标题', '# 新标题'), encoding='utf-8')
+
+    posts = MarkdownProcessor(str(md_dir), cache_dir=str(cache_dir)).load_posts()
+    assert '新标题' in posts[0].html
+
+
+def test_settings_change_invalidates_cache(workspace):
+    """测试处理器设置变化后缓存失效"""
+    _, md_dir, cache_dir = workspace
+
+    MarkdownProcessor(str(md_dir), cache_dir=str(cache_dir)).load_posts()
+    (md_dir / 'img.png').write_bytes(b'fake image')
+
+    posts = MarkdownProcessor(str(md_dir), base_path='/blog', cache_dir=str(cache_dir)).load_posts()
+    assert '/blog/assets/images/img.png' in posts[0].html
+
+
+def test_pygments_upgrade_invalidates_cache(workspace, monkeypatch):
+    """测试 Pygments 版本变化后缓存失效（代码高亮结果依赖 Pygments）"""
+    pygments = pytest.importorskip('pygments')
+    _, md_dir, cache_dir = workspace
+
+    digest = MarkdownProcessor(str(md_dir), cache_dir=str(cache_dir))._settings_digest
+    monkeypatch.setattr(pygments, '__version__', '0.0.1')
+
+    assert MarkdownProcessor(str(md_dir), cache_dir=str(cache_dir))._settings_digest != digest
+
+
+def test_added_image_invalidates_cache(workspace):
+    """测试新增引用的图片后缓存条目失效"""
+    _, md_dir, cache_dir = workspace
+
+    posts = MarkdownProcessor(str(md_dir), cache_dir=str(cache_dir)).load_posts()
+    assert posts[0].images == []
+
+    (md_dir / 'img.png').write_bytes(b'fake image')
+    posts = MarkdownProcessor(str(md_dir), cache_dir=str(cache_dir)).load_posts()
+    assert len(posts[0].images) == 1
+    assert '/assets/images/img.png' in posts[0].html
@@ -150,6 +150,39 @@ class TestNewCommand:
         assert "错误" in captured.err or "error" in captured.err.lower()
 
 
+class TestServeCommand:
+    """测试 serve 命令"""
+    
+    def test_parse_serve_command(self, cli):
+        """测试解析 serve 命令参数"""
+        args = cli.parser.parse_args(['serve', '--port', '9000'])
+        assert args.command == 'serve'
+        assert args.port == 9000
+        assert args.host == '127.0.0.1'
+        assert args.project_path == '.'
+    
+    def test_handle_serve_invalid_project(self, cli, temp_dir, capsys):
+        """测试在非 mblog 项目中启动预览服务器"""
+        exit_code = cli.run(['serve', '-p', str(temp_dir)])
+        assert exit_code == 1
+        assert '不是有效的 mblog 项目' in capsys.readouterr().err
+    
+    def test_handle_serve_runs_project_runtime(self, cli, temp_dir):
+        """测试使用项目自己的运行时启动预览服务器"""
+        (temp_dir / '_mblog').mkdir()
+        (temp_dir / '_mblog' / 'server.py').write_text('')
+        (temp_dir / 'config.json').write_text('{}')
+        
+        with patch('subprocess.call', return_value=0) as mock_call:
+            exit_code = cli.run(['serve', '-p', str(temp_dir), '--port', '9000'])
+        
+        assert exit_code == 0
+        command = mock_call.call_args[0][0]
+        assert command[1:3] == ['-m', '_mblog.server']
+        assert '9000' in command
+        assert mock_call.call_args[1]['cwd'] == str(temp_dir)
+
+
 class TestRunMethod:
     """测试 run 方法"""
     
@@ -0,0 +1,142 @@
+"""
+测试图片和静态资源的硬链接 / reflink 复制方式
+"""
+import os
+import pytest
+import tempfile
+from pathlib import Path
+
+from mblog.templates.runtime import copier as copier_module
+from mblog.templates.runtime.copier import FileCopier, is_unchanged
+from tests.conftest import build_site, write_config
+
+
+@pytest.fixture
+def tmpdir():
+    """临时目录"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        yield Path(tmpdir)
+
+
+def test_hardlink_shares_inode(tmpdir):
+    """测试硬链接方式不复制文件内容"""
+    src = tmpdir / 'src.png'
+    src.write_bytes(b'image')
+    dest = tmpdir / 'out' / 'dest.png'
+
+    assert FileCopier('hardlink').copy(src, dest) == 'hardlink'
+    assert os.path.samefile(src, dest)
+    assert is_unchanged(src, dest)
+
+
+def test_copy_replaces_hardlink_without_touching_source(tmpdir):
+    """测试复制到已有的硬链接输出时不会改写源文件"""
+    src = tmpdir / 'src.css'
+    src.write_bytes(b'old')
+    dest = tmpdir / 'dest.css'
+    os.link(src, dest)
+
+    other = tmpdir / 'other.css'
+    other.write_bytes(b'new')
+    assert FileCopier('copy').copy(other, dest) == 'copy'
+
+    assert src.read_bytes() == b'old'
+    assert dest.read_bytes() == b'new'
+
+
+def test_reflink_falls_back_to_copy(tmpdir, monkeypatch):
+    """测试不支持 reflink 时回退到复制，并且不再重试"""
+    monkeypatch.setattr(copier_module, 'fcntl', None)
+    src = tmpdir / 'src.png'
+    src.write_bytes(b'image')
+
+    file_copier = FileCopier('reflink')
+    assert file_copier.copy(src, tmpdir / 'a.png') == 'copy'
+    assert file_copier.copy(src, tmpdir / 'b.png') == 'copy'
+    assert (tmpdir / 'b.png').read_bytes() == b'image'
+    assert not list(tmpdir.glob('.tmp-*'))
+
+
+def test_invalid_mode_uses_copy():
+    """测试无效的复制方式回退到复制"""
+    assert FileCopier('symlink').mode == 'copy'
+
+
+def build(tmpdir, **build_options):
+    """生成包含一张图片的站点，返回生成器"""
+    return build_site(write_config(tmpdir, **build_options), tmpdir / 'md')
+
+
+def test_incremental_build_links_and_skips_images(tmpdir, monkeypatch):
+    """测试硬链接方式放入文章图片，增量构建时跳过未变化的文件"""
+    md_dir = tmpdir / 'md'
+    (md_dir / 'images').mkdir(parents=True)
+    image = md_dir / 'images' / 'photo.png'
+    image.write_bytes(b'\x89PNG image data')
+    (md_dir / 'hello.md').write_text("""---
+title: Hello
+date: 2024-01-01
+---
+
+![photo](images/photo.png)
+""", encoding='utf-8')
+
+    build(tmpdir, incremental=True, copy_mode='hardlink')
+    output_image = tmpdir / 'public' / 'assets' / 'images' / 'images' / 'photo.png'
+    assert os.path.samefile(image, output_image)
+
+    copied = []
+    original_copy = FileCopier.copy
+
+    def tracking_copy(self, src, dest, mode=None):
+        copied.append(Path(dest).name)
+        return original_copy(self, src, dest, mode)
+
+    monkeypatch.setattr(FileCopier, 'copy', tracking_copy)
+    generator = build(tmpdir, incremental=True, copy_mode='hardlink')
+    assert copied == []
+    assert generator._unchanged_count > 0
+    assert output_image.exists()
+
+    # 源文件被替换（新的 inode）后重新链接
+    image.unlink()
+    image.write_bytes(b'\x89PNG changed')
+    build(tmpdir, incremental=True, copy_mode='hardlink')
+    assert copied == ['photo.png']
+    assert output_image.read_bytes() == b'\x89PNG changed'
+
+
+def test_shared_images_copied_once(tmpdir, monkeypatch):
+    """测试多篇文章引用的图片只复制一次，内容相同的不同路径链接到同一份文件"""
+    md_dir = tmpdir / 'md'
+    (md_dir / 'images').mkdir(parents=True)
+    (md_dir / 'images' / 'header.png').write_bytes(b'shared header')
+    (md_dir / 'images' / 'header-copy.png').write_bytes(b'shared header')
+    (md_dir / 'images' / 'other.png').write_bytes(b'other  header')
+    for i in range(3):
+        (md_dir / f'post-{i}.md').write_text(f"""---
+title: Post {i}
+date: 2024-01-0{i + 1}
+---
+
+![header](images/header.png) ![header](images/header.png)
+![copy](images/header-copy.png) ![other](images/other.png)
+""", encoding='utf-8')
+
+    copied = []
+    original_copy = FileCopier.copy
+
+    def tracking_copy(self, src, dest, mode=None):
+        copied.append((Path(src).name, Path(dest).name, mode))
+        return original_copy(self, src, dest, mode)
+
+    monkeypatch.setattr(FileCopier, 'copy', tracking_copy)
+    build(tmpdir, dedupe_images=True)
+
+    images_dest = tmpdir / 'public' / 'assets' / 'images' / 'images'
+    assert sorted(dest for _, dest, _ in copied if dest.endswith('.png')) == [
+        'header-copy.png', 'header.png', 'other.png'
+    ]
+    assert ('header.png', 'header-copy.png', 'hardlink') in copied
+    assert os.path.samefile(images_dest / 'header.png', images_dest / 'header-copy.png')
+    assert (images_dest / 'other.png').read_bytes() == b'other  header'
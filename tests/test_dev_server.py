@@ -0,0 +1,170 @@
+"""
+测试本地预览服务器
+"""
+import pytest
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+from mblog.templates.runtime.server import DevServer, FileWatcher, RELOAD_ENDPOINT
+from tests.conftest import DEFAULT_THEME_DIR, write_config, write_post
+
+
+@pytest.fixture
+def server(project_dir):
+    """创建已加载页面的预览服务器"""
+    config_file = write_config(project_dir)
+    server = DevServer(str(config_file), str(project_dir / 'md'), str(DEFAULT_THEME_DIR), port=0)
+    server.load()
+    return server
+
+
+def test_pages_generated_in_memory(server):
+    """测试页面保存在内存中，不写入输出目录"""
+    assert 'index.html' in server.generator.pages
+    assert 'posts/first.html' in server.generator.pages
+    assert 'tags/go.html' in server.generator.pages
+    assert not Path(server.config.get('build.output_dir')).exists()
+
+
+def test_resolve_injects_live_reload(server):
+    """测试 HTML 页面注入自动刷新脚本，静态资源从主题目录读取"""
+    body, content_type = server.resolve('/')
+    assert content_type.startswith('text/html')
+    assert RELOAD_ENDPOINT.encode() in body
+
+    body, _ = server.resolve('/static/css/style.css')
+    assert body == (DEFAULT_THEME_DIR / 'static' / 'css' / 'style.css').read_bytes()
+
+    assert server.resolve('/missing.html') is None
+    assert server.resolve('/static/../theme.json') is None
+
+
+def test_base_path_matches_whole_segment(server):
+    """测试只去掉完整的 base_path 路径段"""
+    server.base_path = '/blog'
+
+    assert server.resolve('/blog/posts/first.html') is not None
+    assert server.resolve('/blog') == server.resolve('/blog/')
+    assert server.resolve('/blogposts/first.html') is None
+
+
+def test_only_referenced_images_served(server):
+    """测试只提供文章引用的图片，md 目录中的源文件（含加密文章密码）返回 404"""
+    (server.md_dir / 'images').mkdir()
+    (server.md_dir / 'images' / 'photo.png').write_bytes(b'\x89PNG image')
+    (server.md_dir / 'images' / 'unused.png').write_bytes(b'\x89PNG unused')
+    (server.md_dir / 'photo.md').write_text("""---
+title: Photo
+date: 2024-01-09
+encrypted: true
+password: hunter2
+---
+
+![photo](images/photo.png)
+""", encoding='utf-8')
+    server.handle_changes({server.md_dir / 'photo.md', server.md_dir / 'images' / 'photo.png'}, set())
+
+    assert server.resolve('/assets/images/images/photo.png')[0] == b'\x89PNG image'
+    assert server.resolve('/assets/images/photo.md') is None
+    assert server.resolve('/assets/images/first.md') is None
+    assert server.resolve('/assets/images/images/unused.png') is None
+
+    server.start()
+    try:
+        with pytest.raises(urllib.error.HTTPError) as excinfo:
+            urllib.request.urlopen(f'http://127.0.0.1:{server.port}/assets/images/photo.md')
+        assert excinfo.value.code == 404
+    finally:
+        server.stop()
+
+
+def test_changed_post_rebuilds_only_that_post(server, monkeypatch):
+    """测试修改文章后只重新渲染该文章的详情页"""
+    rendered = []
+    original_render_post = server.renderer.render_post
+
+    def tracking_render_post(post):
+        rendered.append(post.relative_path)
+        return original_render_post(post)
+
+    monkeypatch.setattr(server.renderer, 'render_post', tracking_render_post)
+
+    write_post(server.md_dir, 'first', 'First Post', '2024-01-01', body='更新后的正文')
+    assert server.handle_changes({server.md_dir / 'first.md'}, set())
+
+    assert rendered == ['first']
+    assert '更新后的正文' in server.generator.pages['posts/first.html'].decode('utf-8')
+
+
+def test_removed_post_and_tag_pages_dropped(server):
+    """测试删除文章后对应的详情页和标签页被移除"""
+    (server.md_dir / 'second.md').unlink()
+    server.handle_changes(set(), {server.md_dir / 'second.md'})
+
+    assert 'posts/second.html' not in server.generator.pages
+    assert 'tags/go.html' not in server.generator.pages
+    assert 'tags/python.html' in server.generator.pages
+
+
+def test_pages_served_during_rebuild(server, monkeypatch):
+    """测试重新生成过程中请求仍能读到已有的页面，完成后一次性替换"""
+    seen = []
+    original_generate_tag_pages = server.generator._generate_tag_pages
+
+    def checking_generate_tag_pages():
+        # 此时标签页、分页和搜索索引已从副本中删除，请求线程读到的页面不受影响
+        seen.append((server.resolve('/tags/python.html') is not None, server.resolve('/') is not None))
+        original_generate_tag_pages()
+
+    monkeypatch.setattr(server.generator, '_generate_tag_pages', checking_generate_tag_pages)
+
+    write_post(server.md_dir, 'first', 'First Post', '2024-01-01', body='更新后的正文')
+    server.handle_changes({server.md_dir / 'first.md'}, set())
+    server.handle_changes({server.theme_dir / 'templates' / 'base.html'}, set())
+
+    assert seen == [(True, True), (True, True)]
+    assert '更新后的正文' in server.resolve('/posts/first.html')[0].decode('utf-8')
+
+
+def test_failed_rebuild_keeps_pages(server, monkeypatch):
+    """测试重新生成失败时保留原来的页面"""
+    pages = server.generator.pages
+
+    def failing_generate_tag_pages():
+        raise RuntimeError('boom')
+
+    monkeypatch.setattr(server.generator, '_generate_tag_pages', failing_generate_tag_pages)
+    with pytest.raises(RuntimeError):
+        server.rebuild_all()
+
+    assert server.generator.pages is pages
+    assert 'tags/python.html' in server.generator.pages
+
+
+def test_file_watcher_detects_changes(server):
+    """测试轮询监视器检测新增、修改和删除"""
+    watcher = FileWatcher([server.md_dir])
+    assert watcher.poll() == (set(), set())
+
+    write_post(server.md_dir, 'third', 'Third Post', '2024-01-03')
+    (server.md_dir / 'second.md').unlink()
+    changed, removed = watcher.poll()
+
+    assert changed == {server.md_dir / 'third.md'}
+    assert removed == {server.md_dir / 'second.md'}
+
+
+def test_http_server_serves_pages(server):
+    """测试 HTTP 服务器返回内存中的页面和页面版本"""
+    server.start()
+    try:
+        base_url = f'http://127.0.0.1:{server.port}'
+        with urllib.request.urlopen(f'{base_url}/posts/first.html') as response:
+            assert 'First Post' in response.read().decode('utf-8')
+
+        server.notify_reload()
+        with urllib.request.urlopen(f'{base_url}{RELOAD_ENDPOINT}?v=0') as response:
+            assert response.read() == b'1'
+    finally:
+        server.stop()
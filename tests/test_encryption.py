@@ -18,6 +18,12 @@ from mblog.templates.runtime.config import Config
 from mblog.templates.runtime.renderer import Renderer
 
 
+def put_key(key_file, password):
+    """在工作进程中缓存一个密钥"""
+    from mblog.templates.runtime.renderer import EncryptionKeyCache
+    EncryptionKeyCache(key_file).put(password, b'salt', password.encode('utf-8'))
+
+
 class TestEncryption(unittest.TestCase):
     """测试加密功能"""
     
@@ -187,5 +193,199 @@ This is an encrypted post.
         self.assertFalse(theme.has_template('nonexistent'))
 
 
+class TestEncryptionCaching(unittest.TestCase):
+    """测试加密密钥缓存和密文复用"""
+    
+    def setUp(self):
+        """设置测试环境"""
+        self.test_dir = tempfile.mkdtemp()
+        self.cache_dir = Path(self.test_dir) / '.mblog-cache'
+        self.key_file = Path(self.test_dir) / '.mblog-keys.json'
+        
+        theme_dir = Path(self.test_dir) / 'theme'
+        (theme_dir / 'templates').mkdir(parents=True)
+        (theme_dir / 'theme.json').write_text('{"name": "test", "templates": {}}')
+        for name in ('base.html', 'index.html', 'post.html'):
+            (theme_dir / 'templates' / name).write_text('<html></html>')
+        self.theme = Theme(str(theme_dir))
+        self.theme.load()
+    
+    def tearDown(self):
+        """清理测试环境"""
+        shutil.rmtree(self.test_dir)
+    
+    def create_renderer(self, key_cache_file=None, reuse_ciphertext=False):
+        """创建渲染器，并统计 PBKDF2 派生次数"""
+        import json
+        config_file = Path(self.test_dir) / 'config.json'
+        config_file.write_text(json.dumps({
+            'site': {'title': 'Test', 'description': 'Test', 'author': 'Test'},
+            'build': {
+                'output_dir': 'public',
+                'theme': 'default',
+                'cache_dir': str(self.cache_dir),
+                'key_cache_file': str(key_cache_file) if key_cache_file else None,
+                'reuse_ciphertext': reuse_ciphertext
+            }
+        }))
+        config = Config(str(config_file))
+        config.load()
+        
+        renderer = Renderer(self.theme, config)
+        renderer.derive_count = 0
+        original_derive = renderer._derive_key
+        
+        def counting_derive(password, salt):
+            renderer.derive_count += 1
+            return original_derive(password, salt)
+        
+        renderer._derive_key = counting_derive
+        return renderer
+    
+    def decrypt(self, encrypted, password):
+        """使用 AES-GCM 解密"""
+        import base64
+        from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+        from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+        from cryptography.hazmat.primitives import hashes
+        
+        salt, nonce, ciphertext = (base64.b64decode(part) for part in encrypted.split(':'))
+        key = PBKDF2HMAC(algorithm=hashes.SHA256(), length=32, salt=salt,
+                         iterations=100_000).derive(password.encode('utf-8'))
+        return AESGCM(key).decrypt(nonce, ciphertext, None).decode('utf-8')
+    
+    def test_key_derived_once_per_password(self):
+        """测试同一密码在一次构建中只派生一次密钥"""
+        renderer = self.create_renderer()
+        
+        first = renderer._encrypt_content('<p>one</p>', 'secret')
+        second = renderer._encrypt_content('<p>two</p>', 'secret')
+        renderer._encrypt_content('<p>three</p>', 'other')
+        
+        self.assertEqual(renderer.derive_count, 2)
+        # 盐值复用，nonce 每次不同
+        self.assertEqual(first.split(':')[0], second.split(':')[0])
+        self.assertNotEqual(first.split(':')[1], second.split(':')[1])
+        self.assertEqual(self.decrypt(second, 'secret'), '<p>two</p>')
+        self.assertFalse(self.cache_dir.exists())
+        self.assertFalse(self.key_file.exists())
+    
+    def test_key_cache_persists_across_builds(self):
+        """测试启用密钥文件后跨构建复用密钥"""
+        self.create_renderer(self.key_file)._encrypt_content('<p>one</p>', 'secret')
+        
+        self.assertTrue(self.key_file.exists())
+        self.assertNotIn('secret', self.key_file.read_text())
+        self.assertEqual(self.key_file.stat().st_mode & 0o777, 0o600)
+        
+        renderer = self.create_renderer(self.key_file)
+        encrypted = renderer._encrypt_content('<p>two</p>', 'secret')
+        
+        self.assertEqual(renderer.derive_count, 0)
+        self.assertEqual(self.decrypt(encrypted, 'secret'), '<p>two</p>')
+    
+    def test_key_cache_index_is_not_plain_password_hash(self):
+        """测试密钥文件不以可快速试探的无盐密码摘要为索引"""
+        import hashlib
+        import json
+        self.create_renderer(self.key_file)._encrypt_content('<p>one</p>', 'secret')
+        
+        password_ids = set(json.loads(self.key_file.read_text())['keys'])
+        self.assertEqual(len(password_ids), 1)
+        self.assertNotIn(hashlib.sha256(b'secret').hexdigest(), password_ids)
+        
+        # 不同的密钥文件使用不同的 HMAC 密钥，同一密码的索引不同
+        other_file = Path(self.test_dir) / 'other-keys.json'
+        self.create_renderer(other_file)._encrypt_content('<p>one</p>', 'secret')
+        self.assertNotEqual(set(json.loads(other_file.read_text())['keys']), password_ids)
+    
+    def test_key_cache_merges_concurrent_saves(self):
+        """测试多个工作进程的密钥缓存同时保存时不会互相覆盖条目"""
+        from mblog.templates.runtime.renderer import EncryptionKeyCache
+        # 两个进程都在密钥文件创建之前读取，各自生成了不同的 HMAC 密钥
+        first = EncryptionKeyCache(self.key_file)
+        second = EncryptionKeyCache(self.key_file)
+        self.assertIsNone(first.get('one'))
+        self.assertIsNone(second.get('two'))
+        
+        first.put('one', b'salt-1', b'key-1')
+        second.put('two', b'salt-2', b'key-2')
+        first.put('three', b'salt-3', b'key-3')
+        
+        merged = EncryptionKeyCache(self.key_file)
+        self.assertEqual(merged.get('one'), (b'salt-1', b'key-1'))
+        self.assertEqual(merged.get('two'), (b'salt-2', b'key-2'))
+        self.assertEqual(merged.get('three'), (b'salt-3', b'key-3'))
+        # 后保存的进程改用了文件中的 HMAC 密钥，仍能命中自己的条目
+        self.assertEqual(second.get('two'), (b'salt-2', b'key-2'))
+    
+    def test_key_cache_saves_from_parallel_processes(self):
+        """测试多个进程同时保存密钥文件时保留所有条目"""
+        from concurrent.futures import ProcessPoolExecutor
+        from mblog.templates.runtime.renderer import EncryptionKeyCache
+        passwords = [f'password-{i}' for i in range(16)]
+        with ProcessPoolExecutor(max_workers=4) as executor:
+            list(executor.map(put_key, [self.key_file] * len(passwords), passwords))
+        
+        cache = EncryptionKeyCache(self.key_file)
+        for password in passwords:
+            self.assertEqual(cache.get(password), (b'salt', password.encode('utf-8')))
+    
+    def test_key_cache_file_in_cache_dir_is_refused(self):
+        """测试密钥文件位于构建缓存目录中时只在内存中缓存"""
+        renderer = self.create_renderer(self.cache_dir / 'keys.json')
+        renderer._encrypt_content('<p>one</p>', 'secret')
+        
+        self.assertIsNone(renderer.key_cache.cache_file)
+        self.assertFalse((self.cache_dir / 'keys.json').exists())
+    
+    def test_cache_dir_contains_no_key_material(self):
+        """测试被 CI 缓存的构建缓存目录中不包含派生密钥或密码"""
+        import base64
+        renderer = self.create_renderer(self.key_file, reuse_ciphertext=True)
+        renderer._encrypt_post_html(self.create_post('<p>one</p>'))
+        
+        salt, key = renderer.key_cache.get('secret')
+        secrets = [key, base64.b64encode(key), key.hex().encode('utf-8'), b'secret']
+        
+        cached_files = [path for path in self.cache_dir.rglob('*') if path.is_file()]
+        self.assertTrue(cached_files)
+        for path in cached_files:
+            content = path.read_bytes()
+            for secret in secrets:
+                self.assertNotIn(secret, content, f"{path} 包含密钥材料")
+    
+    def create_post(self, html, password='secret'):
+        """创建加密文章"""
+        from datetime import datetime
+        return Post(
+            filepath='/tmp/secret.md', slug='secret', relative_path='secret',
+            title='Secret', date=datetime(2024, 1, 1), author='', description='',
+            tags=[], content='', html=html, encrypted=True, password=password
+        )
+    
+    def test_unchanged_post_reuses_ciphertext(self):
+        """测试明文和密码未变化时复用上次的密文"""
+        first = self.create_renderer(reuse_ciphertext=True)._encrypt_post_html(self.create_post('<p>one</p>'))
+        
+        renderer = self.create_renderer(reuse_ciphertext=True)
+        second = renderer._encrypt_post_html(self.create_post('<p>one</p>'))
+        
+        self.assertEqual(first, second)
+        self.assertEqual(renderer.derive_count, 0)
+    
+    def test_changed_post_is_reencrypted(self):
+        """测试明文或密码变化时重新加密"""
+        original = self.create_renderer(reuse_ciphertext=True)._encrypt_post_html(self.create_post('<p>one</p>'))
+        
+        renderer = self.create_renderer(reuse_ciphertext=True)
+        changed_html = renderer._encrypt_post_html(self.create_post('<p>two</p>'))
+        changed_password = renderer._encrypt_post_html(self.create_post('<p>two</p>', password='other'))
+        
+        self.assertNotEqual(changed_html, original)
+        self.assertEqual(self.decrypt(changed_html, 'secret'), '<p>two</p>')
+        self.assertEqual(self.decrypt(changed_password, 'other'), '<p>two</p>')
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,105 @@
+"""
+测试增量构建
+"""
+import json
+import pytest
+from unittest import mock
+
+from mblog.templates.runtime.renderer import Renderer
+from tests.conftest import build_site, write_config, write_post
+
+
+@pytest.fixture
+def project(project_dir):
+    """创建启用增量构建的测试项目"""
+    return project_dir, project_dir / 'md', write_config(project_dir, incremental=True)
+
+
+def build(md_dir, config_file):
+    """执行一次完整构建，返回生成器和被渲染的文章列表"""
+    rendered = []
+    original_render_post = Renderer.render_post
+
+    def tracking_render_post(renderer, post):
+        rendered.append(post.relative_path)
+        return original_render_post(renderer, post)
+
+    with mock.patch.object(Renderer, 'render_post', tracking_render_post):
+        generator = build_site(config_file, md_dir)
+    return generator, rendered
+
+
+def test_first_build_renders_everything(project):
+    """测试首次构建生成所有页面"""
+    tmpdir, md_dir, config_file = project
+    _, rendered = build(md_dir, config_file)
+
+    assert sorted(rendered) == ['first', 'second']
+    assert (tmpdir / 'public' / 'posts' / 'first.html').exists()
+    assert (tmpdir / '.mblog-cache' / 'build-manifest.json').exists()
+
+
+def test_unchanged_build_skips_pages(project):
+    """测试没有变化时不重新渲染文章页"""
+    _, md_dir, config_file = project
+    build(md_dir, config_file)
+    _, rendered = build(md_dir, config_file)
+
+    assert rendered == []
+
+
+def test_only_changed_post_is_rerendered(project):
+    """测试只重新渲染修改过的文章"""
+    tmpdir, md_dir, config_file = project
+    build(md_dir, config_file)
+
+    write_post(md_dir, 'first', 'First Post', '2024-01-01', body='修改后的正文')
+    _, rendered = build(md_dir, config_file)
+
+    assert rendered == ['first']
+    html = (tmpdir / 'public' / 'posts' / 'first.html').read_text(encoding='utf-8')
+    assert '修改后的正文' in html
+
+
+def test_removed_outputs_are_deleted(project):
+    """测试删除文章后对应的页面和标签页被删除"""
+    tmpdir, md_dir, config_file = project
+    build(md_dir, config_file)
+    assert (tmpdir / 'public' / 'tags' / 'go.html').exists()
+
+    (md_dir / 'second.md').unlink()
+    build(md_dir, config_file)
+
+    assert not (tmpdir / 'public' / 'posts' / 'second.html').exists()
+    assert not (tmpdir / 'public' / 'tags' / 'go.html').exists()
+    assert (tmpdir / 'public' / 'posts' / 'first.html').exists()
+
+
+def test_config_change_rebuilds_all(project):
+    """测试配置变化后重新生成所有页面"""
+    tmpdir, md_dir, config_file = project
+    build(md_dir, config_file)
+
+    config_data = json.loads(config_file.read_text())
+    config_data['site']['title'] = 'Renamed'
+    config_file.write_text(json.dumps(config_data))
+    _, rendered = build(md_dir, config_file)
+
+    assert sorted(rendered) == ['first', 'second']
+
+
+def test_new_year_rebuilds_all(project):
+    """测试模板全局变量 current_year 变化（跨年）后重新生成所有页面"""
+    tmpdir, md_dir, config_file = project
+    build(md_dir, config_file)
+
+    original_register_globals = Renderer._register_globals
+
+    def next_year_globals(renderer):
+        original_register_globals(renderer)
+        renderer.env.globals['current_year'] += 1
+
+    with mock.patch.object(Renderer, '_register_globals', next_year_globals):
+        _, rendered = build(md_dir, config_file)
+
+    assert sorted(rendered) == ['first', 'second']
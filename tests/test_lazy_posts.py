@@ -0,0 +1,103 @@
+"""
+测试按需加载文章正文
+"""
+import pickle
+
+import pytest
+
+from mblog.templates.runtime.markdown_processor import LazyPost, MarkdownProcessor
+from tests.conftest import build_site, write_config
+
+
+@pytest.fixture
+def md_dir(tmp_path):
+    """创建包含普通文章和加密文章的 md 目录"""
+    md_dir = tmp_path / 'md'
+    md_dir.mkdir()
+    for i in range(3):
+        (md_dir / f'post-{i}.md').write_text(f"""---
+title: Post {i}
+date: 2024-01-0{i + 1}
+tags: [python]
+---
+
+# Heading {i}
+
+Body of post {i}.
+""", encoding='utf-8')
+    (md_dir / 'secret.md').write_text("""---
+title: Secret
+date: 2024-02-01
+encrypted: true
+password: "test123"
+---
+
+Secret body.
+""", encoding='utf-8')
+    return md_dir
+
+
+def test_body_loaded_on_demand_and_released(md_dir, tmp_path):
+    """测试正文在访问时从缓存加载，释放后可以重新加载"""
+    posts = MarkdownProcessor(str(md_dir), cache_dir=str(tmp_path / 'cache'), lazy=True).load_posts()
+    post = next(p for p in posts if p.title == 'Post 0')
+
+    assert isinstance(post, LazyPost)
+    assert not post.is_loaded
+    assert 'Body of post 0.' in post.html
+    assert post.content.startswith('# Heading 0')
+    assert post.is_loaded
+
+    post.release()
+    assert not post.is_loaded
+    assert 'Body of post 0.' in post.html
+
+
+def test_body_reparsed_without_cache(md_dir):
+    """测试未启用缓存时重新解析源文件得到正文"""
+    posts = MarkdownProcessor(str(md_dir), lazy=True).load_posts()
+
+    assert all(not post.is_loaded for post in posts)
+    assert '<h1 id="heading-1">Heading 1</h1>' in next(p for p in posts if p.title == 'Post 1').html
+
+
+def test_assigned_html_survives_release(md_dir, tmp_path):
+    """测试被赋值的正文不会被 release() 释放"""
+    post = MarkdownProcessor(str(md_dir), cache_dir=str(tmp_path / 'cache'), lazy=True).load_posts()[0]
+    post.html = '<p>rewritten</p>'
+    post.release()
+
+    assert post.html == '<p>rewritten</p>'
+    assert post.content
+
+
+def test_parallel_posts_share_loader(md_dir, tmp_path):
+    """测试从工作进程返回的文章不带正文，并共享同一个加载器"""
+    posts = MarkdownProcessor(str(md_dir), cache_dir=str(tmp_path / 'cache'), lazy=True).load_posts(workers=2)
+
+    assert all(isinstance(post, LazyPost) and not post.is_loaded for post in posts)
+    assert len({id(post._body_loader) for post in posts}) == 1
+    copy = pickle.loads(pickle.dumps(posts[0]))
+    assert copy._body_loader is posts[0]._body_loader
+    assert copy.html == posts[0].html
+
+
+def build(md_dir, output_dir, lazy):
+    """生成站点，返回生成器"""
+    config_file = write_config(md_dir.parent, output_dir=str(output_dir), incremental=True, lazy_posts=lazy)
+    return build_site(config_file, md_dir)
+
+
+def test_lazy_build_matches_eager_build(md_dir, tmp_path):
+    """测试按需加载正文生成的页面与常规构建相同，构建结束后正文已释放"""
+    build(md_dir, tmp_path / 'eager', lazy=False)
+    generator = build(md_dir, tmp_path / 'lazy', lazy=True)
+
+    assert all(not post.is_loaded for post in generator.posts)
+    # 比较 HTML 页面（搜索索引等文件包含生成时间）
+    for eager_file in (tmp_path / 'eager').rglob('*.html'):
+        if eager_file.name != 'secret.html':
+            lazy_file = tmp_path / 'lazy' / eager_file.relative_to(tmp_path / 'eager')
+            assert lazy_file.read_bytes() == eager_file.read_bytes(), eager_file.name
+    # 加密文章每次使用随机盐值，只比较是否生成
+    assert (tmp_path / 'lazy' / 'posts' / 'secret.html').exists()
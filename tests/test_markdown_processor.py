@@ -542,6 +542,27 @@ title: "Markdown 文章"
         # 应该只加载 .md 文件
         assert len(posts) == 1
         assert posts[0].title == "Markdown 文章"
+    
+    def test_load_posts_parallel_matches_serial(self, temp_dir):
+        """测试并行解析的结果与顺序解析一致"""
+        for i in range(6):
+            content = f"""---
+title: "文章 {i}"
+date: 2025-10-{10 + i}
+---
+```python
+print({i})
+```
+"""
+            (temp_dir / f"post{i}.md").write_text(content, encoding='utf-8')
+        (temp_dir / "invalid.md").write_text("---\ndate: 2025-10-23\n---\n内容\n", encoding='utf-8')
+        
+        serial = MarkdownProcessor(str(temp_dir)).load_posts()
+        parallel = MarkdownProcessor(str(temp_dir)).load_posts(workers=3)
+        
+        assert [p.title for p in parallel] == [p.title for p in serial]
+        assert [p.html for p in parallel] == [p.html for p in serial]
+        assert parallel[0].title == "文章 5"
 
 
 class TestPostDataModel:
@@ -0,0 +1,85 @@
+"""
+测试并行页面生成
+"""
+import json
+import pytest
+import tempfile
+from pathlib import Path
+
+from mblog.templates.runtime.generator import GenerationError
+from tests.conftest import DEFAULT_THEME_DIR, build_site, write_config
+
+
+# 包含时间戳、每次生成都不同的文件
+TIMESTAMPED_FILES = {'sitemap.xml', 'search-index.json'}
+
+
+@pytest.fixture
+def md_dir():
+    """创建包含多篇文章的 md 目录"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        md_dir = Path(tmpdir) / 'md'
+        md_dir.mkdir()
+        for i in range(12):
+            (md_dir / f'post-{i}.md').write_text(f"""---
+title: Post {i}
+date: 2024-02-{i + 1:02d}
+tags: [tag{i % 3}, common]
+---
+
+正文 {i}
+""", encoding='utf-8')
+        yield md_dir
+
+
+def build(md_dir, output_dir, workers, theme_dir=DEFAULT_THEME_DIR):
+    """使用指定进程数生成站点"""
+    config_file = write_config(
+        md_dir.parent, f'config-{workers}.json', theme_config={"posts_per_page": 5},
+        output_dir=str(output_dir), workers=workers
+    )
+    build_site(config_file, md_dir, theme_dir)
+
+
+def collect_files(output_dir):
+    """读取输出目录中的所有文件"""
+    return {
+        path.relative_to(output_dir).as_posix(): path.read_bytes()
+        for path in output_dir.rglob('*')
+        if path.is_file() and path.name not in TIMESTAMPED_FILES
+    }
+
+
+def test_parallel_output_matches_serial(md_dir):
+    """测试并行生成与顺序生成的输出一致"""
+    serial_dir = md_dir.parent / 'serial'
+    parallel_dir = md_dir.parent / 'parallel'
+
+    build(md_dir, serial_dir, workers=1)
+    build(md_dir, parallel_dir, workers=3)
+
+    serial_files = collect_files(serial_dir)
+    assert 'page/3.html' in serial_files
+    assert 'tags/common.html' in serial_files
+    assert collect_files(parallel_dir) == serial_files
+
+
+def test_parallel_errors_are_deterministic(md_dir):
+    """测试并行生成时按任务顺序报告第一个错误"""
+    theme_dir = md_dir.parent / 'theme'
+    templates_dir = theme_dir / 'templates'
+    templates_dir.mkdir(parents=True)
+    (theme_dir / 'theme.json').write_text(json.dumps({
+        "name": "broken",
+        "templates": {"index": "index.html", "post": "post.html"}
+    }))
+    (templates_dir / 'base.html').write_text('{% block content %}{% endblock %}')
+    (templates_dir / 'index.html').write_text('index')
+    # 每篇文章都会渲染失败，错误信息中包含文章标题
+    (templates_dir / 'post.html').write_text('{{ post.metadata[post.title].missing }}')
+
+    for workers in (1, 4):
+        with pytest.raises(GenerationError) as exc_info:
+            build(md_dir, md_dir.parent / f'out-{workers}', workers=workers, theme_dir=theme_dir)
+        # 文章按日期降序排列，第一个失败的任务是最新的文章
+        assert 'Post 11' in str(exc_info.value)
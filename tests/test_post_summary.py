@@ -0,0 +1,150 @@
+"""
+测试列表页使用的文章摘要
+"""
+import json
+import pickle
+from datetime import datetime
+
+import pytest
+
+from mblog.templates.runtime.renderer import Renderer
+from mblog.templates.runtime.markdown_processor import MarkdownProcessor, Post, PostSummary, TagTable
+from tests.conftest import build_site, write_config, write_post
+
+
+def make_post(name, tags):
+    """创建测试文章"""
+    return Post(
+        filepath=f'md/{name}.md', slug=name, relative_path=name, title=name.title(),
+        date=datetime(2024, 1, 1), author='Tester', description=f'About {name}', tags=tags,
+        content='# Body', html='<h1>Body</h1>', metadata={'title': name.title(), 'extra': 'x' * 1000}
+    )
+
+
+def test_summary_interns_tags():
+    """测试摘要中的标签以编号保存，多篇文章共享同一个标签名称"""
+    table = TagTable()
+    first = PostSummary.from_post(make_post('a', ['python', 'web']), table)
+    second = PostSummary.from_post(make_post('b', ['web']), table)
+
+    assert first.tag_ids == (0, 1)
+    assert second.tag_ids == (1,)
+    assert second.tags == ('web',)
+    assert first.tags[1] is second.tags[0]
+    assert len(table) == 2
+    assert not hasattr(first, '__dict__')
+    assert 'html' not in PostSummary.__slots__
+
+
+def test_listing_pages_use_summaries(tmp_path, monkeypatch):
+    """测试首页、标签页和归档页使用文章摘要，文章页使用完整的文章"""
+    md_dir = tmp_path / 'md'
+    md_dir.mkdir()
+    for i in range(3):
+        (md_dir / f'post-{i}.md').write_text(f"""---
+title: Post {i}
+date: 2024-01-0{i + 1}
+tags: [python, tag-{i}]
+---
+
+Body {i}.
+""", encoding='utf-8')
+    config_file = write_config(tmp_path, theme_config={"posts_per_page": 2})
+
+    rendered = []
+    for name in ('render_index', 'render_tag_page', 'render_archive', 'render_post'):
+        original = getattr(Renderer, name)
+
+        def recording(self, *args, _name=name, _original=original, **kwargs):
+            posts = args[-1] if _name == 'render_tag_page' else args[0]
+            rendered.append((_name, type(posts if _name == 'render_post' else posts[0]).__name__))
+            return _original(self, *args, **kwargs)
+
+        monkeypatch.setattr(Renderer, name, recording)
+
+    generator = build_site(config_file, md_dir)
+    posts = generator.posts
+
+    assert set(rendered) == {
+        ('render_index', 'PostSummary'), ('render_tag_page', 'PostSummary'),
+        ('render_archive', 'PostSummary'), ('render_post', 'Post'),
+    }
+    assert [summary.relative_path for summary in generator.summaries] == [post.relative_path for post in posts]
+    assert generator.tag_table.names[0] == 'python'
+    assert 'Post 2' in (tmp_path / 'public' / 'tags' / 'python.html').read_text(encoding='utf-8')
+
+    # 替换文章列表时摘要随之更新
+    generator.posts = posts[:1]
+    assert [summary.title for summary in generator.summaries] == ['Post 2']
+
+
+def test_summary_loads_full_post_on_demand():
+    """测试访问摘要中没有的文章字段时加载完整的文章"""
+    post = make_post('a', ['python'])
+    summary = PostSummary.from_post(post, TagTable())
+
+    assert summary.metadata['extra'] == 'x' * 1000
+    assert summary.html == '<h1>Body</h1>'
+    with pytest.raises(AttributeError):
+        summary.missing
+
+    loaded = []
+
+    def load():
+        loaded.append(True)
+        return post
+
+    summary = PostSummary('A', post.date, 'a', 'a', 'Tester', '', False, (), TagTable(), source=load)
+    assert summary.content == '# Body'
+    assert summary.metadata['title'] == 'A'
+    assert loaded == [True]
+
+
+@pytest.mark.parametrize('build_options', [{}, {'streaming': True}, {'streaming': True, 'workers': 2}])
+def test_listing_template_uses_full_post_fields(tmp_path, build_options):
+    """测试自定义主题的列表页模板可以使用摘要中没有的 post.metadata 和 post.html"""
+    md_dir = tmp_path / 'md'
+    md_dir.mkdir()
+    write_post(md_dir, 'first', 'First Post', '2024-01-01', body='First body')
+    (md_dir / 'second.md').write_text("""---
+title: Second Post
+date: 2024-01-02
+subtitle: A subtitle
+---
+
+Second body
+""", encoding='utf-8')
+
+    theme_dir = tmp_path / 'theme'
+    templates_dir = theme_dir / 'templates'
+    templates_dir.mkdir(parents=True)
+    (theme_dir / 'theme.json').write_text(json.dumps({
+        "name": "custom",
+        "templates": {"index": "index.html", "post": "post.html"}
+    }))
+    (templates_dir / 'base.html').write_text('{% block content %}{% endblock %}')
+    (templates_dir / 'index.html').write_text(
+        '{% for post in posts %}[{{ post.metadata.subtitle }}|{{ post.html | safe }}]{% endfor %}'
+    )
+    (templates_dir / 'post.html').write_text('{{ post.html | safe }}')
+    config_file = write_config(tmp_path, **build_options)
+
+    build_site(config_file, md_dir, theme_dir=theme_dir)
+
+    index = (tmp_path / 'public' / 'index.html').read_text(encoding='utf-8')
+    assert '[A subtitle|<p>Second body</p>]' in index
+    assert '[|<p>First body</p>]' in index
+
+
+def test_post_loader_can_be_pickled(tmp_path):
+    """测试流式生成时摘要的完整文章来源可以传给工作进程"""
+    md_dir = tmp_path / 'md'
+    md_dir.mkdir()
+    write_post(md_dir, 'first', 'First Post', '2024-01-01', body='First body')
+    processor = MarkdownProcessor(str(md_dir))
+    summary = PostSummary('First Post', datetime(2024, 1, 1), 'first', 'first', '', '', False, (),
+                          TagTable(), source=processor.post_loader(str(md_dir / 'first.md')))
+
+    copied = pickle.loads(pickle.dumps(summary))
+    assert copied.title == 'First Post'
+    assert copied.html == '<p>First body</p>'
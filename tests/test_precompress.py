@@ -0,0 +1,81 @@
+"""
+测试预压缩文件生成
+"""
+import gzip
+import os
+import pytest
+
+from mblog.templates.runtime.compressor import (
+    COMPRESSIBLE_SUFFIXES, available_encodings, compress_bytes
+)
+from tests.conftest import OLD_MTIME_NS, build_site, write_config, write_post
+
+
+@pytest.fixture
+def project(project_dir):
+    """创建测试项目"""
+    return project_dir, project_dir / 'md'
+
+
+def build(tmpdir, md_dir, workers=1, write_if_changed=False):
+    """执行一次启用预压缩的完整构建"""
+    config_file = write_config(tmpdir, workers=workers, write_if_changed=write_if_changed, precompress=True)
+    build_site(config_file, md_dir)
+
+
+@pytest.mark.parametrize('workers', [1, 3])
+def test_text_outputs_have_compressed_siblings(project, workers):
+    """测试所有文本输出都有内容一致的 .gz 文件"""
+    tmpdir, md_dir = project
+    build(tmpdir, md_dir, workers=workers)
+    output_dir = tmpdir / 'public'
+
+    sources = [path for path in output_dir.rglob('*')
+               if path.is_file() and path.suffix in COMPRESSIBLE_SUFFIXES]
+    assert output_dir / 'posts' / 'first.html' in sources
+    assert output_dir / 'static' / 'css' / 'style.css' in sources
+
+    for source in sources:
+        gz_path = source.with_name(source.name + '.gz')
+        assert gzip.decompress(gz_path.read_bytes()) == source.read_bytes()
+        assert gz_path.stat().st_mode == source.stat().st_mode
+    assert not list(output_dir.rglob('.tmp-*'))
+
+
+def test_unchanged_files_not_recompressed(project):
+    """测试源文件未变化时跳过压缩，删除的文章的压缩文件被清理"""
+    tmpdir, md_dir = project
+    output_dir = tmpdir / 'public'
+    build(tmpdir, md_dir, write_if_changed=True)
+
+    first_gz = output_dir / 'posts' / 'first.html.gz'
+    second_gz = output_dir / 'posts' / 'second.html.gz'
+    style_gz = output_dir / 'static' / 'css' / 'style.css.gz'
+    for path in (first_gz, second_gz, style_gz):
+        os.utime(path, ns=(OLD_MTIME_NS, OLD_MTIME_NS))
+
+    write_post(md_dir, 'first', 'First Post', '2024-01-01', body='修改后的正文')
+    (md_dir / 'second.md').unlink()
+    build(tmpdir, md_dir, write_if_changed=True)
+
+    assert first_gz.stat().st_mtime_ns != OLD_MTIME_NS
+    assert '修改后的正文' in gzip.decompress(first_gz.read_bytes()).decode('utf-8')
+    assert not second_gz.exists()
+    assert style_gz.stat().st_mtime_ns == OLD_MTIME_NS
+
+
+def test_gzip_output_is_deterministic():
+    """测试相同输入的 gzip 输出完全相同"""
+    assert compress_bytes(b'<html></html>', 'gz') == compress_bytes(b'<html></html>', 'gz')
+
+
+@pytest.mark.skipif('br' not in available_encodings(), reason='需要 brotli')
+def test_brotli_siblings(project):
+    """测试安装 brotli 时同时生成 .br 文件"""
+    import brotli
+
+    tmpdir, md_dir = project
+    build(tmpdir, md_dir)
+    source = tmpdir / 'public' / 'index.html'
+    br_path = source.with_name('index.html.br')
+    assert brotli.decompress(br_path.read_bytes()) == source.read_bytes()
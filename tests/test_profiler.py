@@ -0,0 +1,147 @@
+"""
+测试构建性能分析
+"""
+import json
+
+import pytest
+
+from mblog.templates.runtime.profiler import BuildProfiler, get_profiler, profile_phase, profile_step
+from mblog.templates.runtime.config import Config
+from mblog.templates.runtime.theme import Theme
+from mblog.templates.runtime.renderer import Renderer
+from mblog.templates.runtime.generator import StaticGenerator
+from mblog.templates.runtime.markdown_processor import MarkdownProcessor
+from tests.conftest import DEFAULT_THEME_DIR, write_config
+
+
+def test_records_only_while_active():
+    """测试只在分析器启用期间记录，阶段按开始顺序排列"""
+    with profile_phase('ignored'):
+        pass
+
+    with BuildProfiler() as profiler:
+        assert get_profiler() is profiler
+        with profile_phase('outer'):
+            with profile_phase('inner'):
+                data = [0] * 100000
+            del data
+        with profile_step('render', 'a.md'):
+            pass
+        with profile_step('render', 'a.md'):
+            pass
+
+    assert get_profiler() is None
+    assert [phase['name'] for phase in profiler.phases] == ['outer', 'inner']
+    outer, inner = profiler.phases
+    # 内层的内存峰值计入外层
+    assert inner['peak'] >= 800000
+    assert outer['peak'] >= inner['peak']
+    assert profiler.steps['render']['a.md']['count'] == 2
+
+
+def test_records_peak_without_reset_peak(monkeypatch):
+    """测试 tracemalloc 不支持 reset_peak（Python 3.8）时仍能记录各阶段的内存峰值"""
+    import tracemalloc
+    from mblog.templates.runtime import profiler as profiler_module
+    monkeypatch.setattr(profiler_module, '_CAN_RESET_PEAK', False)
+    monkeypatch.delattr(tracemalloc, 'reset_peak', raising=False)
+
+    with BuildProfiler() as profiler:
+        with profile_phase('large'):
+            data = [0] * 1000000
+            del data
+        with profile_phase('outer'):
+            with profile_phase('inner'):
+                data = [0] * 100000
+            del data
+
+    large, outer, inner = profiler.phases
+    assert large['peak'] >= 8000000
+    # 之前阶段的峰值不计入之后的阶段
+    assert inner['peak'] < large['peak']
+    assert inner['peak'] >= 800000
+    assert outer['peak'] >= inner['peak']
+
+
+def test_slowest_excludes_nested_steps():
+    """测试文章总耗时不重复计入嵌套在渲染中的加密步骤"""
+    profiler = BuildProfiler(track_memory=False)
+    profiler.steps = {
+        'render': {'a.md': {'seconds': 1.0, 'allocated': 10, 'count': 1},
+                   'b.md': {'seconds': 0.5, 'allocated': 0, 'count': 1}},
+        'encrypt': {'a.md': {'seconds': 0.8, 'allocated': 5, 'count': 1}},
+        'write': {'b.md': {'seconds': 0.2, 'allocated': 0, 'count': 1}},
+    }
+
+    slowest = profiler.slowest(top=1)
+    assert slowest == [{'key': 'a.md', 'seconds': 1.0, 'allocated': 10,
+                        'steps': {'render': 1.0, 'encrypt': 0.8}}]
+    assert profiler.report()['steps']['render'] == {'count': 2, 'seconds': 1.5, 'allocated': 10}
+    assert 'a.md' in profiler.summary()
+
+
+def test_profile_build_records_each_post(tmp_path):
+    """测试分析构建时记录每篇文章的解析、渲染、写入和加密步骤"""
+    md_dir = tmp_path / 'md'
+    md_dir.mkdir()
+    (md_dir / 'hello.md').write_text("""---
+title: Hello
+date: 2024-01-01
+tags: [python]
+---
+
+# Hello
+""", encoding='utf-8')
+    (md_dir / 'secret.md').write_text("""---
+title: Secret
+date: 2024-01-02
+encrypted: true
+password: "test123"
+---
+
+Secret content.
+""", encoding='utf-8')
+    config_file = write_config(tmp_path, workers=4)
+
+    with BuildProfiler() as profiler:
+        config = Config(str(config_file))
+        config.load()
+        theme = Theme(str(DEFAULT_THEME_DIR))
+        theme.load()
+        posts = MarkdownProcessor(str(md_dir), cache_dir=str(tmp_path / '.mblog-cache')).load_posts()
+        generator = StaticGenerator(config, theme, Renderer(theme, config), posts)
+        assert generator.workers == 1
+        generator.generate()
+
+    for step in ('frontmatter', 'markdown', 'render', 'write'):
+        assert {'hello', 'secret'} <= set(profiler.steps[step])
+    assert set(profiler.steps['encrypt']) == {'secret'}
+    assert 'index.html' in profiler.steps['render']
+    assert {'post_pages', 'search_index'} <= {phase['name'] for phase in profiler.phases}
+
+    report_path = profiler.write_report(str(tmp_path / 'profile.json'), top=3)
+    report = json.loads(report_path.read_text(encoding='utf-8'))
+    assert len(report['slowest']) == 3
+    assert report['peak_memory'] > 0
+
+
+def test_profile_warm_cache_records_parse_steps(tmp_path):
+    """测试解析缓存已命中时，性能分析仍记录每篇文章的解析耗时"""
+    md_dir = tmp_path / 'md'
+    md_dir.mkdir()
+    for name in ('a', 'b'):
+        (md_dir / f'{name}.md').write_text(f"---\ntitle: {name}\ndate: 2024-01-01\n---\n\n# {name}\n",
+                                           encoding='utf-8')
+    cache_dir = str(tmp_path / '.mblog-cache')
+    MarkdownProcessor(str(md_dir), cache_dir=cache_dir).load_posts()
+
+    with BuildProfiler() as profiler:
+        posts = MarkdownProcessor(str(md_dir), cache_dir=cache_dir).load_posts()
+
+    assert {post.title for post in posts} == {'a', 'b'}
+    assert set(profiler.steps['frontmatter']) == {'a', 'b'}
+    assert set(profiler.steps['markdown']) == {'a', 'b'}
+    # 不在分析中时仍使用缓存
+    processor = MarkdownProcessor(str(md_dir), cache_dir=cache_dir)
+    processor._parse_source = lambda *args: pytest.fail('不应重新解析')
+    processor.load_posts()
@@ -0,0 +1,117 @@
+"""
+测试响应式图片
+"""
+import pytest
+import re
+import tempfile
+from pathlib import Path
+
+from mblog.templates.runtime.images import rewrite_images, variant_path
+from tests.conftest import build_site, write_config
+
+
+def test_variant_path():
+    """测试图片版本的文件名包含宽度"""
+    assert variant_path('images/photo.jpg', 480, '.webp') == 'images/photo.480w.webp'
+    assert variant_path('photo.png', 960, '.png') == 'photo.960w.png'
+
+
+def test_rewrite_images_adds_srcset():
+    """测试只改写已处理的图片，WebP 版本放在 <picture> 的 <source> 中"""
+    info = {
+        'digest': 'abc', 'width': 1200, 'height': 600,
+        'variants': [
+            {'width': 480, 'height': 240, 'suffix': '.jpg', 'file': '480.jpg'},
+            {'width': 480, 'height': 240, 'suffix': '.webp', 'file': '480.webp'},
+            {'width': 1200, 'height': 600, 'suffix': '.webp', 'file': '1200.webp'},
+        ],
+    }
+    content = (
+        '<p><img alt="a" src="/blog/assets/images/a.jpg" /></p>'
+        '<p><img alt="b" src="/blog/assets/images/b.jpg" /><img src="https://example.com/c.jpg"></p>'
+    )
+    result = rewrite_images(content, {'a.jpg': info}, '/blog/assets/images/')
+
+    assert result.startswith(
+        '<p><picture><source type="image/webp" srcset="/blog/assets/images/a.480w.webp 480w, '
+        '/blog/assets/images/a.1200w.webp 1200w"'
+    )
+    assert ('<img alt="a" src="/blog/assets/images/a.jpg" srcset="/blog/assets/images/a.480w.jpg 480w, '
+            '/blog/assets/images/a.jpg 1200w"') in result
+    assert 'width="1200" height="600" loading="lazy" /></picture></p>' in result
+    assert result.endswith('<p><img alt="b" src="/blog/assets/images/b.jpg" /><img src="https://example.com/c.jpg"></p>')
+
+
+@pytest.fixture
+def site():
+    """创建包含大图的站点目录"""
+    Image = pytest.importorskip('PIL.Image')
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmpdir = Path(tmpdir)
+        md_dir = tmpdir / 'md'
+        (md_dir / 'images').mkdir(parents=True)
+        Image.new('RGB', (1200, 800), (200, 100, 50)).save(md_dir / 'images' / 'photo.jpg')
+        Image.new('RGB', (300, 200), (0, 0, 0)).save(md_dir / 'images' / 'small.png')
+        (md_dir / 'hello.md').write_text("""---
+title: Hello
+date: 2024-01-01
+---
+
+![photo](images/photo.jpg)
+
+![small](images/small.png)
+""", encoding='utf-8')
+        yield tmpdir
+
+
+def build(tmpdir, lazy=False):
+    """启用响应式图片生成站点，返回生成器"""
+    config_file = write_config(
+        tmpdir, site={"base_path": "/blog"},
+        responsive_images=True, image_widths=[480, 960], lazy_posts=lazy
+    )
+    return build_site(config_file, tmpdir / 'md')
+
+
+def test_generated_variants_and_markup(site):
+    """测试生成小于原图的各个宽度版本，页面引用 srcset"""
+    from PIL import Image
+
+    public_dir = build(site).output_dir
+    images_dir = public_dir / 'assets' / 'images' / 'images'
+    with Image.open(images_dir / 'photo.480w.jpg') as image:
+        assert image.size == (480, 320)
+    assert (images_dir / 'photo.960w.jpg').exists()
+    assert not (images_dir / 'photo.1600w.jpg').exists()
+    assert not (images_dir / 'small.480w.png').exists()
+
+    html = (public_dir / 'posts' / 'hello.html').read_text(encoding='utf-8')
+    assert 'srcset="/blog/assets/images/images/photo.480w.jpg 480w, ' in html
+    assert '/blog/assets/images/images/photo.jpg 1200w"' in html
+    assert 'width="300" height="200" loading="lazy"' in html
+    if (images_dir / 'photo.480w.webp').exists():
+        assert '<source type="image/webp"' in html
+
+
+def test_variants_cached_by_content(site, monkeypatch):
+    """测试图片版本按内容缓存，再次构建时不重新生成"""
+    build(site)
+
+    from PIL import Image
+    monkeypatch.setattr(Image.Image, 'resize', lambda *args, **kwargs: pytest.fail('不应重新生成'))
+    cached = sorted((site / '.mblog-cache' / 'images').rglob('*.jpg'))
+    public_dir = build(site).output_dir
+
+    assert cached == sorted((site / '.mblog-cache' / 'images').rglob('*.jpg'))
+    assert (public_dir / 'assets' / 'images' / 'images' / 'photo.480w.jpg').exists()
+    assert re.search(r'photo\.960w\.jpg 960w', (public_dir / 'posts' / 'hello.html').read_text(encoding='utf-8'))
+
+
+def test_lazy_posts_released_after_rewrite(site):
+    """测试按需加载正文时改写图片不会让正文常驻内存"""
+    generator = build(site, lazy=True)
+
+    # is_loaded 只要 content 被释放即为 False，这里检查 HTML 本身
+    assert all(post._html is None for post in generator.posts)
+    html = (generator.output_dir / 'posts' / 'hello.html').read_text(encoding='utf-8')
+    assert 'srcset="/blog/assets/images/images/photo.480w.jpg 480w, ' in html
@@ -0,0 +1,230 @@
+"""
+测试搜索倒排索引
+"""
+import json
+import shutil
+import subprocess
+import pytest
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+from mblog.templates.runtime.markdown_processor import Post
+from mblog.templates.runtime.search_index import (
+    SearchIndexBuilder, decode_posts, encode_posts, html_to_text, shard_for, tokenize
+)
+from tests.conftest import DEFAULT_THEME_DIR, build_site, write_config
+
+
+SEARCH_JS_PATH = DEFAULT_THEME_DIR / 'static' / 'js' / 'search.js'
+
+# 在 Node.js 中通过模拟的 fetch 加载搜索索引并依次执行查询，
+# 输出每个查询结果的标题列表和请求过的文件
+NODE_SEARCH_SCRIPT = """
+const fs = require('fs');
+const SearchEngine = require(process.argv[1]);
+const [files, queries] = JSON.parse(fs.readFileSync(0, 'utf8'));
+const fetched = [];
+global.fetch = async url => {
+    fetched.push(url);
+    return {ok: url in files, status: url in files ? 200 : 404, json: async () => files[url]};
+};
+(async () => {
+    const engine = new SearchEngine('/blog/search-index.json');
+    await engine.loadIndex();
+    const tokens = engine.tokenize(queries.tokenize);
+    const results = [];
+    for (const q of queries.search) {
+        results.push((await engine.searchAsync(q)).map(post => post.title));
+    }
+    console.log(JSON.stringify({tokens, results, fetched, posts: engine.posts}));
+})();
+"""
+
+
+def create_post(i, title, tags, date=None, description=''):
+    """创建测试文章"""
+    return Post(
+        filepath=f'/tmp/post-{i}.md', slug=f'post-{i}', relative_path=f'dir/post-{i}', title=title,
+        date=date or datetime(2024, 3, 1 + i, 12, 30), author='', description=description,
+        tags=tags, content='', html=''
+    )
+
+
+def test_tokenize_mixed_text():
+    """测试英文按词切分、中文按二元组切分"""
+    assert tokenize('Python 入门教程') == ['python', '入门', '门教', '教程', '程']
+    assert tokenize('C++ 与 Go_lang, 2024!') == ['c', '与', 'go', 'lang', '2024']
+    assert tokenize('') == []
+
+
+def test_html_to_text():
+    """测试去除 HTML 标签、脚本和实体"""
+    text = html_to_text('<p>a &amp; b</p><script>var x = 1;</script><pre><code>print()</code></pre>')
+    assert tokenize(text) == ['a', 'b', 'print']
+
+
+def test_builder_postings_are_sorted_and_unique():
+    """测试倒排列表按文章编号升序且不重复"""
+    builder = SearchIndexBuilder()
+    assert builder.add_post('Python Python', 'python') == 0
+    assert builder.add_post('Go', 'python 教程') == 1
+
+    index, shards = builder.build()
+    assert index['shard_count'] == 1
+    terms = shards[0]['terms']
+    assert terms['python'] == [0, 1]
+    assert terms['go'] == [1]
+    assert terms['教程'] == [1]
+    assert list(terms) == sorted(terms)
+
+
+def test_builder_shards_by_first_character(monkeypatch):
+    """测试索引词按首字符分片，只列出非空分片"""
+    monkeypatch.setattr('mblog.templates.runtime.search_index.TERMS_PER_SHARD', 2)
+    builder = SearchIndexBuilder()
+    builder.add_post('apple apricot banana cherry 中文')
+
+    index, shards = builder.build()
+    assert index['shard_count'] == 3
+    assert index['shards'] == sorted(shards)
+    for shard_id, shard in shards.items():
+        assert all(shard_for(term, 3) == shard_id for term in shard['terms'])
+    assert shards[shard_for('a', 3)]['terms'].keys() >= {'apple', 'apricot'}
+
+
+def test_columnar_posts_round_trip():
+    """测试列式编码可以还原文章元数据"""
+    posts = [
+        create_post(2, 'Newest', ['go', 'python']),
+        create_post(1, '中文', ['python'], description='描述'),
+        create_post(0, 'Oldest', [], date=datetime(2023, 12, 31)),
+    ]
+    data = {'base_path': '/blog', **encode_posts(posts)}
+
+    assert data['epoch'] == '2023-12-31'
+    assert data['tags'] == ['python', 'go']
+    assert data['columns']['date'] == [63, 62, 0]
+    assert data['columns']['tags'] == [[1, 0], [0], []]
+    assert decode_posts(data)[1] == {
+        'title': '中文',
+        'url': '/blog/posts/dir/post-1.html',
+        'date': '2024-03-02',
+        'tags': ['python'],
+        'description': '描述',
+        'relative_path': 'dir/post-1',
+    }
+
+
+def test_columnar_posts_are_compact():
+    """测试列式编码比逐篇文章的对象数组小一半以上"""
+    posts = [
+        create_post(i % 28, f'Post title {i}', [f'tag{i % 7}', 'common'], description=f'Description {i}')
+        for i in range(200)
+    ]
+    rows = [
+        {
+            'title': post.title,
+            'url': f'/blog/posts/{post.relative_path}.html',
+            'date': post.date.isoformat(),
+            'tags': post.tags,
+            'description': post.description,
+            'relative_path': post.relative_path,
+        }
+        for post in posts
+    ]
+    row_size = len(json.dumps(rows, ensure_ascii=False, separators=(',', ':')))
+    columnar_size = len(json.dumps(encode_posts(posts), ensure_ascii=False, separators=(',', ':')))
+    assert columnar_size < row_size / 2
+
+
+def test_generated_index_skips_encrypted_body():
+    """测试生成的搜索索引包含正文，但不包含加密文章的正文"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmpdir = Path(tmpdir)
+        md_dir = tmpdir / 'md'
+        md_dir.mkdir()
+        (md_dir / 'public.md').write_text("""---
+title: 公开文章
+date: 2024-01-02
+tags: [python]
+---
+
+正文里的 uniqueword 和中文内容
+""", encoding='utf-8')
+        (md_dir / 'secret.md').write_text("""---
+title: 加密文章
+date: 2024-01-01
+encrypted: true
+password: secret
+---
+
+不应出现的 hiddenword
+""", encoding='utf-8')
+
+        build_site(write_config(tmpdir), md_dir)
+
+        public_dir = tmpdir / 'public'
+        data = json.loads((public_dir / 'search-index.json').read_text(encoding='utf-8'))
+        assert [post['title'] for post in decode_posts(data)] == ['公开文章', '加密文章']
+        terms = {}
+        for shard_id in data['index']['shards']:
+            shard_file = public_dir / 'search-index' / f'{shard_id}.json'
+            terms.update(json.loads(shard_file.read_text(encoding='utf-8'))['terms'])
+        assert terms['uniqueword'] == [0]
+        assert terms['中文'] == [0]
+        assert terms['加密'] == [1]
+        assert 'hiddenword' not in terms
+
+
+@pytest.mark.skipif(shutil.which('node') is None, reason='需要 Node.js')
+def test_search_js_uses_inverted_index(monkeypatch):
+    """测试 search.js 的分词与 Python 一致，按需加载分片并通过倒排索引执行全文搜索"""
+    monkeypatch.setattr('mblog.templates.runtime.search_index.TERMS_PER_SHARD', 5)
+    posts = [
+        (create_post(2, 'Python 入门教程', ['Python', '教程']), '介绍 asyncio 和生成器'),
+        (create_post(1, 'Go 并发编程', ['Go']), 'goroutine 与 channel 的用法'),
+        (create_post(0, 'Web 开发笔记', ['Python', 'Web']), '使用 Flask 编写接口，生成器也很有用'),
+    ]
+    builder = SearchIndexBuilder()
+    for post, body in posts:
+        builder.add_post(post.title, post.description, body)
+    index, shards = builder.build()
+    manifest = {'base_path': '/blog', **encode_posts([post for post, _ in posts]), 'index': index}
+    files = {'/blog/search-index.json': manifest}
+    for shard_id, shard in shards.items():
+        files[f'/blog/search-index/{shard_id}.json'] = shard
+
+    text = 'Python 入门教程 café, 日本語 2024'
+    queries = {
+        'tokenize': text,
+        'search': ['生成器', 'pyth', '#python flask', '编程 gorout', '器', 'rust', '#web 教程'],
+    }
+
+    result = subprocess.run(
+        ['node', '-e', NODE_SEARCH_SCRIPT, str(SEARCH_JS_PATH)],
+        input=json.dumps([files, queries], ensure_ascii=False),
+        capture_output=True, text=True, encoding='utf-8', timeout=30
+    )
+    assert result.returncode == 0, result.stderr
+    output = json.loads(result.stdout)
+
+    assert output['tokens'] == tokenize(text)
+    assert output['posts'] == decode_posts(manifest)
+    assert output['results'] == [
+        ['Python 入门教程', 'Web 开发笔记'],
+        ['Python 入门教程'],
+        ['Web 开发笔记'],
+        ['Go 并发编程'],
+        ['Python 入门教程', 'Web 开发笔记'],
+        [],
+        [],
+    ]
+
+    # 只加载查询用到的分片，每个分片只请求一次
+    keywords = [word for query in queries['search'] for word in query.split() if not word.startswith('#')]
+    query_terms = [term for keyword in keywords for term in tokenize(keyword)]
+    needed = {shard_for(term, index['shard_count']) for term in query_terms} & set(shards)
+    assert index['shard_count'] > len(needed)
+    assert output['fetched'][0] == '/blog/search-index.json'
+    assert sorted(output['fetched'][1:]) == sorted(f'/blog/search-index/{i}.json' for i in needed)
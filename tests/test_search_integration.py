@@ -18,6 +18,7 @@ from mblog.templates.runtime.theme import Theme
 from mblog.templates.runtime.renderer import Renderer
 from mblog.templates.runtime.markdown_processor import MarkdownProcessor
 from mblog.templates.runtime.generator import StaticGenerator
+from mblog.templates.runtime.search_index import decode_posts
 
 
 def test_search_index_generation_integration():
@@ -150,11 +151,14 @@ tags: [测试, 中文]
             search_index = json.load(f)
         
         # Verify structure
-        assert 'posts' in search_index, "Index must have 'posts' field"
+        assert 'columns' in search_index, "Index must have 'columns' field"
         assert 'generated_at' in search_index, "Index must have 'generated_at' field"
         assert 'total_posts' in search_index, "Index must have 'total_posts' field"
         print("✓ Search index has correct structure")
         
+        # Decode the columnar post metadata
+        search_index['posts'] = decode_posts(search_index)
+        
         # Verify post count
         assert len(search_index['posts']) == 3, f"Expected 3 posts, got {len(search_index['posts'])}"
         assert search_index['total_posts'] == 3, f"Expected total_posts=3, got {search_index['total_posts']}"
@@ -0,0 +1,70 @@
+"""
+测试站点索引
+"""
+import random
+from datetime import datetime
+
+from mblog.templates.runtime.markdown_processor import Post, PostSummary, TagTable
+from mblog.templates.runtime.site_index import SiteIndex, sanitize_filename
+
+
+def make_summary(name, date, tags, table):
+    """创建测试文章摘要"""
+    post = Post(
+        filepath=f'md/{name}.md', slug=name, relative_path=name, title=name, date=date,
+        author='Tester', description='', tags=tags, content='', html=''
+    )
+    return PostSummary.from_post(post, table)
+
+
+def snapshot(index):
+    """把索引转换为便于比较的结构"""
+    return (
+        [post.relative_path for post in index.posts],
+        [(tag, [post.relative_path for post in posts]) for tag, posts in index.tags.items()],
+        [(year, [(month, [post.relative_path for post in posts]) for month, posts in months.items()])
+         for year, months in index.archive.items()],
+    )
+
+
+def test_single_pass_index():
+    """测试一次遍历建立标签、归档分组和标签文件名"""
+    table = TagTable()
+    posts = [
+        make_summary('c', datetime(2024, 3, 1), ['Web Dev', 'python'], table),
+        make_summary('b', datetime(2024, 1, 5), ['python'], table),
+        make_summary('a', datetime(2023, 12, 1), ['C++'], table),
+    ]
+    index = SiteIndex(posts)
+
+    assert list(index.tags) == ['Web Dev', 'python', 'C++']
+    assert index.tags['python'] == posts[:2]
+    assert index.archive == {2024: {3: [posts[0]], 1: [posts[1]]}, 2023: {12: [posts[2]]}}
+    assert index.tag_filename('Web Dev') == 'web-dev'
+    assert index.tag_filename('C++') == sanitize_filename('C++') == 'c'
+    assert index.index_of(posts[2]) == 2
+
+
+def test_update_matches_rebuild():
+    """测试增量更新与重新排序后重新建立索引的结果相同"""
+    rng = random.Random(0)
+    table = TagTable()
+
+    def random_summary(name):
+        date = datetime(2020 + rng.randrange(3), rng.randrange(1, 13), rng.randrange(1, 4))
+        return make_summary(name, date, rng.sample(['a', 'b', 'c', 'd', 'e'], rng.randrange(0, 3)), table)
+
+    posts = sorted((random_summary(f'p{i}') for i in range(40)), key=lambda p: p.date, reverse=True)
+    index = SiteIndex(list(posts))
+
+    for round_number in range(10):
+        removed = {post.relative_path for post in rng.sample(index.posts, 5)}
+        added = [random_summary(f'r{round_number}-{i}') for i in range(5)]
+        # 修改过的文章先移除再以新的摘要加入
+        added.append(random_summary(sorted(removed)[0]))
+        index.update(added, removed)
+
+        posts = [post for post in posts if post.relative_path not in removed] + added
+        posts.sort(key=lambda p: p.date, reverse=True)
+        assert snapshot(index) == snapshot(SiteIndex(list(posts)))
+        assert [index.index_of(post) for post in index.posts] == list(range(len(posts)))
@@ -0,0 +1,100 @@
+"""
+测试流式生成
+"""
+import json
+
+import pytest
+
+from mblog.templates.runtime.search_index import SearchIndexBuilder
+from tests.conftest import build_site, write_config
+
+
+@pytest.fixture
+def md_dir(tmp_path):
+    """创建包含子目录、图片、无描述文章和无法解析的文章的 md 目录"""
+    md_dir = tmp_path / 'md'
+    (md_dir / 'tech').mkdir(parents=True)
+    (md_dir / 'images').mkdir()
+    (md_dir / 'images' / 'logo.png').write_bytes(b'\x89PNG\r\n\x1a\n')
+    for i in range(6):
+        folder = md_dir / 'tech' if i % 2 else md_dir
+        (folder / f'post-{i}.md').write_text(f"""---
+title: Post {i}
+date: 2024-01-{10 - i:02d}
+tags: [python, tag-{i % 3}]
+{'description: About post ' + str(i) if i % 3 else ''}
+---
+
+# Heading {i}
+
+Body of post {i} 静态网站.
+
+![logo](images/logo.png)
+""", encoding='utf-8')
+    (md_dir / 'broken.md').write_text("---\ntitle: [unclosed\n---\n", encoding='utf-8')
+    return md_dir
+
+
+def build(md_dir, output_dir, streaming, **build_options):
+    """生成站点，返回生成器"""
+    config_file = write_config(
+        md_dir.parent, theme_config={"posts_per_page": 4}, output_dir=str(output_dir),
+        cache_dir=str(md_dir.parent / f'.cache-{output_dir.name}'), streaming=streaming, **build_options
+    )
+    return build_site(config_file, md_dir)
+
+
+def output_files(output_dir):
+    """读取输出目录中除生成时间外确定的文件"""
+    files = {}
+    for path in sorted(output_dir.rglob('*')):
+        if path.is_file() and path.name != 'sitemap.xml':
+            files[path.relative_to(output_dir).as_posix()] = path.read_bytes()
+    search_index = json.loads(files.pop('search-index.json'))
+    search_index.pop('generated_at')
+    return files, search_index
+
+
+def test_reorder_renumbers_postings():
+    """测试重新编号后每个索引词的文章编号列表仍然升序"""
+    builder = SearchIndexBuilder()
+    builder.add_post('alpha beta')
+    builder.add_post('beta')
+    builder.add_post('alpha gamma')
+    builder.reorder([2, 0, 1])
+
+    _, shards = builder.build()
+    terms = {term: ids for shard in shards.values() for term, ids in shard['terms'].items()}
+    assert terms == {'alpha': [0, 1], 'beta': [1, 2], 'gamma': [0]}
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_streaming_build_matches_regular_build(md_dir, tmp_path, workers):
+    """测试流式生成的页面、订阅和搜索索引与先加载全部文章再生成时相同"""
+    build(md_dir, tmp_path / 'regular', streaming=False, workers=workers)
+    generator = build(md_dir, tmp_path / 'streaming', streaming=True, workers=workers)
+
+    assert [summary.title for summary in generator.summaries] == [f'Post {i}' for i in range(6)]
+    assert generator.posts == []
+    assert output_files(tmp_path / 'streaming') == output_files(tmp_path / 'regular')
+    assert (tmp_path / 'streaming' / 'assets' / 'images' / 'images' / 'logo.png').exists()
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_incremental_streaming_build(md_dir, tmp_path, workers):
+    """测试增量模式下流式生成只重新生成变化的文章页"""
+    output_dir = tmp_path / 'public'
+    build(md_dir, output_dir, streaming=True, incremental=True, workers=workers)
+    unchanged = output_dir / 'posts' / 'post-0.html'
+    mtime = unchanged.stat().st_mtime_ns
+
+    source = md_dir / 'tech' / 'post-1.md'
+    source.write_text(source.read_text(encoding='utf-8').replace('Body of post 1', 'Updated body'),
+                      encoding='utf-8')
+    generator = build(md_dir, output_dir, streaming=True, incremental=True, workers=workers)
+
+    assert unchanged.stat().st_mtime_ns == mtime
+    assert 'Updated body' in (output_dir / 'posts' / 'tech' / 'post-1.html').read_text(encoding='utf-8')
+    assert generator._skipped_count >= 5
+    manifest = json.loads(generator.manifest_path.read_text(encoding='utf-8'))
+    assert manifest['outputs']['posts/post-0.html']
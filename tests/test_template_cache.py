@@ -0,0 +1,127 @@
+"""
+测试模板缓存、字节码缓存和模板预编译
+"""
+import json
+import pytest
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+from mblog.templates.runtime.config import Config
+from mblog.templates.runtime.theme import Theme
+from mblog.templates.runtime.renderer import Renderer, RendererError
+from mblog.templates.runtime.markdown_processor import Post
+
+
+@pytest.fixture
+def project():
+    """创建包含简单主题的测试项目"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmpdir = Path(tmpdir)
+        theme_dir = tmpdir / 'theme'
+        templates_dir = theme_dir / 'templates'
+        templates_dir.mkdir(parents=True)
+        (theme_dir / 'theme.json').write_text(json.dumps({
+            "name": "test",
+            "templates": {"base": "base.html", "index": "index.html", "post": "post.html"}
+        }))
+        (templates_dir / 'base.html').write_text('<html>{% block content %}{% endblock %}</html>')
+        (templates_dir / 'index.html').write_text('{% extends "base.html" %}{% block content %}Index{% endblock %}')
+        (templates_dir / 'post.html').write_text(
+            '{% extends "base.html" %}{% block content %}{{ post.title }} {{ post.date|format_date }}{% endblock %}'
+        )
+        yield tmpdir
+
+
+def create_renderer(tmpdir, precompile=False):
+    """创建启用缓存的渲染器"""
+    config_file = tmpdir / 'config.json'
+    config_file.write_text(json.dumps({
+        "site": {"title": "Test", "description": "Test", "author": "Tester"},
+        "build": {"output_dir": "public", "theme": "default", "precompile_templates": precompile},
+        "theme_config": {"date_format": "%Y-%m-%d"}
+    }))
+    config = Config(str(config_file))
+    config.load()
+    theme = Theme(str(tmpdir / 'theme'))
+    theme.load()
+    return Renderer(theme, config, cache_dir=str(tmpdir / '.mblog-cache'))
+
+
+def create_post():
+    """创建测试文章"""
+    return Post(
+        filepath='/tmp/post.md', slug='post', relative_path='post', title='Hello',
+        date=datetime(2024, 1, 1), author='', description='', tags=[],
+        content='', html='<p>Hello</p>'
+    )
+
+
+def test_bytecode_cache_written(project):
+    """测试渲染后写入模板字节码缓存"""
+    renderer = create_renderer(project)
+    assert renderer.render_post(create_post()) == '<html>Hello 2024-01-01</html>'
+
+    bytecode_files = list((project / '.mblog-cache' / 'jinja').iterdir())
+    assert len(bytecode_files) >= 2
+
+    # 新的渲染器从字节码缓存加载模板，结果一致
+    assert create_renderer(project).render_post(create_post()) == '<html>Hello 2024-01-01</html>'
+
+
+def test_precompiled_templates_used(project):
+    """测试预编译模板被复用，模板修改后重新编译"""
+    renderer = create_renderer(project, precompile=True)
+    assert renderer.render_post(create_post()) == '<html>Hello 2024-01-01</html>'
+
+    compiled_root = project / '.mblog-cache' / 'templates-compiled'
+    compiled_dirs = [d for d in compiled_root.iterdir() if not d.name.startswith('.')]
+    assert len(compiled_dirs) == 1
+    assert any(compiled_dirs[0].glob('*.py'))
+
+    (project / 'theme' / 'templates' / 'post.html').write_text(
+        '{% extends "base.html" %}{% block content %}Changed {{ post.title }}{% endblock %}'
+    )
+    renderer = create_renderer(project, precompile=True)
+    assert renderer.render_post(create_post()) == '<html>Changed Hello</html>'
+    assert len([d for d in compiled_root.iterdir() if not d.name.startswith('.')]) == 2
+
+
+def test_precompile_requires_cache_dir(project):
+    """测试未配置缓存目录时无法预编译"""
+    renderer = create_renderer(project)
+    renderer.cache_dir = None
+    with pytest.raises(RendererError):
+        renderer.precompile_templates()
+
+
+def test_templates_resolved_once(project, monkeypatch):
+    """测试模板按逻辑名称只解析一次"""
+    renderer = create_renderer(project)
+    calls = []
+    original_get_template = renderer.theme.get_template
+
+    def counting_get_template(name):
+        calls.append(name)
+        return original_get_template(name)
+
+    monkeypatch.setattr(renderer.theme, 'get_template', counting_get_template)
+
+    for _ in range(3):
+        renderer.render_post(create_post())
+        renderer.render_archive([create_post()])
+    assert calls == ['post', 'index']
+
+
+def test_invalidate_templates_reloads(project):
+    """测试清空模板缓存后重新加载修改过的模板"""
+    renderer = create_renderer(project)
+    assert renderer.render_post(create_post()) == '<html>Hello 2024-01-01</html>'
+
+    (project / 'theme' / 'templates' / 'post.html').write_text(
+        '{% extends "base.html" %}{% block content %}Edited{% endblock %}'
+    )
+    assert renderer.render_post(create_post()) == '<html>Hello 2024-01-01</html>'
+
+    renderer.invalidate_templates()
+    assert renderer.render_post(create_post()) == '<html>Edited</html>'
@@ -0,0 +1,65 @@
+"""
+测试只写入变化的文件
+"""
+import os
+import pytest
+
+from tests.conftest import OLD_MTIME_NS, build_site, write_config, write_post
+
+
+@pytest.fixture
+def project(project_dir):
+    """创建启用 write_if_changed 的测试项目"""
+    return project_dir, project_dir / 'md', write_config(project_dir, write_if_changed=True)
+
+
+def build(md_dir, config_file, workers=1):
+    """执行一次完整构建"""
+    return build_site(config_file, md_dir, workers=workers)
+
+
+def age_files(output_dir, *names):
+    """把输出文件的修改时间改为很早以前"""
+    for name in names:
+        os.utime(output_dir / name, ns=(OLD_MTIME_NS, OLD_MTIME_NS))
+
+
+@pytest.mark.parametrize('workers', [1, 3])
+def test_unchanged_files_not_rewritten(project, workers):
+    """测试内容未变化的文件保留原有修改时间和 inode，变化的文件被重写"""
+    tmpdir, md_dir, config_file = project
+    output_dir = tmpdir / 'public'
+    build(md_dir, config_file, workers)
+
+    names = ['posts/first.html', 'posts/second.html', 'static/css/style.css']
+    age_files(output_dir, *names)
+    inode = (output_dir / 'posts/second.html').stat().st_ino
+
+    write_post(md_dir, 'first', 'First Post', '2024-01-01', body='修改后的正文')
+    generator = build(md_dir, config_file, workers)
+
+    assert (output_dir / 'posts/first.html').stat().st_mtime_ns != OLD_MTIME_NS
+    assert '修改后的正文' in (output_dir / 'posts/first.html').read_text(encoding='utf-8')
+    assert (output_dir / 'posts/second.html').stat().st_mtime_ns == OLD_MTIME_NS
+    assert (output_dir / 'posts/second.html').stat().st_ino == inode
+    assert (output_dir / 'static/css/style.css').stat().st_mtime_ns == OLD_MTIME_NS
+    assert generator._unchanged_count > 0
+
+
+def test_stale_outputs_removed(project):
+    """测试不再生成的文件和原有的无关文件被删除"""
+    tmpdir, md_dir, config_file = project
+    output_dir = tmpdir / 'public'
+    output_dir.mkdir()
+    (output_dir / 'leftover.html').write_text('old')
+
+    build(md_dir, config_file)
+    assert not (output_dir / 'leftover.html').exists()
+    assert (output_dir / 'tags' / 'go.html').exists()
+
+    (md_dir / 'second.md').unlink()
+    build(md_dir, config_file)
+
+    assert not (output_dir / 'posts' / 'second.html').exists()
+    assert not (output_dir / 'tags' / 'go.html').exists()
+    assert (output_dir / 'posts' / 'first.html').exists()